@@ -0,0 +1 @@
+"""Performance benchmarks over deterministic synthetic data; see run.py."""
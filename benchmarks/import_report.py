@@ -0,0 +1,143 @@
+"""Reports what the frontend's cold start spends on imports, from python -X importtime.
+
+    python -m benchmarks.import_report --output imports.json
+    python -m benchmarks.import_report --baseline imports.json
+    python -m benchmarks.import_report --module food_app.server
+
+Run from the repository root. The steps of a first page render (the app
+script's own imports, the backend behind the client, the dashboard view,
+the libraries its first table draws with) are imported in that order by a
+fresh interpreter, --runs times. A module shared by several steps is
+charged to the first one that imports it. Each step reports wall-clock
+latency like a benchmarks.run case, and "modules" lists the --top modules
+by median cumulative import time. --module measures the given modules
+instead, one step each.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from benchmarks.run import _git_revision, compare, summarize
+
+FORMAT_VERSION = 1
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# (step, modules) in the order app.py reaches them on its first run
+STARTUP_STEPS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("app_script", ("streamlit", "food_app.backend.infrastructure.logger", "food_app.frontend.constants")),
+    ("backend", ("food_app.frontend.runtime",)),
+    ("dashboard_view", ("food_app.frontend.views.dashboard",)),
+    ("first_table", ("pandas", "pyarrow")),
+]
+
+_MARKER = "@@step"
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+
+def _child_code(steps: Sequence[Tuple[str, Sequence[str]]]) -> str:
+    lines = ["import sys, time"]
+    for name, modules in steps:
+        lines.append(f"print({_MARKER!r}, {name!r}, file=sys.stderr, flush=True)")
+        lines.append("start = time.perf_counter_ns()")
+        lines.extend(f"import {module}" for module in modules)
+        lines.append(f"print({_MARKER!r}, {name!r}, time.perf_counter_ns() - start, file=sys.stderr, flush=True)")
+    return "\n".join(lines)
+
+
+def parse_importtime(stderr: str) -> Tuple[Dict[str, int], Dict[str, Tuple[str, int, int]]]:
+    """Wall ns per step, and module -> (step, self us, cumulative us) from one run's stderr."""
+    wall: Dict[str, int] = {}
+    modules: Dict[str, Tuple[str, int, int]] = {}
+    step = None
+    for line in stderr.splitlines():
+        if line.startswith(_MARKER):
+            parts = line.split()
+            if len(parts) == 2:
+                step = parts[1]
+            else:
+                wall[parts[1]] = int(parts[2])
+            continue
+        match = _LINE.match(line)
+        if match and step is not None:
+            self_us, cumulative_us, _, module = match.groups()
+            modules[module] = (step, int(self_us), int(cumulative_us))
+    return wall, modules
+
+
+def measure(steps: Sequence[Tuple[str, Sequence[str]]], runs: int) -> Tuple[Dict[str, List[int]], Dict[str, list]]:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(SRC_DIR), os.environ.get("PYTHONPATH")])))
+    walls: Dict[str, List[int]] = defaultdict(list)
+    modules: Dict[str, list] = defaultdict(list)
+    for _ in range(runs):
+        child = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _child_code(steps)], capture_output=True, text=True, env=env,
+        )
+        if child.returncode:
+            raise SystemExit(f"Import failed:\n{child.stderr.splitlines()[-1] if child.stderr else child.returncode}")
+        wall, found = parse_importtime(child.stderr)
+        for step, ns in wall.items():
+            walls[step].append(ns)
+        for module, timings in found.items():
+            modules[module].append(timings)
+    return walls, modules
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to measure")
+    parser.add_argument("--top", type=int, default=25, help="modules listed, by cumulative import time")
+    parser.add_argument("--module", action="append", help="measure this module instead of the startup steps")
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    args = parser.parse_args(argv)
+    steps = [(module, (module,)) for module in args.module] if args.module else STARTUP_STEPS
+
+    walls, modules = measure(steps, args.runs)
+    ranked = sorted(
+        (
+            {
+                "module": module,
+                "step": timings[0][0],
+                "self_ms": round(statistics.median(t[1] for t in timings) / 1000, 2),
+                "cumulative_ms": round(statistics.median(t[2] for t in timings) / 1000, 2),
+            }
+            for module, timings in modules.items()
+        ),
+        key=lambda row: row["cumulative_ms"],
+        reverse=True,
+    )
+    report = {
+        "format": FORMAT_VERSION,
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": args.runs,
+            "steps": {name: list(step_modules) for name, step_modules in steps},
+        },
+        "results": {name: summarize(walls[name]) for name, _ in steps},
+        "modules": ranked[:args.top],
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        print("\n".join(compare(report, baseline)), file=sys.stderr)
+    return report
+
+
+if __name__ == "__main__":
+    main()
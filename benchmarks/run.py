@@ -0,0 +1,263 @@
+"""Times the hot paths on a synthetic database and prints the results as JSON.
+
+    python -m benchmarks.run --scale small --output results.json
+    python -m benchmarks.run --scale small --baseline results.json
+
+Run from the repository root. Each case reports per-call latency quantiles in
+milliseconds; --baseline prints the p50 change of every case against an
+earlier result file to stderr.
+"""
+import argparse
+import json
+import logging
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+
+from food_app.backend.infrastructure.database import STORAGE_PROFILES, create_sqlite_engine  # noqa: E402
+from food_app.backend.infrastructure.migrations import init_db  # noqa: E402
+from food_app.backend.infrastructure.models import Food, FoodUnit, Meal, Recipe  # noqa: E402
+from food_app.backend.services.food_search import search_foods  # noqa: E402
+from food_app.backend.services.food_service import FoodService  # noqa: E402
+from food_app.backend.services.import_service import FoodImportService  # noqa: E402
+from food_app.backend.services.log_service import daily_nutrition_report, range_summary  # noqa: E402
+from food_app.backend.services.meal_service import MealService  # noqa: E402
+from food_app.backend.services.pagination import list_foods  # noqa: E402
+from food_app.backend.services.recipe_service import RecipeService  # noqa: E402
+from food_app.backend.services.recommender import MacroRecommender  # noqa: E402
+from food_app.backend.services.food_similarity import FoodSimilarityIndex  # noqa: E402
+from food_app.backend.services.catalog_snapshot import CatalogSnapshot, export_catalog  # noqa: E402
+from food_app.backend.services.nutrition_dataclass import MacroGoals  # noqa: E402
+
+from benchmarks.synthetic import FIRST_LOG_DAY, SCALES, Scale, generate, scale_dict, write_food_csv  # noqa: E402
+
+FORMAT_VERSION = 1
+
+
+def summarize(samples_ns: List[int]) -> dict:
+    ms = sorted(ns / 1e6 for ns in samples_ns)
+
+    def pick(q):
+        return ms[min(len(ms) - 1, int(q * len(ms)))]
+
+    return {
+        "calls": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 4),
+        "p50_ms": round(pick(0.5), 4),
+        "p95_ms": round(pick(0.95), 4),
+        "min_ms": round(ms[0], 4),
+        "max_ms": round(ms[-1], 4),
+        "total_s": round(sum(ms) / 1000, 4),
+    }
+
+
+def time_calls(calls: List[Callable[[], object]]) -> dict:
+    samples = []
+    for call in calls:
+        start = time.perf_counter_ns()
+        call()
+        samples.append(time.perf_counter_ns() - start)
+    return summarize(samples)
+
+
+def _logged_unit(rng: random.Random, unit_names: List[str]) -> str:
+    return rng.choice(unit_names) if unit_names and rng.random() < 0.5 else "g"
+
+
+def run_cases(db: Session, scale: Scale, samples: int, seed: int, workdir: Path) -> Dict[str, dict]:
+    rng = random.Random(seed + 1)
+    food_ids = list(db.scalars(select(Food.id)))
+    units: Dict[int, List[str]] = {}
+    for food_id, unit_name in db.execute(select(FoodUnit.food_id, FoodUnit.unit_name)):
+        units.setdefault(food_id, []).append(unit_name)
+    recipe_ids = list(db.scalars(select(Recipe.id)))
+    meal_ids = list(db.scalars(select(Meal.id)))
+    days = [FIRST_LOG_DAY + timedelta(days=rng.randrange(scale.days)) for _ in range(samples)]
+    results = {}
+
+    food_service = FoodService(db)
+    recipe_service = RecipeService(db, food_service)
+    meal_service = MealService(db, food_service, recipe_service)
+
+    picks = [rng.choice(food_ids) for _ in range(samples)]
+    results["food_nutrition"] = time_calls([
+        lambda f=f, u=_logged_unit(rng, units.get(f, [])): food_service.calculate_nutrition(f, 150.0, u)
+        for f in picks
+    ])
+
+    picks = [rng.choice(recipe_ids) for _ in range(samples)]
+    results["recipe_refresh"] = time_calls([lambda r=r: recipe_service.refresh_nutrition(r) for r in picks])
+    db.commit()
+    results["recipe_nutrition"] = time_calls([lambda r=r: recipe_service.calculate_nutrition(r, 1.5) for r in picks])
+
+    picks = [rng.choice(meal_ids) for _ in range(samples)]
+
+    def cold_meal(meal_id):
+        meal_service.clear_cache()
+        return meal_service.calculate_nutrition(meal_id)
+
+    results["meal_nutrition_cold"] = time_calls([lambda m=m: cold_meal(m) for m in picks])
+    results["meal_nutrition_cached"] = time_calls([lambda m=m: meal_service.calculate_nutrition(m) for m in picks])
+
+    results["dashboard_day"] = time_calls([lambda d=d: daily_nutrition_report(db, d) for d in days])
+    results["range_summary_90d"] = time_calls([lambda d=d: range_summary(db, d - timedelta(days=89), d) for d in days])
+
+    def walk_catalog(pages=10, category=None):
+        cursor = None
+        for _ in range(pages):
+            page = list_foods(db, cursor, 20, category)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+    results["catalog_list_10_pages"] = time_calls([lambda: walk_catalog() for _ in range(max(1, samples // 10))])
+    results["catalog_list_category"] = time_calls([
+        lambda c=c: walk_catalog(3, c) for c in ["Grãos", "Carnes", "Frutas", "Bebidas"] * max(1, samples // 40)
+    ])
+    terms = ["arroz", "frango grelhado", "leite desnatado", "pão integral", "banana", "queijo caseiro"]
+    results["catalog_search"] = time_calls([
+        lambda t=t: search_foods(db, t, 20) for t in (terms * (samples // len(terms) + 1))[:samples]
+    ])
+
+    recommender = MacroRecommender(db)
+    results["recommender_load"] = time_calls([lambda: (recommender.invalidate(), recommender.scores(MacroGoals(0, 0, 0, 0)))])
+    gaps = [MacroGoals(rng.uniform(100, 1200), rng.uniform(5, 80), rng.uniform(10, 150), rng.uniform(5, 50)) for _ in range(samples)]
+    results["recommend_top10"] = time_calls([lambda g=g: recommender.recommend(g, 10) for g in gaps])
+
+    similar = FoodSimilarityIndex(db)
+    results["similar_foods_build"] = time_calls([lambda: (similar.clear(), similar.similar(food_ids[0]))])
+    picks = [rng.choice(food_ids) for _ in range(samples)]
+    results["similar_foods_top10"] = time_calls([lambda f=f: similar.similar(f, 10) for f in picks])
+
+    catalog_path = workdir / "bench.catalog"
+    results["catalog_export"] = time_calls([lambda: export_catalog(db, catalog_path) for _ in range(max(1, samples // 10))])
+    batch = [(f, 150.0, _logged_unit(rng, units.get(f, []))) for f in rng.sample(food_ids, min(len(food_ids), 500))]
+
+    def cold_batch(mapped: bool):
+        # A new process's first request: fresh caches, optionally backed by the snapshot
+        service = FoodService(db, CatalogSnapshot(catalog_path) if mapped else None)
+        service.engine.total([item[0] for item in batch], service.resolve_grams(batch))
+
+    results["cold_batch_500_query"] = time_calls([lambda: cold_batch(False) for _ in range(max(1, samples // 5))])
+    results["cold_batch_500_snapshot"] = time_calls([lambda: cold_batch(True) for _ in range(max(1, samples // 5))])
+    db.rollback()
+    return results
+
+
+def run_import(workdir: Path, scale: Scale, seed: int, profile: str) -> dict:
+    csv_path = workdir / "foods.csv"
+    write_food_csv(str(csv_path), scale.csv_rows, seed)
+    engine = create_sqlite_engine(f"sqlite:///{workdir / 'import.db'}", profile)
+    try:
+        init_db(engine)
+        with sessionmaker(bind=engine)() as db:
+            stats = FoodImportService(db).import_csv(str(csv_path))
+    finally:
+        engine.dispose()
+    return {
+        "rows": stats.rows,
+        "invalid_rows": stats.invalid_rows,
+        "total_s": round(stats.seconds, 4),
+        "rows_per_sec": round(stats.rows_per_sec, 1),
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict) -> List[str]:
+    lines = []
+    for case, stats in current["results"].items():
+        before = baseline.get("results", {}).get(case)
+        key = "p50_ms" if "p50_ms" in stats else "total_s"
+        if not before or not before.get(key):
+            lines.append(f"{case:28} {stats[key]:>10} (new)")
+            continue
+        change = (stats[key] - before[key]) / before[key] * 100
+        lines.append(f"{case:28} {before[key]:>10} -> {stats[key]:<10} {change:+.1f}%")
+    return lines
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--samples", type=int, default=200, help="timed calls per case")
+    parser.add_argument("--profile", choices=sorted(STORAGE_PROFILES), default="balanced")
+    parser.add_argument("--db", help="reuse or create the generated database at this path")
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument("--skip-import", action="store_true")
+    args = parser.parse_args(argv)
+    scale = SCALES[args.scale]
+    # Synthetic ingredients often name units their food lacks; the fallback warnings are expected
+    logging.getLogger().setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory(prefix="food-bench-") as tmp:
+        workdir = Path(tmp)
+        db_path = Path(args.db) if args.db else workdir / "bench.db"
+        fresh = not db_path.exists()
+        engine = create_sqlite_engine(f"sqlite:///{db_path}", args.profile)
+        try:
+            init_db(engine)
+            with sessionmaker(autocommit=False, autoflush=False, bind=engine)() as db:
+                start = time.perf_counter()
+                counts = generate(db, scale, args.seed) if fresh else None
+                generate_s = time.perf_counter() - start
+                results = run_cases(db, scale, args.samples, args.seed, workdir)
+        finally:
+            engine.dispose()
+        if not args.skip_import:
+            results["csv_import"] = run_import(workdir, scale, args.seed, args.profile)
+
+    report = {
+        "format": FORMAT_VERSION,
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "scale_params": scale_dict(scale),
+            "seed": args.seed,
+            "samples": args.samples,
+            "profile": args.profile,
+            "generated": counts,
+            "generate_s": round(generate_s, 2) if fresh else None,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        print("\n".join(compare(report, baseline)), file=sys.stderr)
+    return report
+
+
+if __name__ == "__main__":
+    main()
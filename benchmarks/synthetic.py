@@ -0,0 +1,201 @@
+"""Deterministic synthetic catalog and diary generator.
+
+The same scale and seed always produce the same rows (ids included, on an
+empty database), so timings from different runs are comparable.
+
+    from benchmarks.synthetic import SCALES, generate
+    counts = generate(session, SCALES["small"], seed=7)
+"""
+import csv
+import random
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from typing import Dict, List
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from food_app.backend.infrastructure.models import DailyLog, Food, FoodUnit, Meal, MealItem, Recipe, RecipeIngredient
+from food_app.backend.services.food_service import FoodService
+from food_app.backend.services.log_service import backfill_log_snapshots
+from food_app.backend.services.recipe_service import RecipeService
+
+FIRST_LOG_DAY = date(2022, 1, 1)
+# Rows per executemany, well below SQLite's bound-parameter limit
+_BATCH = 2000
+
+
+@dataclass(frozen=True)
+class Scale:
+    foods: int
+    recipes: int
+    min_ingredients: int
+    max_ingredients: int
+    meals: int
+    min_meal_items: int
+    max_meal_items: int
+    days: int
+    min_logs_per_day: int
+    max_logs_per_day: int
+    # Rows of the CSV written for the import benchmark
+    csv_rows: int
+
+
+SCALES: Dict[str, Scale] = {
+    "tiny": Scale(500, 50, 2, 8, 20, 2, 4, 30, 2, 6, 1_000),
+    "small": Scale(10_000, 500, 5, 30, 100, 2, 6, 365, 3, 10, 20_000),
+    "full": Scale(100_000, 5_000, 5, 30, 1_000, 2, 6, 3 * 365, 3, 10, 100_000),
+}
+
+_CATEGORIES = ["Carnes", "Grãos", "Laticínios", "Vegetais", "Pratos Prontos", "Frutas", "Bebidas", "Outros"]
+_NOUNS = [
+    "Arroz", "Feijão", "Frango", "Carne", "Peixe", "Ovo", "Leite", "Queijo", "Iogurte", "Pão",
+    "Macarrão", "Batata", "Mandioca", "Tomate", "Alface", "Cenoura", "Brócolis", "Banana", "Maçã", "Aveia",
+]
+_QUALIFIERS = [
+    "Integral", "Cozido", "Grelhado", "Assado", "Cru", "Light", "Desnatado", "Orgânico", "Temperado", "Caseiro",
+    "Frito", "Refogado", "Natural", "Zero", "Tradicional",
+]
+_BRANDS = ["", "Sadia", "Nestlé", "Camil", "Tio João", "Piracanjuba", "Seara", "Qualy", "Vigor", "Kicaldo"]
+# (unit name as logged, grams per unit range)
+_UNITS = [("unidade", 30, 250), ("fatia", 15, 40), ("colher de sopa", 10, 20), ("xícara", 120, 240), ("porção", 80, 200)]
+# Unit spellings used in logs and ingredients, resolved through the alias table
+_LOGGED_UNITS = ["g", "g", "g", "ml", "unidade", "fatia", "colher", "colheres", "xícaras", "porção"]
+
+
+def _food_name(rng: random.Random, food_id: int) -> str:
+    parts = [rng.choice(_NOUNS), rng.choice(_QUALIFIERS), rng.choice(_BRANDS)]
+    # The id keeps names unique, like barcodes would in a real catalog
+    return " ".join(p for p in parts if p) + f" #{food_id}"
+
+
+def _food_row(rng: random.Random, food_id: int) -> dict:
+    proteins = round(rng.uniform(0, 35), 1)
+    carbs = round(rng.uniform(0, 80), 1)
+    fats = round(rng.uniform(0, 40), 1)
+    sugar = round(rng.uniform(0, carbs), 1)
+    return dict(
+        name=_food_name(rng, food_id),
+        category=rng.choice(_CATEGORIES),
+        is_liquid=rng.random() < 0.1,
+        is_active=rng.random() < 0.98,
+        calories_100g=round(proteins * 4 + carbs * 4 + fats * 9, 1),
+        proteins_100g=proteins,
+        carbs_100g=carbs,
+        fats_100g=fats,
+        saturated_fats_100g=round(fats * rng.uniform(0, 0.6), 1),
+        trans_fats_100g=round(fats * rng.uniform(0, 0.05), 2) if rng.random() < 0.3 else None,
+        fiber_100g=round(rng.uniform(0, 12), 1) if rng.random() < 0.8 else None,
+        sodium_100g=round(rng.uniform(0, 900), 0),
+        sugar_100g=sugar,
+    )
+
+
+def _insert(db: Session, table, rows: List[dict]) -> None:
+    for start in range(0, len(rows), _BATCH):
+        db.execute(insert(table), rows[start:start + _BATCH])
+
+
+def _ingredient(rng: random.Random, food_ids: List[int]) -> dict:
+    unit_name = rng.choice(_LOGGED_UNITS)
+    quantity = round(rng.uniform(20, 300), 0) if unit_name in ("g", "ml") else float(rng.randint(1, 4))
+    return dict(food_id=rng.choice(food_ids), quantity=quantity, unit_name=unit_name)
+
+
+def generate(db: Session, scale: Scale, seed: int = 0, materialize: bool = True) -> Dict[str, int]:
+    """Fills an empty, migrated database and commits; returns row counts per table.
+
+    With materialize, recipe nutrition rows, log snapshots and the daily
+    summary are computed as the app would have; otherwise they are left for
+    the first reads.
+    """
+    rng = random.Random(seed)
+
+    # Foods get ids 1..N in insertion order on an empty table
+    _insert(db, Food.__table__, [_food_row(rng, food_id) for food_id in range(1, scale.foods + 1)])
+    food_ids = list(db.scalars(select(Food.id).order_by(Food.id)))
+    units = []
+    for food_id in food_ids:
+        for unit_name, low, high in rng.sample(_UNITS, rng.randint(0, 3)):
+            units.append(dict(food_id=food_id, unit_name=unit_name, grams=float(rng.randint(low, high))))
+    _insert(db, FoodUnit.__table__, units)
+
+    _insert(db, Recipe.__table__, [
+        dict(name=f"Receita {rng.choice(_NOUNS)} {i}", portions_yield=rng.randint(1, 8), is_active=True)
+        for i in range(1, scale.recipes + 1)
+    ])
+    recipe_ids = list(db.scalars(select(Recipe.id).order_by(Recipe.id)))
+    ingredients = []
+    for recipe_id in recipe_ids:
+        for _ in range(rng.randint(scale.min_ingredients, scale.max_ingredients)):
+            ingredients.append(dict(recipe_id=recipe_id, **_ingredient(rng, food_ids)))
+    _insert(db, RecipeIngredient.__table__, ingredients)
+
+    _insert(db, Meal.__table__, [dict(name=f"Refeição {i}", is_active=True) for i in range(1, scale.meals + 1)])
+    meal_ids = list(db.scalars(select(Meal.id).order_by(Meal.id)))
+    items = []
+    for meal_id in meal_ids:
+        for _ in range(rng.randint(scale.min_meal_items, scale.max_meal_items)):
+            if recipe_ids and rng.random() < 0.4:
+                items.append(dict(meal_id=meal_id, food_id=None, recipe_id=rng.choice(recipe_ids),
+                                  quantity=float(rng.randint(1, 2)), unit_name="portion"))
+            else:
+                items.append(dict(meal_id=meal_id, recipe_id=None, **_ingredient(rng, food_ids)))
+    _insert(db, MealItem.__table__, items)
+
+    logs = []
+    for day in range(scale.days):
+        log_date = FIRST_LOG_DAY + timedelta(days=day)
+        for _ in range(rng.randint(scale.min_logs_per_day, scale.max_logs_per_day)):
+            kind = rng.random()
+            entry = dict(log_date=log_date, food_id=None, recipe_id=None, meal_id=None, grams=0.0)
+            if kind < 0.6 or not (recipe_ids and meal_ids):
+                entry.update(_ingredient(rng, food_ids))
+            elif kind < 0.85:
+                entry.update(recipe_id=rng.choice(recipe_ids), quantity=float(rng.randint(1, 3)), unit_name="portion")
+            else:
+                entry.update(meal_id=rng.choice(meal_ids), quantity=1.0, unit_name="meal")
+            logs.append(entry)
+    _insert(db, DailyLog.__table__, logs)
+    db.commit()
+
+    if materialize:
+        recipe_service = RecipeService(db, FoodService(db))
+        for recipe_id in recipe_ids:
+            recipe_service.refresh_nutrition(recipe_id)
+        db.commit()
+        # Inserted logs have no snapshot yet; this also builds the daily summary
+        backfill_log_snapshots(db)
+        db.commit()
+
+    return dict(
+        foods=len(food_ids), food_units=len(units), recipes=len(recipe_ids), recipe_ingredients=len(ingredients),
+        meals=len(meal_ids), meal_items=len(items), daily_logs=len(logs), days=scale.days,
+    )
+
+
+def write_food_csv(path: str, rows: int, seed: int = 0) -> None:
+    """Writes `rows` foods in the data/frutifica.csv layout, for FoodImportService."""
+    rng = random.Random(seed)
+    header = [
+        "nome", "peso_g", "porcao", "kcal", "proteina", "carboidrato", "gordura", "gordura_saturada",
+        "gordura_trans", "fibra", "sodio_mg", "acucar_total", "acucar_adicionado", "tipo_quantidade",
+    ]
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        for food_id in range(1, rows + 1):
+            food = _food_row(rng, food_id)
+            portion = rng.choice([100, 100, 100, 30, 50, 200])
+            per_portion = portion / 100.0
+            writer.writerow([
+                food["name"], rng.randint(30, 400), portion,
+                round(food["calories_100g"] * per_portion, 1), round(food["proteins_100g"] * per_portion, 1),
+                round(food["carbs_100g"] * per_portion, 1), round(food["fats_100g"] * per_portion, 1),
+                round(food["saturated_fats_100g"] * per_portion, 1), "", food["fiber_100g"] or "",
+                food["sodium_100g"], food["sugar_100g"], 0, rng.choice(["unidade", "fatia", "porção"]),
+            ])
+
+
+def scale_dict(scale: Scale) -> dict:
+    return asdict(scale)
@@ -1,6 +1,11 @@
-from typing import List, Optional
+from typing import Annotated, List, Optional
+from pydantic import Field
 from .base import BaseSchema
 
+# Nutrient amounts and portion sizes; NaN or infinity would poison every sum they enter
+Amount = Annotated[float, Field(ge=0, allow_inf_nan=False)]
+Portion = Annotated[float, Field(gt=0, allow_inf_nan=False)]
+
 class FoodUnitSchema(BaseSchema):
     id: Optional[int] = None
     food_id: Optional[int] = None
@@ -11,16 +16,16 @@ class FoodCreate(BaseSchema):
     name: str
     category: str
     unit_label: str
-    unit_val: float
-    calories: float
-    proteins: float
-    carbs: float
-    fats: float
-    saturated_fats: Optional[float] = None
-    trans_fats: Optional[float] = None
-    fiber: Optional[float] = None
-    sodium: Optional[float] = None
-    sugar: Optional[float] = None
+    unit_val: Portion
+    calories: Amount
+    proteins: Amount
+    carbs: Amount
+    fats: Amount
+    saturated_fats: Optional[Amount] = None
+    trans_fats: Optional[Amount] = None
+    fiber: Optional[Amount] = None
+    sodium: Optional[Amount] = None
+    sugar: Optional[Amount] = None
 
 class FoodSchema(BaseSchema):
     id: int
@@ -38,3 +43,12 @@ class FoodSchema(BaseSchema):
     sodium_100g: Optional[float] = None
     sugar_100g: Optional[float] = None
     units: List[FoodUnitSchema] = []
+
+class FoodSearchResult(BaseSchema):
+    id: int
+    name: str
+    category: str
+
+class SimilarFood(FoodSearchResult):
+    # Euclidean distance between nutrient profiles scaled by daily reference values
+    distance: float
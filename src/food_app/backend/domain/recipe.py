@@ -5,7 +5,8 @@ from .food import FoodSchema
 class RecipeIngredientSchema(BaseSchema):
     id: Optional[int] = None
     recipe_id: Optional[int] = None
-    food_id: int
+    food_id: Optional[int] = None
+    sub_recipe_id: Optional[int] = None
     quantity: float
     unit_name: str
     food: Optional[FoodSchema] = None
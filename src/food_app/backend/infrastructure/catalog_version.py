@@ -0,0 +1,80 @@
+"""Version stamp of the food catalog (foods and food_units), kept by triggers.
+
+The single catalog_version row holds a random id, drawn when the table is
+created, and a counter that every insert, update or delete on foods or
+food_units bumps. The pair identifies one state of one database's catalog,
+whatever path (services, the bulk importer, raw SQL) wrote it, so files
+derived from the catalog can tell whether they are still current.
+
+A second counter on the same row, recipe_version, moves on every write to
+the tables recipe and meal nutrition is computed from besides the catalog
+(recipes, their ingredients and materialized rows, meals and their items).
+Daily log writes move neither, so caches of computed nutrition can tell
+"something was logged" from "what a serving is worth changed".
+"""
+from typing import Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+CATALOG_TABLES = ("foods", "food_units")
+
+CATALOG_VERSION_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS catalog_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        catalog_id TEXT NOT NULL,
+        version INTEGER NOT NULL
+    )
+    """,
+    "INSERT OR IGNORE INTO catalog_version (id, catalog_id, version) VALUES (1, lower(hex(randomblob(8))), 0)",
+) + tuple(
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {table}_catalog_version_{suffix} AFTER {event} ON {table} BEGIN
+        UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+    END
+    """
+    for table in CATALOG_TABLES
+    for suffix, event in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+)
+
+RECIPE_TABLES = ("recipes", "recipe_ingredients", "recipe_nutrition", "meals", "meal_items")
+
+RECIPE_VERSION_TRIGGERS = tuple(
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {table}_recipe_version_{suffix} AFTER {event} ON {table} BEGIN
+        UPDATE catalog_version SET recipe_version = recipe_version + 1 WHERE id = 1;
+    END
+    """
+    for table in RECIPE_TABLES
+    for suffix, event in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+)
+
+
+def install_catalog_version(conn: Connection) -> None:
+    """Creates the version row and its triggers if missing."""
+    for statement in CATALOG_VERSION_DDL:
+        conn.exec_driver_sql(statement)
+
+
+def catalog_stamp(db) -> Tuple[str, int]:
+    """(catalog id, version) of the catalog as seen by `db`, a Session or Connection."""
+    catalog_id, version = db.execute(text("SELECT catalog_id, version FROM catalog_version WHERE id = 1")).one()
+    return catalog_id, version
+
+
+def install_recipe_version(conn: Connection) -> None:
+    """Adds the recipe_version counter and its triggers if missing."""
+    existing = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(catalog_version)")}
+    if "recipe_version" not in existing:
+        conn.exec_driver_sql("ALTER TABLE catalog_version ADD COLUMN recipe_version INTEGER NOT NULL DEFAULT 0")
+    for statement in RECIPE_VERSION_TRIGGERS:
+        conn.exec_driver_sql(statement)
+
+
+def content_stamps(db) -> Tuple[Tuple[str, int], int]:
+    """(catalog stamp, recipe version) as seen by `db`, read in one statement."""
+    catalog_id, version, recipe_version = db.execute(
+        text("SELECT catalog_id, version, recipe_version FROM catalog_version WHERE id = 1")
+    ).one()
+    return (catalog_id, version), recipe_version
@@ -1,13 +1,56 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 import os
+import sqlite3
+import threading
 
 from pathlib import Path
 
+from .sql_functions import register_sql_functions
+
 # Database configuration
 # Use YAZIO_DB_PATH environment variable or fallback to ./data/yazio.db
 DB_PATH = Path(os.getenv("YAZIO_DB_PATH", "data/yazio.db")).resolve()
 
+# Memory-mapped snapshot of the food catalog, shared by every process on the database.
+# Use YAZIO_CATALOG_PATH environment variable or fallback to the database path with a .catalog suffix
+CATALOG_PATH = Path(os.getenv("YAZIO_CATALOG_PATH", DB_PATH.with_suffix(".catalog"))).resolve()
+
+# Storage profile applied as PRAGMAs on every new connection.
+# Use YAZIO_DB_PROFILE environment variable or fallback to "balanced"
+DB_PROFILE = os.getenv("YAZIO_DB_PROFILE", "balanced")
+
+STORAGE_PROFILES = {
+    # SQLite defaults: rollback journal, synchronous=FULL, no mmap
+    "legacy": {},
+    # WAL lets readers proceed while a writer commits; NORMAL is durable across app crashes
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,  # negative = KiB
+        "busy_timeout": 5000,
+    },
+    # Every commit is fsynced, for machines that may lose power
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "mmap_size": 64 * 1024 * 1024,
+        "cache_size": -16 * 1024,
+        "busy_timeout": 10000,
+    },
+    # Bulk loading and benchmarks; a crash can lose the last transactions
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "mmap_size": 1024 * 1024 * 1024,
+        "cache_size": -256 * 1024,
+        "busy_timeout": 5000,
+        "temp_store": "MEMORY",
+    },
+}
+
 # Ensure the directory for the database exists
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
@@ -19,11 +62,63 @@ else:
     # On Unix, sqlite:////path/to/database.db
     SQLALCHEMY_DATABASE_URL = f"sqlite:////{DB_PATH}"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+def create_sqlite_engine(url: str, profile: str = DB_PROFILE, read_only: bool = False) -> Engine:
+    """Creates an engine whose connections carry the pragmas of a storage profile
+    and the app's SQL functions (see sql_functions).
+
+    With read_only=True every connection is set to query_only, so a stray write
+    through a read path fails instead of queueing behind the writer.
+    """
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile {profile!r}; expected one of {sorted(STORAGE_PROFILES)}")
+    pragmas = dict(STORAGE_PROFILES[profile])
+    if read_only:
+        # The journal mode is persistent and owned by the writer
+        pragmas.pop("journal_mode", None)
+        pragmas["query_only"] = "ON"
+
+    new_engine = create_engine(url, connect_args={"check_same_thread": False})
+
+    @event.listens_for(new_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        register_sql_functions(dbapi_connection)
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+    return new_engine
+
+class DataVersion:
+    """SQLite's PRAGMA data_version for an engine's database, read on a connection of its own.
+
+    The value moves whenever another connection commits. The connection is
+    opened outside the engine's pool, so one instance can be shared by any
+    number of clients without tying up pooled connections; reads are
+    serialized by a lock.
+    """
+
+    def __init__(self, bind: Engine):
+        self._conn = sqlite3.connect(bind.url.database, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def __call__(self) -> int:
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+engine = create_sqlite_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Separate pool for read paths (catalog listings, dashboard reads)
+read_engine = create_sqlite_engine(SQLALCHEMY_DATABASE_URL, read_only=True)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
 def get_db():
     db = SessionLocal()
     try:
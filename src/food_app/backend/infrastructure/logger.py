@@ -1,16 +1,179 @@
+import atexit
+import json
 import logging
 import os
+import queue
+import threading
 import time
-import traceback
-import functools
-from logging.handlers import RotatingFileHandler
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 
-def setup_logging():
-    """Configures the root logger with console and rotating file handlers."""
-    log_dir = Path("logs")
+# Call timing now lives in metrics; re-exported for the existing imports
+from .metrics import trace_execution  # noqa: F401
+
+# Pipeline settings; setup_logging arguments override them
+LOG_QUEUE_SIZE = int(os.getenv("YAZIO_LOG_QUEUE_SIZE", "10000"))
+# "drop_new" discards the incoming record when the queue is full, "drop_oldest" the oldest queued one
+LOG_OVERFLOW = os.getenv("YAZIO_LOG_OVERFLOW", "drop_new")
+LOG_JSON = os.getenv("YAZIO_LOG_JSON", "0") in ("1", "true", "on")
+# Records per second each logger may emit at each level before being suppressed; 0 disables
+LOG_RATE_LIMIT = float(os.getenv("YAZIO_LOG_RATE_LIMIT", "50"))
+LOG_RATE_BURST = int(os.getenv("YAZIO_LOG_RATE_BURST", "200"))
+# Directory of the rotating log file, relative to the working directory unless absolute
+LOG_DIR = os.getenv("YAZIO_LOG_DIR", "logs")
+
+OVERFLOW_POLICIES = ("drop_new", "drop_oldest")
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+_rate_filter: Optional["RateLimitFilter"] = None
+
+
+@dataclass(frozen=True)
+class LoggingStats:
+    queued: int
+    dropped: int
+    suppressed: int
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks the caller: a full queue drops a record and counts it.
+
+    Records are not formatted here; the listener thread's handlers do that,
+    so building tracebacks and message text is off the request path too.
+    """
+
+    def __init__(self, log_queue: queue.Queue, overflow: str = "drop_new"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow!r}; expected one of {OVERFLOW_POLICIES}")
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Freeze the arguments now, they may change before the listener runs
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self._unreported:
+            # Tells the log reader how much is missing, once there is room for it
+            notice = logging.makeLogRecord({
+                "name": __name__, "levelno": logging.WARNING, "levelname": "WARNING",
+                "msg": f"Log queue full: dropped {self._unreported} records",
+            })
+            try:
+                self.queue.put_nowait(notice)
+                self._unreported = 0
+            except queue.Full:
+                pass
+        self._put(record)
+
+    def _put(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        if self.overflow == "drop_oldest":
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+        self.dropped += 1
+        self._unreported += 1
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per (logger, level): `rate` records per second with bursts up to `burst`.
+
+    Suppressed records are counted and the next record let through says how
+    many of its kind were skipped.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.suppressed = 0
+        # key -> [tokens, last refill, suppressed since last pass]
+        self._buckets: Dict[Tuple[str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        now = time.monotonic()
+        key = (record.name, record.levelno)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                self.suppressed += 1
+                return False
+            bucket[0] -= 1.0
+            skipped, bucket[2] = bucket[2], 0
+        if skipped:
+            record.msg = f"{record.getMessage()} [{skipped} similar records suppressed]"
+            record.args = None
+        return True
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Blocks instead of raising when the queue is full, so shutdown still drains it
+        self.queue.put(self._sentinel)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, func, thread, message and exc when present."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "func": record.funcName,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(
+    json_lines: Optional[bool] = None,
+    queue_size: Optional[int] = None,
+    overflow: Optional[str] = None,
+    rate_limit: Optional[float] = None,
+    log_dir: Optional[str] = None,
+):
+    """Routes the root logger through a bounded queue to console and rotating file handlers.
+
+    The handlers run on a QueueListener thread, so callers only pay for
+    putting a record on the queue. Runs once per process (Streamlit re-executes
+    the app script on every interaction); call shutdown_logging() first to
+    reconfigure. Queued records are flushed at interpreter exit.
+    """
+    global _listener, _queue_handler, _rate_filter
+    if _listener is not None:
+        return
+
+    log_dir = Path(LOG_DIR if log_dir is None else log_dir)
     log_dir.mkdir(exist_ok=True)
-    log_file = log_dir / "app.log"
+    json_lines = LOG_JSON if json_lines is None else json_lines
+    log_file = log_dir / ("app.jsonl" if json_lines else "app.log")
 
     log_format = "[%(asctime)s] [%(levelname)s] [%(name)s] - [%(funcName)s] - %(message)s"
     formatter = logging.Formatter(log_format)
@@ -26,38 +189,50 @@ def setup_logging():
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
 
     # RotatingFileHandler: Output to logs/app.log (Max 5MB, 3 backups)
     file_handler = RotatingFileHandler(
         log_file, maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8"
     )
     file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
+    file_handler.setFormatter(JsonLinesFormatter() if json_lines else formatter)
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE if queue_size is None else queue_size)
+    _queue_handler = DroppingQueueHandler(log_queue, LOG_OVERFLOW if overflow is None else overflow)
+    rate_limit = LOG_RATE_LIMIT if rate_limit is None else rate_limit
+    if rate_limit > 0:
+        _rate_filter = RateLimitFilter(rate_limit, LOG_RATE_BURST)
+        _queue_handler.addFilter(_rate_filter)
+    root_logger.addHandler(_queue_handler)
+
+    _listener = _Listener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+
+def shutdown_logging():
+    """Drains the queue into the handlers and closes them; safe to call more than once."""
+    global _listener, _queue_handler, _rate_filter
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    logging.getLogger().removeHandler(_queue_handler)
+    # stop() enqueues a sentinel and waits until every record before it is handled
+    listener.stop()
+    for handler in listener.handlers:
+        handler.flush()
+        handler.close()
+    _queue_handler = _rate_filter = None
+
+def logging_stats() -> LoggingStats:
+    if _queue_handler is None:
+        return LoggingStats(0, 0, 0)
+    return LoggingStats(
+        queued=_queue_handler.queue.qsize(),
+        dropped=_queue_handler.dropped,
+        suppressed=_rate_filter.suppressed if _rate_filter else 0,
+    )
+
+atexit.register(shutdown_logging)
 
 def get_logger(name):
     """Utility to export a logger instance."""
     return logging.getLogger(name)
-
-def trace_execution(func):
-    """Decorator to log function execution start, end, and capture exceptions."""
-    logger = logging.getLogger(func.__module__)
-
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        func_name = func.__name__
-        logger.debug(f"Starting {func_name}...")
-        start_time = time.perf_counter()
-        try:
-            result = func(*args, **kwargs)
-            duration = time.perf_counter() - start_time
-            logger.debug(f"Finished {func_name} in {duration:.4f}s")
-            return result
-        except Exception as e:
-            error_msg = f"Exception in {func_name}: {str(e)}\n{traceback.format_exc()}"
-            logger.error(error_msg)
-            # User rule: add a debug log for every bug found
-            logger.debug(f"BUG DETECTED in {func_name}: {str(e)}")
-            raise e
-    return wrapper
@@ -0,0 +1,239 @@
+"""Versioned in-place schema upgrades, tracked in SQLite's PRAGMA user_version.
+
+create_all never alters existing tables, so indexes and columns added to the
+models reach older database files through these migrations. Steps must be
+idempotent: fresh databases run them too, right after create_all.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Callable, Sequence, Union
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Connection, Engine
+
+from .base import Base
+from . import models  # noqa: F401 - registers tables on Base.metadata
+from .catalog_version import install_catalog_version, install_recipe_version
+from .search_index import install_food_search
+from .sql_functions import unit_key
+
+logger = logging.getLogger(__name__)
+
+Step = Union[str, Callable[[Connection], None]]
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    steps: Sequence[Step]
+
+
+# alias -> canonical unit, seeded into unit_aliases; keys go through unit_key()
+DEFAULT_UNIT_ALIASES = {
+    "gram": "g", "grams": "g", "grama": "g", "gramas": "g", "gr": "g",
+    "milliliter": "ml", "milliliters": "ml", "millilitre": "ml", "mililitro": "ml", "mililitros": "ml",
+    "tbsp": "tablespoon", "tbs": "tablespoon", "tablespoons": "tablespoon",
+    "tsp": "teaspoon", "teaspoons": "teaspoon",
+    "cups": "cup", "slices": "slice", "units": "unit",
+    "colher": "colher de sopa", "colheres": "colher de sopa", "colheres de sopa": "colher de sopa",
+    "colheres de chá": "colher de chá",
+    "xícaras": "xícara", "copos": "copo", "fatias": "fatia",
+    "unidades": "unidade", "un": "unidade", "und": "unidade",
+}
+
+
+def seed_unit_aliases(conn: Connection) -> None:
+    models.UnitAlias.__table__.create(conn, checkfirst=True)
+    rows = [{"alias": unit_key(alias), "canonical": unit_key(canonical)} for alias, canonical in DEFAULT_UNIT_ALIASES.items()]
+    # Aliases edited by hand are kept
+    conn.execute(insert(models.UnitAlias).prefix_with("OR IGNORE"), rows)
+
+
+# Nutrient snapshot columns of daily_logs, filled by log_consumption or the opt-in backfill
+LOG_SNAPSHOT_COLUMNS = (
+    "calories", "proteins", "carbs", "fats",
+    "saturated_fats", "trans_fats", "fiber", "sodium", "sugar",
+)
+
+
+def add_log_snapshot_columns(conn: Connection) -> None:
+    existing = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(daily_logs)")}
+    for column in LOG_SNAPSHOT_COLUMNS:
+        if column not in existing:
+            conn.exec_driver_sql(f"ALTER TABLE daily_logs ADD COLUMN {column} FLOAT")
+
+
+def create_daily_summary(conn: Connection) -> None:
+    models.DailyNutritionSummary.__table__.create(conn, checkfirst=True)
+
+
+def add_sub_recipe_ingredients(conn: Connection) -> None:
+    existing = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(recipe_ingredients)")}
+    if "sub_recipe_id" in existing:
+        return
+    # SQLite can neither relax NOT NULL nor add a CHECK in place, so the table is rebuilt
+    conn.exec_driver_sql("ALTER TABLE recipe_ingredients RENAME TO recipe_ingredients_old")
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_recipe_ingredients_recipe_id")
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_recipe_ingredients_food_id")
+    models.RecipeIngredient.__table__.create(conn)
+    conn.exec_driver_sql(
+        "INSERT INTO recipe_ingredients (id, recipe_id, food_id, quantity, unit_name) "
+        "SELECT id, recipe_id, food_id, quantity, unit_name FROM recipe_ingredients_old"
+    )
+    conn.exec_driver_sql("DROP TABLE recipe_ingredients_old")
+
+
+# The SQL below is frozen as of migration 8; later changes to how the services
+# resolve units or compute nutrition do not apply to it.
+
+def _unit_grams_sql(row: str) -> str:
+    """Grams of a (food_id, quantity, unit_name) row, resolved like UnitResolver at migration 8."""
+    key = f"unit_key({row}.unit_name)"
+    canonical = f"coalesce((SELECT a.canonical FROM unit_aliases a WHERE a.alias = {key}), {key})"
+    unit_canonical = "coalesce((SELECT a.canonical FROM unit_aliases a WHERE a.alias = unit_key(fu.unit_name)), unit_key(fu.unit_name))"
+
+    def first_unit(condition: str) -> str:
+        return f"(SELECT fu.grams FROM food_units fu WHERE fu.food_id = {row}.food_id AND {condition} ORDER BY fu.id LIMIT 1)"
+
+    return (
+        f"CASE WHEN {canonical} IN ('g', 'ml') THEN {row}.quantity ELSE {row}.quantity * coalesce("
+        f"{first_unit(f'unit_key(fu.unit_name) = {key}')}, {first_unit(f'unit_key(fu.unit_name) = {canonical}')}, "
+        f"{first_unit(f'{unit_canonical} = {canonical}')}, 100.0) END"
+    )
+
+
+def _food_part_sql(grams: str) -> str:
+    return ", ".join(f"coalesce(f.{c}_100g, 0.0) * {grams} / 100.0 AS {c}" for c in LOG_SNAPSHOT_COLUMNS)
+
+
+def _recipe_part_sql(quantity: str) -> str:
+    return ", ".join(
+        f"CASE WHEN rn.weight_grams * {quantity} > 0 THEN rn.{c} * {quantity} ELSE 0.0 END AS {c}"
+        for c in (*LOG_SNAPSHOT_COLUMNS, "weight_grams")
+    )
+
+
+def fill_recipe_nutrition(conn: Connection) -> None:
+    """Materializes the recipe_nutrition rows missing for recipes stored before that table was kept current.
+
+    Such recipes have food ingredients only, so their summed foods are exact;
+    recipes with sub-recipes are left to RecipeService.
+    """
+    per_portion = ", ".join(
+        f"sum(coalesce(f.{c}_100g, 0.0) * ri.grams / 100.0) / r.portions_yield" for c in LOG_SNAPSHOT_COLUMNS
+    )
+    filled = conn.exec_driver_sql(f"""
+        INSERT INTO recipe_nutrition (recipe_id, {", ".join(LOG_SNAPSHOT_COLUMNS)}, weight_grams)
+        SELECT ri.recipe_id, {per_portion}, sum(ri.grams) / r.portions_yield
+        FROM (SELECT ri.recipe_id, ri.food_id, {_unit_grams_sql('ri')} AS grams FROM recipe_ingredients ri) ri
+        JOIN foods f ON f.id = ri.food_id
+        JOIN recipes r ON r.id = ri.recipe_id
+        WHERE r.portions_yield > 0
+          AND ri.recipe_id NOT IN (SELECT recipe_id FROM recipe_nutrition)
+          AND ri.recipe_id NOT IN (SELECT recipe_id FROM recipe_ingredients WHERE sub_recipe_id IS NOT NULL)
+        GROUP BY ri.recipe_id, r.portions_yield
+    """).rowcount
+    logger.info(f"Materialized nutrition of {filled} recipes")
+
+
+def fill_daily_summary(conn: Connection) -> None:
+    """Rebuilds daily_nutrition_summary from daily_logs, whose snapshot columns exist since migration 5.
+
+    Entries with a snapshot contribute it; older ones are computed from the
+    foods, recipe_nutrition rows and meals as they are now.
+    """
+    columns = (*LOG_SNAPSHOT_COLUMNS, "weight_grams")
+    meal_rows = f"SELECT mi.meal_id, mi.food_id, mi.recipe_id, mi.quantity, {_unit_grams_sql('mi')} AS grams FROM meal_items mi"
+    entry_values = ", ".join(
+        f"CASE WHEN l.calories IS NOT NULL THEN l.{snapshot} "
+        f"WHEN l.food_id IS NOT NULL THEN {food} "
+        f"WHEN l.recipe_id IS NOT NULL THEN coalesce(CASE WHEN rn.weight_grams * l.quantity > 0 "
+        f"THEN rn.{c} * l.quantity ELSE 0.0 END, 0.0) "
+        f"WHEN l.meal_id IS NOT NULL THEN coalesce(mt.{c} * l.quantity, 0.0) ELSE 0.0 END AS {c}"
+        for c, snapshot, food in [
+            *[(c, c, f"coalesce(f.{c}_100g, 0.0) * l.food_grams / 100.0") for c in LOG_SNAPSHOT_COLUMNS],
+            ("weight_grams", "grams", "CASE WHEN f.id IS NOT NULL THEN l.food_grams ELSE 0.0 END"),
+        ]
+    )
+    conn.exec_driver_sql("DELETE FROM daily_nutrition_summary")
+    conn.exec_driver_sql(f"""
+        WITH meal_rows AS ({meal_rows}),
+        meal_parts AS (
+            SELECT r.meal_id, {_food_part_sql('r.grams')}, r.grams AS weight_grams
+            FROM meal_rows r JOIN foods f ON f.id = r.food_id
+            UNION ALL
+            SELECT r.meal_id, {_recipe_part_sql('r.quantity')}
+            FROM meal_rows r JOIN recipe_nutrition rn ON rn.recipe_id = r.recipe_id
+            WHERE r.food_id IS NULL
+        ),
+        meal_totals AS (
+            SELECT meal_id, {", ".join(f"sum({c}) AS {c}" for c in columns)} FROM meal_parts GROUP BY meal_id
+        ),
+        entries AS (
+            SELECT l.log_date, {entry_values}
+            FROM (SELECT *, {_unit_grams_sql('daily_logs')} AS food_grams FROM daily_logs) l
+            LEFT OUTER JOIN foods f ON f.id = l.food_id
+            LEFT OUTER JOIN recipe_nutrition rn ON rn.recipe_id = l.recipe_id
+            LEFT OUTER JOIN meal_totals mt ON mt.meal_id = l.meal_id
+        )
+        INSERT INTO daily_nutrition_summary (log_date, entry_count, {", ".join(columns)})
+        SELECT log_date, count(*), {", ".join(f"sum({c})" for c in columns)} FROM entries GROUP BY log_date
+    """)
+    days = conn.exec_driver_sql("SELECT count(*) FROM daily_nutrition_summary").scalar()
+    logger.info(f"Summarized {days} logged days")
+
+
+MIGRATIONS = [
+    Migration(1, "Secondary indexes for date lookups and relationship loads", (
+        "CREATE INDEX IF NOT EXISTS ix_foods_is_active ON foods (is_active)",
+        "CREATE INDEX IF NOT EXISTS ix_recipe_ingredients_recipe_id ON recipe_ingredients (recipe_id)",
+        "CREATE INDEX IF NOT EXISTS ix_recipe_ingredients_food_id ON recipe_ingredients (food_id)",
+        "CREATE INDEX IF NOT EXISTS ix_meal_items_meal_id ON meal_items (meal_id)",
+        "CREATE INDEX IF NOT EXISTS ix_meal_items_food_id ON meal_items (food_id)",
+        "CREATE INDEX IF NOT EXISTS ix_meal_items_recipe_id ON meal_items (recipe_id)",
+        "CREATE INDEX IF NOT EXISTS ix_daily_logs_food_id ON daily_logs (food_id)",
+        "CREATE INDEX IF NOT EXISTS ix_daily_logs_recipe_id ON daily_logs (recipe_id)",
+        "CREATE INDEX IF NOT EXISTS ix_daily_logs_meal_id ON daily_logs (meal_id)",
+        "CREATE INDEX IF NOT EXISTS ix_daily_logs_log_date_id ON daily_logs (log_date, id)",
+    )),
+    Migration(2, "FTS5 food search index with sync triggers", (install_food_search,)),
+    Migration(3, "Global unit alias table with default synonyms", (seed_unit_aliases,)),
+    Migration(4, "Daily nutrition summary rollup", (create_daily_summary,)),
+    Migration(5, "Nutrient snapshot columns on daily_logs", (add_log_snapshot_columns,)),
+    Migration(6, "Recipes as ingredients of other recipes", (add_sub_recipe_ingredients,)),
+    Migration(7, "Catalog version stamp with triggers on foods and food_units", (install_catalog_version,)),
+    Migration(8, "Recipe nutrition and daily summary filled from existing rows", (fill_recipe_nutrition, fill_daily_summary)),
+    Migration(9, "Recipe version counter with triggers on recipe and meal tables", (install_recipe_version,)),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(conn: Connection) -> int:
+    return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def run_migrations(engine: Engine) -> int:
+    """Applies pending migrations, each in its own transaction; returns the resulting version."""
+    with engine.connect() as conn:
+        version = current_version(conn)
+    for migration in MIGRATIONS:
+        if migration.version <= version:
+            continue
+        logger.info(f"Applying schema migration {migration.version}: {migration.description}")
+        with engine.begin() as conn:
+            for step in migration.steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.exec_driver_sql(step)
+            conn.exec_driver_sql(f"PRAGMA user_version = {migration.version}")
+        version = migration.version
+    return version
+
+
+def init_db(engine: Engine) -> int:
+    """Creates missing tables, then upgrades the schema in place."""
+    Base.metadata.create_all(bind=engine)
+    return run_migrations(engine)
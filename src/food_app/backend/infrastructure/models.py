@@ -6,13 +6,16 @@ from sqlalchemy import (
     Date,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     UniqueConstraint,
 )
+from sqlalchemy import event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
+from .search_index import install_food_search
 
 
 class Food(Base):
@@ -22,7 +25,7 @@ class Food(Base):
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     category: Mapped[str] = mapped_column(String(128), nullable=False)
     is_liquid: Mapped[bool] = mapped_column(nullable=False)
-    is_active: Mapped[bool] = mapped_column(default=True, nullable=False)
+    is_active: Mapped[bool] = mapped_column(default=True, nullable=False, index=True)
     calories_100g: Mapped[float] = mapped_column(Float, nullable=False)
     proteins_100g: Mapped[float] = mapped_column(Float, nullable=False)
     carbs_100g: Mapped[float] = mapped_column(Float, nullable=False)
@@ -40,6 +43,10 @@ class Food(Base):
     )
 
 
+# A (re)created foods table gets fresh search triggers and an index rebuilt from it
+event.listen(Food.__table__, "after_create", lambda target, connection, **kw: install_food_search(connection))
+
+
 class FoodUnit(Base):
     __tablename__ = "food_units"
 
@@ -49,9 +56,19 @@ class FoodUnit(Base):
     grams: Mapped[float] = mapped_column(Float, nullable=False)
 
     food: Mapped["Food"] = relationship("Food", back_populates="units")
+    # uq_food_unit also serves lookups by food_id
     __table_args__ = (UniqueConstraint("food_id", "unit_name", name="uq_food_unit"),)
 
 
+class UnitAlias(Base):
+    """Global unit synonym, e.g. "tbsp" -> "tablespoon". Both sides are stored as unit_key() output."""
+
+    __tablename__ = "unit_aliases"
+
+    alias: Mapped[str] = mapped_column(String(64), primary_key=True)
+    canonical: Mapped[str] = mapped_column(String(64), nullable=False)
+
+
 class Recipe(Base):
     __tablename__ = "recipes"
 
@@ -61,21 +78,55 @@ class Recipe(Base):
     is_active: Mapped[bool] = mapped_column(default=True, nullable=False)
 
     ingredients: Mapped[List["RecipeIngredient"]] = relationship(
-        "RecipeIngredient", back_populates="recipe", cascade="all, delete-orphan"
+        "RecipeIngredient", back_populates="recipe", cascade="all, delete-orphan",
+        foreign_keys="RecipeIngredient.recipe_id",
+    )
+    nutrition: Mapped[Optional["RecipeNutrition"]] = relationship(
+        "RecipeNutrition", back_populates="recipe", cascade="all, delete-orphan", uselist=False
     )
 
 
+class RecipeNutrition(Base):
+    """Materialized per-portion nutrition of a recipe, kept current by RecipeService."""
+
+    __tablename__ = "recipe_nutrition"
+
+    recipe_id: Mapped[int] = mapped_column(ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True)
+    weight_grams: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    calories: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    proteins: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    carbs: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    fats: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    saturated_fats: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    trans_fats: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    fiber: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    sodium: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    sugar: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+    recipe: Mapped["Recipe"] = relationship("Recipe", back_populates="nutrition")
+
+
 class RecipeIngredient(Base):
     __tablename__ = "recipe_ingredients"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    recipe_id: Mapped[int] = mapped_column(ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False)
-    food_id: Mapped[int] = mapped_column(ForeignKey("foods.id", ondelete="CASCADE"), nullable=False)
+    recipe_id: Mapped[int] = mapped_column(ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False, index=True)
+    food_id: Mapped[Optional[int]] = mapped_column(ForeignKey("foods.id", ondelete="CASCADE"), nullable=True, index=True)
+    # Another recipe used as an ingredient; quantity counts its portions (or grams with a mass unit)
+    sub_recipe_id: Mapped[Optional[int]] = mapped_column(ForeignKey("recipes.id", ondelete="CASCADE"), nullable=True, index=True)
     quantity: Mapped[float] = mapped_column(Float, nullable=False)
     unit_name: Mapped[str] = mapped_column(String(64), nullable=False)
 
-    recipe: Mapped["Recipe"] = relationship("Recipe", back_populates="ingredients")
-    food: Mapped["Food"] = relationship("Food")
+    recipe: Mapped["Recipe"] = relationship("Recipe", back_populates="ingredients", foreign_keys=[recipe_id])
+    food: Mapped[Optional["Food"]] = relationship("Food")
+    sub_recipe: Mapped[Optional["Recipe"]] = relationship("Recipe", foreign_keys=[sub_recipe_id])
+
+    __table_args__ = (
+        CheckConstraint(
+            "(food_id IS NOT NULL AND sub_recipe_id IS NULL) OR (food_id IS NULL AND sub_recipe_id IS NOT NULL)",
+            name="ck_recipe_ingredient_single_source",
+        ),
+    )
 
 
 class Meal(Base):
@@ -94,9 +145,9 @@ class MealItem(Base):
     __tablename__ = "meal_items"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    meal_id: Mapped[int] = mapped_column(ForeignKey("meals.id", ondelete="CASCADE"), nullable=False)
-    food_id: Mapped[Optional[int]] = mapped_column(ForeignKey("foods.id", ondelete="CASCADE"), nullable=True)
-    recipe_id: Mapped[Optional[int]] = mapped_column(ForeignKey("recipes.id", ondelete="CASCADE"), nullable=True)
+    meal_id: Mapped[int] = mapped_column(ForeignKey("meals.id", ondelete="CASCADE"), nullable=False, index=True)
+    food_id: Mapped[Optional[int]] = mapped_column(ForeignKey("foods.id", ondelete="CASCADE"), nullable=True, index=True)
+    recipe_id: Mapped[Optional[int]] = mapped_column(ForeignKey("recipes.id", ondelete="CASCADE"), nullable=True, index=True)
     quantity: Mapped[float] = mapped_column(Float, nullable=False)
     unit_name: Mapped[str] = mapped_column(String(64), nullable=False)
 
@@ -117,12 +168,22 @@ class DailyLog(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     log_date: Mapped[date] = mapped_column(Date, nullable=False)
-    food_id: Mapped[Optional[int]] = mapped_column(ForeignKey("foods.id", ondelete="CASCADE"), nullable=True)
-    recipe_id: Mapped[Optional[int]] = mapped_column(ForeignKey("recipes.id", ondelete="CASCADE"), nullable=True)
-    meal_id: Mapped[Optional[int]] = mapped_column(ForeignKey("meals.id", ondelete="CASCADE"), nullable=True)
+    food_id: Mapped[Optional[int]] = mapped_column(ForeignKey("foods.id", ondelete="CASCADE"), nullable=True, index=True)
+    recipe_id: Mapped[Optional[int]] = mapped_column(ForeignKey("recipes.id", ondelete="CASCADE"), nullable=True, index=True)
+    meal_id: Mapped[Optional[int]] = mapped_column(ForeignKey("meals.id", ondelete="CASCADE"), nullable=True, index=True)
     quantity: Mapped[float] = mapped_column(Float, nullable=False)
     unit_name: Mapped[str] = mapped_column(String(64), nullable=False)
     grams: Mapped[float] = mapped_column(Float, nullable=False)
+    # Nutrition of the entry as logged; NULL on rows logged before snapshots existed
+    calories: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    proteins: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    carbs: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    fats: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    saturated_fats: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    trans_fats: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    fiber: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    sodium: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    sugar: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     food: Mapped[Optional["Food"]] = relationship("Food")
     recipe: Mapped[Optional["Recipe"]] = relationship("Recipe")
@@ -135,4 +196,25 @@ class DailyLog(Base):
             " OR (food_id IS NULL AND recipe_id IS NULL AND meal_id IS NOT NULL)",
             name="ck_daily_log_single_loggable",
         ),
+        # Day lookups, returned in insertion order
+        Index("ix_daily_logs_log_date_id", "log_date", "id"),
     )
+
+
+class DailyNutritionSummary(Base):
+    """Per-day nutrition totals, maintained by DailyLogService as entries are logged."""
+
+    __tablename__ = "daily_nutrition_summary"
+
+    log_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    entry_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    weight_grams: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    calories: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    proteins: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    carbs: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    fats: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    saturated_fats: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    trans_fats: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    fiber: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    sodium: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    sugar: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
@@ -0,0 +1,43 @@
+"""FTS5 index over foods.name and foods.category, kept in sync by triggers.
+
+unicode61 with remove_diacritics folds accents on both sides, so "feijao"
+finds "Feijão". Because triggers maintain the index, every write path
+(FoodService, the bulk importer, raw SQL) keeps it current.
+"""
+from sqlalchemy.engine import Connection
+
+FOOD_SEARCH_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS foods_fts USING fts5(
+        name, category,
+        content='foods', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='1 2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS foods_fts_ai AFTER INSERT ON foods BEGIN
+        INSERT INTO foods_fts(rowid, name, category) VALUES (new.id, new.name, new.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS foods_fts_ad AFTER DELETE ON foods BEGIN
+        INSERT INTO foods_fts(foods_fts, rowid, name, category) VALUES ('delete', old.id, old.name, old.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS foods_fts_au AFTER UPDATE OF name, category ON foods BEGIN
+        INSERT INTO foods_fts(foods_fts, rowid, name, category) VALUES ('delete', old.id, old.name, old.category);
+        INSERT INTO foods_fts(rowid, name, category) VALUES (new.id, new.name, new.category);
+    END
+    """,
+    # Name matches outweigh category matches; stored as the table's default rank
+    "INSERT INTO foods_fts(foods_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "INSERT INTO foods_fts(foods_fts) VALUES ('rebuild')",
+)
+
+
+def install_food_search(conn: Connection) -> None:
+    """Creates the index and its triggers if missing, then rebuilds it from foods."""
+    for statement in FOOD_SEARCH_DDL:
+        conn.exec_driver_sql(statement)
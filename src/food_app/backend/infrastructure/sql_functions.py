@@ -0,0 +1,20 @@
+"""Python functions registered on every SQLite connection, so SQL and service code share one definition."""
+import sqlite3
+import unicodedata
+from typing import Optional
+
+
+def unit_key(unit_name: Optional[str]) -> Optional[str]:
+    """Normalized unit name: accents stripped, case-folded, inner whitespace collapsed.
+
+    "Colher  de Chá" and "colher de cha" both become "colher de cha".
+    """
+    if unit_name is None:
+        return None
+    decomposed = unicodedata.normalize("NFKD", unit_name)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+def register_sql_functions(dbapi_connection: sqlite3.Connection) -> None:
+    dbapi_connection.create_function("unit_key", 1, unit_key, deterministic=True)
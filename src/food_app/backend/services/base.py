@@ -1,5 +1,17 @@
+from typing import Callable, List
 from sqlalchemy.orm import Session
 
+# Called with (kind, entity_id) after a service writes a row, e.g. ("food", 3)
+ChangeListener = Callable[[str, int], None]
+
 class BaseService:
     def __init__(self, db: Session):
         self.db = db
+        self._change_listeners: List[ChangeListener] = []
+
+    def add_change_listener(self, listener: ChangeListener) -> None:
+        self._change_listeners.append(listener)
+
+    def _notify_change(self, kind: str, entity_id: int) -> None:
+        for listener in self._change_listeners:
+            listener(kind, entity_id)
@@ -0,0 +1,159 @@
+"""Binary snapshot of the food catalog, memory-mapped by every process using it.
+
+The file holds each food's per-100g nutrients and its units as flat arrays
+behind a fixed header stamped with the catalog version (see
+infrastructure.catalog_version) it was exported at. Loading it maps the
+file read-only and takes array views of it, so opening costs no query and
+no per-food objects, and all processes on one machine share the pages
+through the OS page cache.
+
+Layout, little-endian, every section 8-byte aligned:
+
+    header            magic, format, catalog id, catalog version, foods, units, name bytes
+    food_ids          int64[foods], ascending
+    vectors           float64[foods + 1, VECTOR_SIZE]; row 0 is zeros, row i + 1 is food_ids[i]
+    unit_food_ids     int64[units], ascending; units of a food in id order
+    unit_grams        float64[units]
+    unit_name_ends    int64[units], end offsets into unit_names
+    unit_names        UTF-8, padded to 8 bytes
+
+vectors uses the NutrientEngine row layout (weight column = 100), so the
+engine gathers from the mapping directly.
+"""
+import logging
+import os
+import struct
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from sqlalchemy import func, select
+
+from ..infrastructure.catalog_version import catalog_stamp
+from ..infrastructure.models import Food, FoodUnit
+from .nutrient_engine import FOOD_NUTRIENT_COLUMNS, VECTOR_SIZE
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"FOODCAT\0"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sI4x16sqqqq")
+
+PathLike = Union[str, Path]
+
+
+def _padded(data: bytes) -> bytes:
+    return data + b"\0" * (-len(data) % 8)
+
+
+def export_catalog(db, path: PathLike) -> Tuple[str, int]:
+    """Writes the catalog seen by `db` (a Session or Connection) to `path`; returns its stamp.
+
+    The file is written next to `path` and renamed over it, so processes
+    that mapped the previous file keep reading it undisturbed.
+    """
+    # Read in one transaction, so the stamp matches the rows
+    catalog_id, version = catalog_stamp(db)
+    foods = db.execute(
+        select(Food.id, *[func.coalesce(col, 0.0) for col in FOOD_NUTRIENT_COLUMNS.values()]).order_by(Food.id)
+    ).all()
+    units = db.execute(
+        select(FoodUnit.food_id, FoodUnit.unit_name, FoodUnit.grams).order_by(FoodUnit.food_id, FoodUnit.id)
+    ).all()
+
+    vectors = np.zeros((len(foods) + 1, VECTOR_SIZE))
+    food_ids = np.zeros(len(foods), dtype=np.int64)
+    if foods:
+        ids, *columns = zip(*foods)
+        food_ids[:] = ids
+        vectors[1:, :-1] = np.column_stack(columns)
+        vectors[1:, -1] = 100.0
+    unit_food_ids, unit_names, unit_grams = zip(*units) if units else ((), (), ())
+    encoded = [name.encode("utf-8") for name in unit_names]
+    names = b"".join(encoded)
+
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as out:
+        out.write(_HEADER.pack(MAGIC, FORMAT_VERSION, catalog_id.encode("ascii"), version, len(foods), len(units), len(names)))
+        out.write(food_ids.astype("<i8").tobytes())
+        out.write(vectors.astype("<f8").tobytes())
+        out.write(np.array(unit_food_ids, dtype="<i8").tobytes())
+        out.write(np.array(unit_grams, dtype="<f8").tobytes())
+        out.write(np.cumsum([len(name) for name in encoded], dtype=np.int64).astype("<i8").tobytes())
+        out.write(_padded(names))
+    os.replace(tmp, path)
+    logger.info(f"Exported {len(foods)} foods and {len(units)} units to {path} at catalog version {version}")
+    return catalog_id, version
+
+
+class CatalogSnapshot:
+    """Read-only view of an exported catalog file; raises ValueError for files it cannot read."""
+
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+        self._map = np.memmap(self.path, dtype=np.uint8, mode="r")
+        if len(self._map) < _HEADER.size:
+            raise ValueError(f"{self.path} is not a catalog snapshot")
+        magic, file_format, catalog_id, version, foods, units, name_bytes = _HEADER.unpack_from(self._map)
+        if magic != MAGIC or file_format != FORMAT_VERSION:
+            raise ValueError(f"{self.path} is not a catalog snapshot of format {FORMAT_VERSION}")
+        expected = _HEADER.size + 8 * (foods + (foods + 1) * VECTOR_SIZE + 3 * units) + name_bytes + (-name_bytes % 8)
+        if len(self._map) != expected:
+            raise ValueError(f"{self.path} is truncated or corrupt")
+        self.stamp = (catalog_id.rstrip(b"\0").decode("ascii"), version)
+
+        self._offset = _HEADER.size
+        self.food_ids = self._take("<i8", foods)
+        self.vectors = self._take("<f8", (foods + 1) * VECTOR_SIZE).reshape(foods + 1, VECTOR_SIZE)
+        self._unit_food_ids = self._take("<i8", units)
+        self._unit_grams = self._take("<f8", units)
+        self._unit_name_ends = self._take("<i8", units)
+        self._unit_names = self._take("u1", name_bytes)
+
+    def _take(self, dtype: str, count: int) -> np.ndarray:
+        array = np.frombuffer(self._map, dtype=dtype, count=count, offset=self._offset)
+        self._offset += array.nbytes
+        return array
+
+    def __len__(self) -> int:
+        return len(self.food_ids)
+
+    def rows(self, food_ids: Sequence[int]) -> np.ndarray:
+        """Row of each food in `vectors`, 0 (the zero row) for foods not in the snapshot."""
+        ids = np.asarray(food_ids, dtype=np.int64)
+        if not len(self.food_ids):
+            return np.zeros(len(ids), dtype=np.intp)
+        positions = np.minimum(np.searchsorted(self.food_ids, ids), len(self.food_ids) - 1)
+        return np.where(self.food_ids[positions] == ids, positions + 1, 0).astype(np.intp)
+
+    def units(self, food_id: int) -> List[Tuple[str, float]]:
+        """(unit_name, grams) of a food's units in id order."""
+        start, end = np.searchsorted(self._unit_food_ids, [food_id, food_id + 1]).tolist()
+        if start == end:
+            return []
+        bounds = [int(self._unit_name_ends[start - 1]) if start else 0] + self._unit_name_ends[start:end].tolist()
+        blob = self._unit_names[bounds[0]:bounds[-1]].tobytes()
+        names = [blob[a - bounds[0]:b - bounds[0]].decode("utf-8") for a, b in zip(bounds, bounds[1:])]
+        return list(zip(names, self._unit_grams[start:end].tolist()))
+
+
+def current_catalog(db, path: PathLike) -> Optional[CatalogSnapshot]:
+    """The snapshot at `path` if it matches the catalog seen by `db`, re-exported first if not.
+
+    Returns None, and the services fall back to querying, when the file can
+    be neither read nor written.
+    """
+    stamp = catalog_stamp(db)
+    try:
+        snapshot = CatalogSnapshot(path)
+        if snapshot.stamp == stamp:
+            return snapshot
+    except (OSError, ValueError):
+        pass
+    try:
+        export_catalog(db, path)
+        return CatalogSnapshot(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Catalog snapshot unavailable, reading foods from the database: {e}")
+        return None
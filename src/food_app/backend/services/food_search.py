@@ -0,0 +1,66 @@
+import re
+from typing import List, Optional
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+from ..infrastructure.models import Food
+from ..domain.food import FoodSearchResult
+
+_TOKEN = re.compile(r"\w+")
+
+# bm25 has to score every match, so it is only used when the match set is small.
+# Broader queries (one or two typed letters) return name-initial matches instead.
+RANKED_MATCH_LIMIT = 1000
+
+# CROSS JOIN pins the FTS table as the outer loop; otherwise SQLite may
+# walk ix_foods_is_active and probe the index once per food. The category
+# filter sits next to the match, so it applies before LIMIT truncates.
+_COUNT_SQL = text("SELECT count(*) FROM (SELECT 1 FROM foods_fts WHERE foods_fts MATCH :match LIMIT :cap)")
+_RANKED_SQL = text("""
+    SELECT f.id, f.name, f.category
+    FROM foods_fts CROSS JOIN foods f ON f.id = foods_fts.rowid
+    WHERE foods_fts MATCH :match AND f.is_active = 1
+      AND (:category IS NULL OR f.category = :category)
+    ORDER BY foods_fts.rank
+    LIMIT :limit
+""")
+_UNRANKED_SQL = text("""
+    SELECT f.id, f.name, f.category
+    FROM foods_fts CROSS JOIN foods f ON f.id = foods_fts.rowid
+    WHERE foods_fts MATCH :match AND f.is_active = 1
+      AND (:category IS NULL OR f.category = :category)
+    LIMIT :limit
+""")
+
+
+def fts_query(query: str, anchor_first: bool = False) -> str:
+    """Turns free text into an FTS5 query: every word, quoted, as a prefix term (implicit AND).
+
+    With anchor_first the first word must also start the food's name.
+    """
+    terms = [f'"{token}"*' for token in _TOKEN.findall(query)]
+    if anchor_first and terms:
+        terms[0] = "{name}: ^" + terms[0]
+    return " ".join(terms)
+
+
+def search_foods(db: Session, query: str, limit: int = 20, category: Optional[str] = None) -> List[FoodSearchResult]:
+    """Ranked, accent-insensitive prefix matches over active foods, optionally in one category.
+
+    An empty query returns the first active foods by id, for browsing.
+    """
+    match = fts_query(query)
+    if not match:
+        stmt = select(Food.id, Food.name, Food.category).where(Food.is_active == True)
+        if category:
+            stmt = stmt.where(Food.category == category)
+        rows = db.execute(stmt.order_by(Food.id).limit(limit)).all()
+    elif db.execute(_COUNT_SQL, {"match": match, "cap": RANKED_MATCH_LIMIT + 1}).scalar() <= RANKED_MATCH_LIMIT:
+        rows = db.execute(_RANKED_SQL, {"match": match, "category": category, "limit": limit}).all()
+    else:
+        anchored = fts_query(query, anchor_first=True)
+        rows = db.execute(_UNRANKED_SQL, {"match": anchored, "category": category, "limit": limit}).all()
+        if len(rows) < limit:
+            seen = {row.id for row in rows}
+            extra = db.execute(_UNRANKED_SQL, {"match": match, "category": category, "limit": limit + len(rows)}).all()
+            rows += [row for row in extra if row.id not in seen][: limit - len(rows)]
+    return [FoodSearchResult(id=row.id, name=row.name, category=row.category) for row in rows]
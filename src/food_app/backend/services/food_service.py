@@ -1,55 +1,58 @@
-from typing import Optional
+from typing import List, Optional, Sequence, Tuple
 from sqlalchemy.orm import Session
 from .base import BaseService
 from ..infrastructure.models import Food, FoodUnit
 from ..domain.food import FoodCreate
+from ..infrastructure.catalog_version import catalog_stamp
 from ..infrastructure.logger import trace_execution
 from .nutrition_dataclass import NutritionPerServing
+from .catalog_snapshot import current_catalog
+from .nutrient_engine import NutrientEngine, to_nutrition
+from .unit_resolver import UnitResolver
 
 class FoodService(BaseService):
+    def __init__(self, db: Session, catalog=None):
+        """`catalog` is an optional CatalogSnapshot of the database, read instead of querying foods."""
+        super().__init__(db)
+        self.engine = NutrientEngine(db, catalog)
+        self.units = UnitResolver(db, catalog)
+
+    def check_catalog(self) -> None:
+        """Re-maps the catalog snapshot when the database's catalog moved past it.
+
+        invalidate() only hears of this session's writes; other connections
+        and processes show up in the catalog stamp. The stale snapshot is
+        replaced through current_catalog, which re-exports the file unless
+        another process already did.
+        """
+        catalog = self.engine.catalog
+        if catalog is None or catalog_stamp(self.db) == catalog.stamp:
+            return
+        fresh = current_catalog(self.db, catalog.path)
+        self.engine.set_catalog(fresh)
+        self.units.set_catalog(fresh)
+
     def _grams_for_food(self, food_id: int, quantity: float, unit_name: str) -> float:
-        unit_lower = unit_name.lower()
-        if unit_lower in ("g", "ml"):
-            return quantity
-        food = self.db.get(Food, food_id)
-        if not food:
-            return 0.0
-        unit_row = next((u for u in food.units if u.unit_name.lower() == unit_lower), None)
-        grams_per_unit = unit_row.grams if unit_row else 100.0
-        return quantity * grams_per_unit
+        return self.resolve_grams([(food_id, quantity, unit_name)])[0]
 
-    def _nutrition_for_grams(self, food: Food, grams: float) -> NutritionPerServing:
-        ratio = grams / 100.0
-        return NutritionPerServing(
-            calories=food.calories_100g * ratio,
-            proteins=food.proteins_100g * ratio,
-            carbs=food.carbs_100g * ratio,
-            fats=food.fats_100g * ratio,
-            weight_grams=grams,
-            saturated_fats=(food.saturated_fats_100g or 0.0) * ratio,
-            trans_fats=(food.trans_fats_100g or 0.0) * ratio,
-            fiber=(food.fiber_100g or 0.0) * ratio,
-            sodium=(food.sodium_100g or 0.0) * ratio,
-            sugar=(food.sugar_100g or 0.0) * ratio,
-        )
+    def resolve_grams(self, items: Sequence[Tuple[int, float, str]]) -> List[float]:
+        """Grams for each (food_id, quantity, unit_name), in input order; see UnitResolver."""
+        return self.units.resolve_grams(items)
 
     @trace_execution
     def calculate_nutrition(self, food_id: int, quantity: float, unit_name: str) -> NutritionPerServing:
-        food = self.db.get(Food, food_id)
-        if not food:
-            return NutritionPerServing(0.0, 0.0, 0.0, 0.0, 0.0)
+        """Grams from the unit resolver times the food's row of the nutrient matrix; zeros for unknown foods."""
         grams = self._grams_for_food(food_id, quantity, unit_name)
-        return self._nutrition_for_grams(food, grams)
+        return to_nutrition(self.engine.evaluate([food_id], [grams])[0])
 
-    @trace_execution
-    def create(self, data: FoodCreate) -> Food:
+    @staticmethod
+    def _normalized_values(data: FoodCreate) -> dict:
         is_liquid = data.unit_label.lower() in ("ml", "l")
         ratio_to_100 = 100.0 / data.unit_val
-        food = Food(
+        return dict(
             name=data.name,
             category=data.category,
             is_liquid=is_liquid,
-            is_active=True,
             calories_100g=data.calories * ratio_to_100,
             proteins_100g=data.proteins * ratio_to_100,
             carbs_100g=data.carbs * ratio_to_100,
@@ -60,11 +63,33 @@ class FoodService(BaseService):
             sodium_100g=data.sodium * ratio_to_100 if data.sodium is not None else None,
             sugar_100g=data.sugar * ratio_to_100 if data.sugar is not None else None,
         )
+
+    @trace_execution
+    def create(self, data: FoodCreate) -> Food:
+        food = Food(is_active=True, **self._normalized_values(data))
         self.db.add(food)
         self.db.flush()
         if data.unit_label.lower() not in ("g", "ml"):
             self.db.add(FoodUnit(food_id=food.id, unit_name=data.unit_label, grams=data.unit_val))
         self.db.flush()
+        self.units.invalidate(food.id)
+        self._notify_change("food", food.id)
+        return food
+
+    @trace_execution
+    def update(self, food_id: int, data: FoodCreate) -> Optional[Food]:
+        """Corrects a food's name, category and macros; dependents are notified."""
+        food = self.db.get(Food, food_id)
+        if not food:
+            return None
+        for attr, value in self._normalized_values(data).items():
+            setattr(food, attr, value)
+        self.db.flush()
+        self.engine.invalidate(food_id)
+        if data.unit_label.lower() not in ("g", "ml"):
+            self.add_unit(food_id, data.unit_label, data.unit_val)
+        else:
+            self._notify_change("food", food_id)
         return food
 
     def add_unit(self, food_id: int, unit_name: str, grams: float) -> FoodUnit:
@@ -75,8 +100,16 @@ class FoodService(BaseService):
         )
         if existing:
             existing.grams = grams
+            self.db.flush()
+            self.units.invalidate(food_id)
+            self._notify_change("food", food_id)
             return existing
         unit = FoodUnit(food_id=food_id, unit_name=unit_name, grams=grams)
         self.db.add(unit)
         self.db.flush()
+        food = self.db.get(Food, food_id)
+        if food is not None:
+            self.db.expire(food, ["units"])
+        self.units.invalidate(food_id)
+        self._notify_change("food", food_id)
         return unit
@@ -0,0 +1,158 @@
+"""Foods with a similar nutrition profile, for swapping ingredients.
+
+Each active food is a point made of its nine per-100g nutrients, each
+divided by a daily reference value, so a distance of 0.1 means a tenth of
+a day's worth of some nutrient and sodium's milligrams weigh no more than
+the grams of anything else. Points sit in a k-d tree per scope (the whole
+catalog, or one category), built on first use.
+
+Foods created or changed through a watched FoodService, and rows with an id
+above the highest one seen (bulk imports, other processes), are picked up
+before the next query. They are appended to a pending list that queries
+scan linearly, so a single new food never rebuilds a tree. A tree is
+rebuilt once its pending list outgrows REBUILD_FRACTION of it. Edits made
+to existing foods by other processes are not seen until clear().
+"""
+from typing import Dict, Iterable, List, Optional, Set
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from ..infrastructure.models import Food
+from ..domain.food import SimilarFood
+from .kd_tree import LEAF_SIZE, KDTree
+from .nutrient_engine import FOOD_NUTRIENT_COLUMNS, NUTRIENT_FIELDS
+
+# Reference daily values per nutrient (sodium in mg); trans fat has no official one
+REFERENCE_DAILY_VALUES = {
+    "calories": 2000.0, "proteins": 50.0, "carbs": 275.0, "fats": 78.0,
+    "saturated_fats": 20.0, "trans_fats": 2.0, "fiber": 28.0, "sodium": 2300.0, "sugar": 50.0,
+}
+# A tree is rebuilt when its pending points exceed this share of its size
+REBUILD_FRACTION = 0.1
+
+_SCALE = np.array([REFERENCE_DAILY_VALUES[f] for f in NUTRIENT_FIELDS])
+_ALL = None  # scope key of the whole-catalog tree
+
+
+class FoodSimilarityIndex:
+    def __init__(self, db: Session, *services):
+        """`services` are watched through their change listeners for created and edited foods."""
+        self.db = db
+        for service in services:
+            service.add_change_listener(self._on_change)
+        self.clear()
+
+    def clear(self) -> None:
+        self._vectors = np.zeros((1024, len(NUTRIENT_FIELDS)))
+        self._size = 0
+        self._food_ids: List[int] = []
+        self._categories: List[str] = []
+        # Current row of each indexed food; rows of edited or removed foods stay behind, skipped
+        self._row_of: Dict[int, int] = {}
+        self._removed: Set[int] = set()
+        self._trees: Dict[Optional[str], KDTree] = {}
+        self._pending: Dict[Optional[str], List[int]] = {}
+        self._dirty: Set[int] = set()
+        self._max_id: Optional[int] = None
+
+    def _on_change(self, kind: str, entity_id: int) -> None:
+        if kind == "food":
+            self._dirty.add(entity_id)
+
+    def _fetch(self, condition):
+        columns = [func.coalesce(col, 0.0) for col in FOOD_NUTRIENT_COLUMNS.values()]
+        stmt = select(Food.id, Food.category, Food.is_active, *columns).where(condition).order_by(Food.id)
+        return self.db.connection().execute(stmt).all()
+
+    def _remove(self, food_id: int) -> None:
+        row = self._row_of.pop(food_id, None)
+        if row is not None:
+            self._removed.add(row)
+
+    def _append(self, rows) -> None:
+        if not rows:
+            return
+        needed = self._size + len(rows)
+        if needed > len(self._vectors):
+            grown = np.zeros((max(needed, 2 * len(self._vectors)), len(NUTRIENT_FIELDS)))
+            grown[: self._size] = self._vectors[: self._size]
+            # Built trees keep reading the old matrix; the rows they index never change
+            self._vectors = grown
+        start = self._size
+        self._vectors[start:needed] = np.array([r[3:] for r in rows], dtype=np.float64) / _SCALE
+        self._size = needed
+        for offset, (food_id, category, *_) in enumerate(rows):
+            self._remove(food_id)
+            self._row_of[food_id] = start + offset
+            self._food_ids.append(food_id)
+            self._categories.append(category)
+            for scope, pending in self._pending.items():
+                if scope is _ALL or scope == category:
+                    pending.append(start + offset)
+
+    def _sync(self) -> None:
+        """Applies foods created or edited since the last query."""
+        newest = self.db.scalar(select(func.max(Food.id))) or 0
+        if self._max_id is None:
+            self._append(self._fetch((Food.is_active == True) & (Food.id <= newest)))
+            self._max_id = newest
+            self._dirty.clear()
+            return
+        changed: Dict[int, tuple] = {}
+        if newest > self._max_id:
+            changed.update((row[0], row) for row in self._fetch(Food.id > self._max_id))
+        if self._dirty:
+            dirty = list(self._dirty)
+            found = {row[0]: row for row in self._fetch(Food.id.in_(dirty))}
+            for food_id in dirty:
+                if food_id not in found:
+                    self._remove(food_id)
+            changed.update(found)
+        self._dirty.clear()
+        self._max_id = max(self._max_id, newest)
+        for food_id, row in changed.items():
+            if not row[2]:
+                self._remove(food_id)
+        self._append([row for row in changed.values() if row[2]])
+
+    def _tree(self, scope: Optional[str]) -> KDTree:
+        tree = self._trees.get(scope)
+        if tree is None or len(self._pending[scope]) > LEAF_SIZE + REBUILD_FRACTION * len(tree):
+            rows = [
+                row for row in self._row_of.values()
+                if scope is _ALL or self._categories[row] == scope
+            ]
+            tree = self._trees[scope] = KDTree(self._vectors, sorted(rows))
+            self._pending[scope] = []
+        return tree
+
+    def _names(self, food_ids: Iterable[int]) -> Dict[int, str]:
+        return dict(self.db.execute(select(Food.id, Food.name).where(Food.id.in_(list(food_ids)))).all())
+
+    def similar(self, food_id: int, limit: int = 10, same_category: bool = False) -> List[SimilarFood]:
+        """The `limit` active foods nearest to a food's profile, nearest first; [] for unknown foods."""
+        self._sync()
+        row = self._row_of.get(food_id)
+        if row is None or limit <= 0:
+            return []
+        scope = self._categories[row] if same_category else _ALL
+        tree = self._tree(scope)
+        query = self._vectors[row]
+        skip = self._removed | {row}
+        hits = tree.query(query, limit, skip)
+
+        pending = np.array([r for r in self._pending[scope] if r not in skip], dtype=np.intp)
+        if len(pending):
+            diff = self._vectors[pending] - query
+            hits = sorted(hits + list(zip(np.einsum("ij,ij->i", diff, diff).tolist(), pending.tolist())))[:limit]
+
+        names = self._names(self._food_ids[r] for _, r in hits)
+        return [
+            SimilarFood(
+                id=self._food_ids[r],
+                name=names.get(self._food_ids[r], ""),
+                category=self._categories[r],
+                distance=float(np.sqrt(distance)),
+            )
+            for distance, r in hits
+        ]
@@ -0,0 +1,124 @@
+import csv
+import itertools
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert
+from .base import BaseService
+from .food_service import FoodService
+from ..domain.food import FoodCreate
+from ..infrastructure.models import Food, FoodUnit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 5000
+# Invalid rows beyond this are counted but not kept, so memory stays flat
+MAX_REPORTED_ERRORS = 100
+
+# Optional CSV column -> FoodCreate field
+_OPTIONAL_COLUMNS = {
+    "gordura_saturada": "saturated_fats",
+    "gordura_trans": "trans_fats",
+    "fibra": "fiber",
+    "sodio_mg": "sodium",
+    "acucar_total": "sugar",
+}
+
+@dataclass
+class ImportStats:
+    rows: int = 0
+    invalid_rows: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+def _normalize_row(row: dict) -> Tuple[dict, Optional[dict]]:
+    """Validates one CSV row as a FoodCreate and maps it to (food values, unit values or None).
+
+    Values come out exactly as FoodService.create + add_unit would store
+    them. A blank tipo_quantidade means the food has no serving unit.
+    Raises ValueError for rows FoodCreate rejects.
+    """
+    try:
+        data = FoodCreate.model_validate(dict(
+            name=row.get("nome", ""),
+            category="Food",
+            unit_label="g",
+            unit_val=row.get("porcao", 0),
+            calories=row.get("kcal", 0),
+            proteins=row.get("proteina", 0),
+            carbs=row.get("carboidrato", 0),
+            fats=row.get("gordura", 0),
+            **{name: row[csv_col] for csv_col, name in _OPTIONAL_COLUMNS.items() if row.get(csv_col)},
+        ))
+    except ValidationError as e:
+        raise ValueError("; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())) from None
+    food = dict(is_active=True, **FoodService._normalized_values(data))
+    unit_name = (row.get("tipo_quantidade") or "").strip()
+    if not unit_name:
+        return food, None
+    grams = float(row.get("peso_g", 0))
+    if not math.isfinite(grams) or grams <= 0:
+        raise ValueError(f"invalid peso_g {grams!r}")
+    return food, dict(unit_name=unit_name, grams=grams)
+
+class FoodImportService(BaseService):
+    """Streams a food composition CSV into the catalog in bulk, one transaction per chunk."""
+
+    def _chunks(self, reader: csv.DictReader, chunk_size: int) -> Iterator[List[Tuple[int, dict]]]:
+        numbered = ((reader.line_num, row) for row in reader)
+        while True:
+            chunk = list(itertools.islice(numbered, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _write_chunk(self, foods: List[dict], units: List[Optional[dict]]) -> None:
+        food_table = Food.__table__
+        ids = self.db.execute(
+            insert(food_table).returning(food_table.c.id, sort_by_parameter_order=True), foods
+        ).scalars().all()
+        units = [dict(unit, food_id=food_id) for food_id, unit in zip(ids, units) if unit is not None]
+        if units:
+            self.db.execute(insert(FoodUnit.__table__), units)
+
+    def import_csv(self, csv_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = "utf-8") -> ImportStats:
+        stats = ImportStats()
+        start = time.perf_counter()
+        with open(csv_path, "r", encoding=encoding, newline="") as file:
+            for chunk in self._chunks(csv.DictReader(file), chunk_size):
+                foods, units = [], []
+                for line_no, row in chunk:
+                    try:
+                        food, unit = _normalize_row(row)
+                    except (TypeError, ValueError) as e:
+                        stats.invalid_rows += 1
+                        if len(stats.errors) < MAX_REPORTED_ERRORS:
+                            stats.errors.append((line_no, str(e)))
+                        continue
+                    foods.append(food)
+                    units.append(unit)
+                if foods:
+                    try:
+                        self._write_chunk(foods, units)
+                        self.db.commit()
+                    except Exception:
+                        self.db.rollback()
+                        raise
+                stats.rows += len(foods)
+                stats.chunks += 1
+                stats.seconds = time.perf_counter() - start
+                logger.info(f"Imported chunk {stats.chunks}: {stats.rows} rows ({stats.rows_per_sec:.0f} rows/s)")
+        stats.seconds = time.perf_counter() - start
+        for line_no, error in stats.errors:
+            logger.warning(f"Skipped {csv_path}:{line_no}: {error}")
+        if stats.invalid_rows > len(stats.errors):
+            logger.warning(f"... and {stats.invalid_rows - len(stats.errors)} more invalid rows")
+        return stats
@@ -0,0 +1,91 @@
+"""Static k-d tree for k-nearest-neighbour queries over a float64 point matrix.
+
+Nodes split the widest dimension of their points at the median and keep
+the points' bounding box, so a query descends towards the query point
+first and skips every subtree whose box is farther away than the current
+k-th best. Points are stored by index into the matrix given at build time.
+"""
+import heapq
+from typing import List, Sequence, Tuple
+import numpy as np
+
+# Leaves are scanned with one array operation, so fairly large ones beat deeper trees
+LEAF_SIZE = 64
+
+
+class KDTree:
+    def __init__(self, points: np.ndarray, indices: Sequence[int], leaf_size: int = LEAF_SIZE):
+        """Indexes points[indices]; queries return those indices."""
+        self.points = points
+        self.leaf_size = leaf_size
+        self.order = np.asarray(indices, dtype=np.intp).copy()
+        # Node arrays; children are -1 for leaves, which own order[start:end]
+        self._lo: List[np.ndarray] = []
+        self._hi: List[np.ndarray] = []
+        self._left: List[int] = []
+        self._right: List[int] = []
+        self._start: List[int] = []
+        self._end: List[int] = []
+        if len(self.order):
+            self._build(0, len(self.order))
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def _build(self, start: int, end: int) -> int:
+        node = len(self._lo)
+        block = self.points[self.order[start:end]]
+        lo, hi = block.min(axis=0), block.max(axis=0)
+        self._lo.append(lo)
+        self._hi.append(hi)
+        self._start.append(start)
+        self._end.append(end)
+        self._left.append(-1)
+        self._right.append(-1)
+        if end - start > self.leaf_size:
+            dim = int(np.argmax(hi - lo))
+            if hi[dim] > lo[dim]:
+                mid = (end - start) // 2
+                split = np.argpartition(block[:, dim], mid)
+                self.order[start:end] = self.order[start:end][split]
+                self._left[node] = self._build(start, start + mid)
+                self._right[node] = self._build(start + mid, end)
+        return node
+
+    def _box_distance(self, node: int, query: np.ndarray) -> float:
+        gap = np.maximum(self._lo[node] - query, 0.0) + np.maximum(query - self._hi[node], 0.0)
+        return float(gap @ gap)
+
+    def query(self, query: np.ndarray, k: int, skip=frozenset()) -> List[Tuple[float, int]]:
+        """Up to k (squared distance, index) pairs nearest to `query`, nearest first.
+
+        Indices in `skip` are never returned.
+        """
+        if not len(self.order) or k <= 0:
+            return []
+        # Max-heap of the best k so far, as (-distance, index)
+        best: List[Tuple[float, int]] = []
+        stack = [(self._box_distance(0, query), 0)]
+        while stack:
+            bound, node = stack.pop()
+            if len(best) == k and bound >= -best[0][0]:
+                continue
+            left, right = self._left[node], self._right[node]
+            if left < 0:
+                members = self.order[self._start[node]:self._end[node]]
+                diff = self.points[members] - query
+                for distance, index in zip(np.einsum("ij,ij->i", diff, diff).tolist(), members.tolist()):
+                    if index in skip:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, index))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, index))
+                continue
+            near, far = (self._box_distance(left, query), left), (self._box_distance(right, query), right)
+            if near[0] > far[0]:
+                near, far = far, near
+            # Popped last-in first: the nearer child is searched first
+            stack.append(far)
+            stack.append(near)
+        return sorted((-distance, index) for distance, index in best)
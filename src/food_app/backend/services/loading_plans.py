@@ -0,0 +1,63 @@
+"""Named relationship loading plans.
+
+Each plan is a tuple of loader options that loads an object graph in a fixed
+number of SELECTs (one per relationship level) instead of one lazy load per
+row, so nutrition for a recipe or meal costs the same number of queries
+whether it has two ingredients or two hundred.
+"""
+from typing import Optional, Sequence, TypeVar
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from ..infrastructure.models import Food, Recipe, RecipeIngredient, Meal, MealItem, DailyLog
+
+T = TypeVar("T")
+
+# Food with its custom units
+FOOD_WITH_UNITS = (selectinload(Food.units),)
+
+# Recipe with ingredients, their foods and the foods' units
+RECIPE_WITH_INGREDIENTS = (
+    selectinload(Recipe.ingredients).selectinload(RecipeIngredient.food).selectinload(Food.units),
+    joinedload(Recipe.nutrition),
+)
+
+# Meal with every item resolved: foods with units, recipes with their materialized nutrition
+MEAL_RESOLVED = (
+    selectinload(Meal.items).options(
+        selectinload(MealItem.food).selectinload(Food.units),
+        selectinload(MealItem.recipe).joinedload(Recipe.nutrition),
+    ),
+)
+
+# A day's log entries with whatever each one points at
+LOG_RESOLVED = (
+    selectinload(DailyLog.food).selectinload(Food.units),
+    selectinload(DailyLog.recipe).joinedload(Recipe.nutrition),
+    selectinload(DailyLog.meal),
+)
+
+LOADING_PLANS = {
+    "food_with_units": FOOD_WITH_UNITS,
+    "recipe_with_ingredients": RECIPE_WITH_INGREDIENTS,
+    "meal_resolved": MEAL_RESOLVED,
+    "log_resolved": LOG_RESOLVED,
+}
+
+
+def loading_options(plan: Optional[str]) -> tuple:
+    """Loader options of a named plan; None means the mapper defaults (lazy loading)."""
+    if plan is None:
+        return ()
+    try:
+        return LOADING_PLANS[plan]
+    except KeyError:
+        raise ValueError(f"unknown loading plan {plan!r}; expected one of {sorted(LOADING_PLANS)}") from None
+
+
+def load_one(db: Session, entity: type, entity_id: int, options: Sequence = ()) -> Optional[T]:
+    """Loads one row with the given plan.
+
+    Unlike Session.get, this runs the eager loaders even when the object
+    is already in the identity map with some relationships expired.
+    """
+    return db.scalars(select(entity).where(entity.id == entity_id).options(*options)).one_or_none()
@@ -1,10 +1,362 @@
-from datetime import date
+import math
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Set, Union
+import numpy as np
+from pydantic import ValidationError
+from sqlalchemy import bindparam, case, delete, func, insert, select, union_all, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, aliased
 from .base import BaseService
-from ..infrastructure.models import DailyLog
+from ..infrastructure.models import DailyLog, DailyNutritionSummary, Food, FoodUnit, Recipe, RecipeNutrition, Meal, MealItem, UnitAlias
 from ..domain.log import DailyLogCreate, LoggableType
 from .food_service import FoodService
 from .recipe_service import RecipeService
 from .meal_service import MealService
+from .nutrition_dataclass import DailyLogNutrition, DailyNutritionReport, DailySummary, NutritionPerServing
+from .unit_resolver import FALLBACK_UNIT_GRAMS, MASS_UNITS
+from .nutrient_engine import FOOD_NUTRIENT_COLUMNS, NUTRIENT_FIELDS, VECTOR_FIELDS, VECTOR_SIZE, to_nutrition, to_vector
+
+
+def _canonical_unit(key):
+    """SQL twin of UnitResolver.canonical: the alias target of a unit_key, or the key itself."""
+    aliases = aliased(UnitAlias)
+    return func.coalesce(select(aliases.canonical).where(aliases.alias == key).correlate_except(aliases).scalar_subquery(), key)
+
+
+def _grams_expr(food_id, quantity, unit_name):
+    """SQL twin of UnitResolver.resolve_grams, matching units in the same order and with the same fallback.
+
+    Only computes legacy entries inside a statement; snapshots are written
+    with grams from UnitResolver. Unknown foods are zeroed by the caller's
+    outer join rather than here.
+    """
+    key = func.unit_key(unit_name)
+    canonical = _canonical_unit(key)
+    food_unit_key = func.unit_key(FoodUnit.unit_name)
+
+    def first_unit_grams(condition):
+        return (
+            select(FoodUnit.grams)
+            .where(FoodUnit.food_id == food_id, condition)
+            .order_by(FoodUnit.id)
+            .limit(1)
+            .correlate_except(FoodUnit)
+            .scalar_subquery()
+        )
+
+    return case(
+        (canonical.in_(MASS_UNITS), quantity),
+        else_=quantity * func.coalesce(
+            first_unit_grams(food_unit_key == key),
+            first_unit_grams(food_unit_key == canonical),
+            first_unit_grams(_canonical_unit(food_unit_key) == canonical),
+            FALLBACK_UNIT_GRAMS,
+        ),
+    )
+
+
+def _food_nutrient(field: str, grams):
+    return func.coalesce(FOOD_NUTRIENT_COLUMNS[field], 0.0) * (grams / 100.0)
+
+
+def _scaled_portion(portion, field: str, quantity):
+    """Mirrors RecipeService.calculate_nutrition: zero when the served weight is not positive."""
+    return case(
+        (portion.c.weight_grams * quantity > 0, portion.c[field] * quantity),
+        else_=0.0,
+    )
+
+
+def _meal_totals_cte(recipe_portion):
+    """Total nutrition of every meal, summing its food and recipe items."""
+    rows = select(
+        MealItem.meal_id,
+        MealItem.food_id,
+        MealItem.recipe_id,
+        MealItem.quantity,
+        _grams_expr(MealItem.food_id, MealItem.quantity, MealItem.unit_name).label("grams"),
+    ).subquery()
+    food_part = (
+        select(
+            rows.c.meal_id,
+            *[_food_nutrient(f, rows.c.grams).label(f) for f in NUTRIENT_FIELDS],
+            rows.c.grams.label("weight_grams"),
+        )
+        .join(Food, Food.id == rows.c.food_id)
+    )
+    recipe_part = (
+        select(
+            rows.c.meal_id,
+            *[_scaled_portion(recipe_portion, f, rows.c.quantity).label(f) for f in NUTRIENT_FIELDS],
+            _scaled_portion(recipe_portion, "weight_grams", rows.c.quantity).label("weight_grams"),
+        )
+        .join(recipe_portion, recipe_portion.c.recipe_id == rows.c.recipe_id)
+        .where(rows.c.food_id.is_(None))
+    )
+    items = union_all(food_part, recipe_part).subquery()
+    return (
+        select(
+            items.c.meal_id,
+            *[func.sum(items.c[f]).label(f) for f in VECTOR_FIELDS],
+        )
+        .group_by(items.c.meal_id)
+        .cte("meal_totals")
+    )
+
+
+def _entry_name(logs, food=Food, recipe=Recipe, meal=Meal):
+    return case(
+        (logs.c.food_id.is_not(None), func.coalesce(food.name, "Unknown Food")),
+        (logs.c.recipe_id.is_not(None), func.coalesce(recipe.name, "Unknown Recipe")),
+        else_=func.coalesce(meal.name, "Unknown Meal"),
+    ).label("name")
+
+
+def _daily_nutrition_query(log_date: date, legacy_only: bool = False):
+    return _log_nutrition_query(log_date, log_date, legacy_only)
+
+
+def _log_nutrition_query(start: Optional[date], end: Optional[date], legacy_only: bool = False):
+    """Per-entry nutrition of the entries logged between start and end (inclusive; None = open).
+
+    Entries with a nutrient snapshot report it; older ones are computed from
+    the current foods, recipes and meals. legacy_only keeps just the latter.
+    """
+    # Materialized by RecipeService over the whole sub-recipe DAG
+    recipe_portion = RecipeNutrition.__table__
+    meal_totals = _meal_totals_cte(recipe_portion)
+    logs = select(
+        DailyLog.id,
+        DailyLog.log_date,
+        DailyLog.food_id,
+        DailyLog.recipe_id,
+        DailyLog.meal_id,
+        DailyLog.quantity,
+        DailyLog.unit_name,
+        DailyLog.grams,
+        *[getattr(DailyLog, f) for f in NUTRIENT_FIELDS],
+        _grams_expr(DailyLog.food_id, DailyLog.quantity, DailyLog.unit_name).label("food_grams"),
+    )
+    if start is not None:
+        logs = logs.where(DailyLog.log_date >= start)
+    if end is not None:
+        logs = logs.where(DailyLog.log_date <= end)
+    if legacy_only:
+        logs = logs.where(DailyLog.calories.is_(None))
+    logs = logs.subquery()
+
+    def per_entry(field: str):
+        if field == "weight_grams":
+            food_value = case((Food.id.is_not(None), logs.c.food_grams), else_=0.0)
+            snapshot = logs.c.grams
+        else:
+            food_value = _food_nutrient(field, logs.c.food_grams)
+            snapshot = logs.c[field]
+        return case(
+            (logs.c.calories.is_not(None), snapshot),
+            (logs.c.food_id.is_not(None), food_value),
+            (logs.c.recipe_id.is_not(None), func.coalesce(_scaled_portion(recipe_portion, field, logs.c.quantity), 0.0)),
+            (logs.c.meal_id.is_not(None), func.coalesce(meal_totals.c[field] * logs.c.quantity, 0.0)),
+            else_=0.0,
+        ).label(field)
+
+    return (
+        select(
+            logs.c.id,
+            logs.c.log_date,
+            logs.c.food_id,
+            logs.c.recipe_id,
+            logs.c.meal_id,
+            logs.c.quantity,
+            logs.c.unit_name,
+            _entry_name(logs),
+            *[per_entry(f) for f in VECTOR_FIELDS],
+        )
+        .outerjoin(Food, Food.id == logs.c.food_id)
+        .outerjoin(Recipe, Recipe.id == logs.c.recipe_id)
+        .outerjoin(Meal, Meal.id == logs.c.meal_id)
+        .outerjoin(recipe_portion, recipe_portion.c.recipe_id == logs.c.recipe_id)
+        .outerjoin(meal_totals, meal_totals.c.meal_id == logs.c.meal_id)
+        .order_by(logs.c.log_date, logs.c.id)
+    )
+
+
+def _daily_snapshot_query(log_date: date):
+    """A day's entries as stored: snapshot columns plus names, no nutrition computed.
+
+    Legacy entries come back with NULL nutrients.
+    """
+    logs = DailyLog.__table__
+    return (
+        select(
+            logs.c.id,
+            logs.c.food_id,
+            logs.c.recipe_id,
+            logs.c.meal_id,
+            logs.c.quantity,
+            logs.c.unit_name,
+            _entry_name(logs),
+            *[logs.c[f] for f in NUTRIENT_FIELDS],
+            logs.c.grams.label("weight_grams"),
+        )
+        .outerjoin(Food, Food.id == logs.c.food_id)
+        .outerjoin(Recipe, Recipe.id == logs.c.recipe_id)
+        .outerjoin(Meal, Meal.id == logs.c.meal_id)
+        .where(logs.c.log_date == log_date)
+        .order_by(logs.c.id)
+    )
+
+
+def daily_nutrition_report(db: Session, log_date: date) -> DailyNutritionReport:
+    """Per-entry nutrition and totals for one day, read from the entries' snapshots.
+
+    One statement when every entry has a snapshot; entries logged before
+    snapshots existed are computed by a second one. Only reads, so it can run
+    on a read-only session.
+    """
+    entries = []
+    rows = db.execute(_daily_snapshot_query(log_date)).mappings().all()
+    if any(row["calories"] is None for row in rows):
+        legacy = {row["id"]: row for row in db.execute(_daily_nutrition_query(log_date, legacy_only=True)).mappings()}
+        rows = [legacy.get(row["id"], row) for row in rows]
+    vectors = np.array([[row[f] for f in VECTOR_FIELDS] for row in rows], dtype=np.float64)
+    vectors = vectors.reshape(len(rows), len(VECTOR_FIELDS))
+    for row, vector in zip(rows, vectors):
+        if row["food_id"] is not None:
+            loggable_type, loggable_id = "food", row["food_id"]
+        elif row["recipe_id"] is not None:
+            loggable_type, loggable_id = "recipe", row["recipe_id"]
+        else:
+            loggable_type, loggable_id = "meal", row["meal_id"]
+        entries.append(DailyLogNutrition(
+            log_id=row["id"],
+            loggable_type=loggable_type,
+            loggable_id=loggable_id,
+            name=row["name"],
+            quantity=row["quantity"],
+            unit_name=row["unit_name"],
+            nutrition=to_nutrition(vector),
+        ))
+    return DailyNutritionReport(log_date=log_date, entries=entries, totals=to_nutrition(vectors.sum(axis=0)))
+
+
+def rebuild_daily_summary(db, start: Optional[date] = None, end: Optional[date] = None) -> int:
+    """Recomputes daily_nutrition_summary for a date range (None = open) from the logs; returns the day count.
+
+    Accepts a Session or a Connection and does not commit.
+    """
+    summary = DailyNutritionSummary.__table__
+    stale = delete(summary)
+    if start is not None:
+        stale = stale.where(summary.c.log_date >= start)
+    if end is not None:
+        stale = stale.where(summary.c.log_date <= end)
+    db.execute(stale)
+
+    entries = _log_nutrition_query(start, end).subquery()
+    per_day = select(
+        entries.c.log_date,
+        func.count().label("entry_count"),
+        *[func.sum(entries.c[f]).label(f) for f in VECTOR_FIELDS],
+    ).group_by(entries.c.log_date)
+    columns = ["log_date", "entry_count", *VECTOR_FIELDS]
+    db.execute(insert(summary).from_select(columns, per_day))
+    return db.execute(select(func.count()).select_from(per_day.subquery())).scalar()
+
+
+def backfill_log_snapshots(db: Session, start: Optional[date] = None, end: Optional[date] = None) -> int:
+    """Stores nutrient snapshots on legacy entries, computed from today's data; returns the rows updated.
+
+    Opt-in: it freezes values that were so far recomputed on every read.
+    Snapshots are computed by the services, like a batch logged today, so
+    grams come from UnitResolver. The touched days' summaries are rebuilt
+    as well. Does not commit.
+    """
+    logs = DailyLog.__table__
+    stmt = (
+        select(logs.c.id, logs.c.log_date, logs.c.food_id, logs.c.recipe_id, logs.c.meal_id, logs.c.quantity, logs.c.unit_name)
+        .where(logs.c.calories.is_(None))
+        .order_by(logs.c.log_date, logs.c.id)
+    )
+    if start is not None:
+        stmt = stmt.where(logs.c.log_date >= start)
+    if end is not None:
+        stmt = stmt.where(logs.c.log_date <= end)
+    rows = db.execute(stmt).all()
+    if not rows:
+        return 0
+    batch = [
+        DailyLogCreate.model_construct(
+            log_date=row.log_date,
+            loggable_type="food" if row.food_id is not None else "recipe" if row.recipe_id is not None else "meal",
+            loggable_id=row.food_id if row.food_id is not None else row.recipe_id if row.recipe_id is not None else row.meal_id,
+            quantity=row.quantity,
+            unit_name=row.unit_name,
+        )
+        for row in rows
+    ]
+    food_service = FoodService(db)
+    recipe_service = RecipeService(db, food_service)
+    meal_service = MealService(db, food_service, recipe_service)
+    vectors = DailyLogService(db, food_service, recipe_service, meal_service)._batch_vectors(batch)
+    db.execute(update(logs).where(logs.c.id == bindparam("log_id")), [
+        {"log_id": row.id, "grams": vector[-1], **dict(zip(NUTRIENT_FIELDS, vector[:-1]))}
+        for row, vector in zip(rows, vectors.tolist())
+    ])
+    rebuild_daily_summary(db, rows[0].log_date, rows[-1].log_date)
+    return len(rows)
+
+
+def range_summary(db: Session, start: date, end: date) -> List[DailySummary]:
+    """One DailySummary per day from start to end inclusive, zero-filled; reads one row per logged day."""
+    if end < start:
+        raise ValueError(f"end {end} is before start {start}")
+    rows = db.execute(
+        select(DailyNutritionSummary.log_date, DailyNutritionSummary.entry_count,
+               *[getattr(DailyNutritionSummary, f) for f in VECTOR_FIELDS])
+        .where(DailyNutritionSummary.log_date.between(start, end))
+    ).all()
+    by_day = {row.log_date: row for row in rows}
+    days = []
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        row = by_day.get(day)
+        if row is None:
+            days.append(DailySummary(log_date=day))
+        else:
+            days.append(DailySummary(
+                log_date=day,
+                entry_count=row.entry_count,
+                totals=NutritionPerServing(**{f: getattr(row, f) for f in VECTOR_FIELDS}),
+            ))
+    return days
+
+
+# Keeps the batch existence checks' IN (...) lists below SQLite's bound-parameter limit
+_ID_CHUNK = 5000
+
+LOGGABLE_MODELS = {"food": Food, "recipe": Recipe, "meal": Meal}
+
+
+@dataclass(frozen=True)
+class EntryError:
+    """Why the entry at `index` of a batch was rejected."""
+    index: int
+    message: str
+
+
+class BatchValidationError(ValueError):
+    """log_consumption_batch input with invalid entries; nothing of the batch was written."""
+
+    def __init__(self, errors: List[EntryError]):
+        super().__init__("; ".join(f"entry {e.index}: {e.message}" for e in errors))
+        self.errors = errors
+
+
+def _summary_row(log_date: date, entry_count: int, vector) -> dict:
+    return {"log_date": log_date, "entry_count": entry_count, **dict(zip(VECTOR_FIELDS, np.asarray(vector).tolist()))}
+
 
 class DailyLogService(BaseService):
     def __init__(self, db, food_service: FoodService, recipe_service: RecipeService, meal_service: MealService):
@@ -13,20 +365,30 @@ class DailyLogService(BaseService):
         self.recipe_service = recipe_service
         self.meal_service = meal_service
 
-    def _resolve_grams(self, loggable_type: LoggableType, loggable_id: int, quantity: float, unit_name: str) -> float:
+    def _entry_nutrition(self, loggable_type: LoggableType, loggable_id: int, quantity: float, unit_name: str) -> NutritionPerServing:
         if loggable_type == "food":
-            n = self.food_service.calculate_nutrition(loggable_id, quantity, unit_name)
-            return n.weight_grams
+            return self.food_service.calculate_nutrition(loggable_id, quantity, unit_name)
         if loggable_type == "recipe":
-            n = self.recipe_service.calculate_nutrition(loggable_id, quantity, unit_name)
-            return n.weight_grams
+            return self.recipe_service.calculate_nutrition(loggable_id, quantity, unit_name)
         if loggable_type == "meal":
-            n = self.meal_service.calculate_nutrition(loggable_id)
-            return n.weight_grams
-        return 0.0
+            # A meal is logged in servings of the whole meal
+            return to_nutrition(to_vector(self.meal_service.calculate_nutrition(loggable_id)) * quantity)
+        return NutritionPerServing(0.0, 0.0, 0.0, 0.0, 0.0)
+
+    def _resolve_grams(self, loggable_type: LoggableType, loggable_id: int, quantity: float, unit_name: str) -> float:
+        return self._entry_nutrition(loggable_type, loggable_id, quantity, unit_name).weight_grams
+
+    def _add_to_summary(self, rows: List[dict]) -> None:
+        """Adds entries to their days' summary rows, creating a row on each day's first entry."""
+        stmt = sqlite_insert(DailyNutritionSummary)
+        self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[DailyNutritionSummary.log_date],
+            set_={f: getattr(DailyNutritionSummary, f) + stmt.excluded[f] for f in ("entry_count",) + VECTOR_FIELDS},
+        ), rows)
 
     def log_consumption(self, data: DailyLogCreate) -> DailyLog:
-        grams = self._resolve_grams(data.loggable_type, data.loggable_id, data.quantity, data.unit_name)
+        nutrition = self._entry_nutrition(data.loggable_type, data.loggable_id, data.quantity, data.unit_name)
+        grams = nutrition.weight_grams
         
         food_id = data.loggable_id if data.loggable_type == "food" else None
         recipe_id = data.loggable_id if data.loggable_type == "recipe" else None
@@ -40,7 +402,118 @@ class DailyLogService(BaseService):
             quantity=data.quantity,
             unit_name=data.unit_name,
             grams=grams,
+            **{f: getattr(nutrition, f) for f in NUTRIENT_FIELDS},
         )
         self.db.add(entry)
         self.db.flush()
+        self._add_to_summary([_summary_row(data.log_date, 1, to_vector(nutrition))])
         return entry
+
+    def _existing_ids(self, model, ids: Set[int]) -> Set[int]:
+        ids = list(ids)
+        found = set()
+        for start in range(0, len(ids), _ID_CHUNK):
+            found.update(self.db.scalars(select(model.id).where(model.id.in_(ids[start:start + _ID_CHUNK]))))
+        return found
+
+    def _validate_batch(self, entries: Sequence[Union[DailyLogCreate, dict]]) -> List[DailyLogCreate]:
+        """Parses and checks every entry, raising BatchValidationError with all failures at once."""
+        parsed, errors = [], []
+        for index, entry in enumerate(entries):
+            try:
+                data = entry if isinstance(entry, DailyLogCreate) else DailyLogCreate.model_validate(entry)
+            except ValidationError as e:
+                details = "; ".join(f"{'.'.join(map(str, err['loc'])) or 'entry'}: {err['msg']}" for err in e.errors())
+                errors.append(EntryError(index, details))
+                continue
+            if not math.isfinite(data.quantity) or data.quantity <= 0:
+                errors.append(EntryError(index, f"quantity must be positive, got {data.quantity}"))
+            parsed.append((index, data))
+        for loggable_type, model in LOGGABLE_MODELS.items():
+            ids = {data.loggable_id for _, data in parsed if data.loggable_type == loggable_type}
+            missing = ids - self._existing_ids(model, ids) if ids else set()
+            errors.extend(
+                EntryError(index, f"{loggable_type} {data.loggable_id} does not exist")
+                for index, data in parsed if data.loggable_type == loggable_type and data.loggable_id in missing
+            )
+        if errors:
+            raise BatchValidationError(sorted(errors, key=lambda e: e.index))
+        return [data for _, data in parsed]
+
+    def _batch_vectors(self, batch: List[DailyLogCreate]) -> np.ndarray:
+        """One nutrient vector per entry; all food entries are resolved in a single grams + matrix pass."""
+        vectors = np.zeros((len(batch), VECTOR_SIZE))
+        foods = [i for i, data in enumerate(batch) if data.loggable_type == "food"]
+        if foods:
+            grams = self.food_service.resolve_grams(
+                [(batch[i].loggable_id, batch[i].quantity, batch[i].unit_name) for i in foods]
+            )
+            vectors[foods] = self.food_service.engine.evaluate([batch[i].loggable_id for i in foods], grams)
+        recipe_ids = list({data.loggable_id for data in batch if data.loggable_type == "recipe"})
+        for start in range(0, len(recipe_ids), _ID_CHUNK):
+            # Puts the materialized rows in the identity map, so the per-entry lookups below issue no SQL
+            chunk = recipe_ids[start:start + _ID_CHUNK]
+            self.db.scalars(select(RecipeNutrition).where(RecipeNutrition.recipe_id.in_(chunk))).all()
+        for i, data in enumerate(batch):
+            if data.loggable_type == "recipe":
+                vectors[i] = self.recipe_service.scaled_vector(data.loggable_id, data.quantity)
+            elif data.loggable_type == "meal":
+                # Cached per meal by MealService
+                vectors[i] = to_vector(self.meal_service.calculate_nutrition(data.loggable_id)) * data.quantity
+        return vectors
+
+    def log_consumption_batch(self, entries: Sequence[Union[DailyLogCreate, dict]]) -> List[DailyLog]:
+        """Logs many entries at once, all or nothing, returning them in input order.
+
+        Every entry is validated before anything is written; any failure
+        raises BatchValidationError listing the rejected entries by index.
+        The rows go in with one bulk INSERT and each touched day's summary
+        is updated once.
+        """
+        batch = self._validate_batch(entries)
+        if not batch:
+            return []
+        vectors = self._batch_vectors(batch)
+        rows = [
+            {
+                "log_date": data.log_date,
+                "food_id": data.loggable_id if data.loggable_type == "food" else None,
+                "recipe_id": data.loggable_id if data.loggable_type == "recipe" else None,
+                "meal_id": data.loggable_id if data.loggable_type == "meal" else None,
+                "quantity": data.quantity,
+                "unit_name": data.unit_name,
+                "grams": vector[-1],
+                **dict(zip(NUTRIENT_FIELDS, vector[:-1])),
+            }
+            for data, vector in zip(batch, vectors.tolist())
+        ]
+        # sort_by_parameter_order would make SQLite fall back to one INSERT per row. Rowids are
+        # handed out in VALUES order, so sorting by id restores the input order instead.
+        # render_nulls keeps rows with different NULL columns in the same statement
+        stmt = insert(DailyLog).returning(DailyLog).execution_options(render_nulls=True)
+        logs = sorted(self.db.scalars(stmt, rows), key=lambda log: log.id)
+
+        days: Dict[date, List] = {}
+        for data, vector in zip(batch, vectors):
+            day = days.setdefault(data.log_date, [0, np.zeros(VECTOR_SIZE)])
+            day[0] += 1
+            day[1] += vector
+        self._add_to_summary([_summary_row(log_date, count, total) for log_date, (count, total) in days.items()])
+        return logs
+
+    def delete_log(self, log_id: int) -> bool:
+        """Deletes a log entry and recomputes its day's summary."""
+        entry = self.db.get(DailyLog, log_id)
+        if entry is None:
+            return False
+        log_date = entry.log_date
+        self.db.delete(entry)
+        self.db.flush()
+        rebuild_daily_summary(self.db, log_date, log_date)
+        return True
+
+    def get_daily_nutrition(self, log_date: date) -> DailyNutritionReport:
+        return daily_nutrition_report(self.db, log_date)
+
+    def get_range_summary(self, start: date, end: date) -> List[DailySummary]:
+        return range_summary(self.db, start, end)
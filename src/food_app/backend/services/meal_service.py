@@ -1,9 +1,24 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Set, Tuple
 from .base import BaseService
 from ..infrastructure.models import Meal, MealItem
 from ..infrastructure.logger import trace_execution
 from .nutrition_dataclass import NutritionPerServing
+from .nutrient_engine import to_nutrition
 from .food_service import FoodService
 from .recipe_service import RecipeService
+from .loading_plans import MEAL_RESOLVED, load_one
+
+# ("food", id) or ("recipe", id): a row a cached meal was computed from
+Dependency = Tuple[str, int]
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
 
 class MealService(BaseService):
     def __init__(self, db, food_service: FoodService, recipe_service: RecipeService):
@@ -11,55 +26,89 @@ class MealService(BaseService):
         self.food_service = food_service
         self.recipe_service = recipe_service
 
+        # Memoized meal nutrition plus the dependency graph used to evict it
+        self._cache: Dict[int, NutritionPerServing] = {}
+        self._dependencies: Dict[int, Set[Dependency]] = {}
+        self._dependents: Dict[Dependency, Set[int]] = defaultdict(set)
+        self._hits = self._misses = self._evictions = 0
+
+        # Food changes cover food_units; recipe changes are re-published by
+        # RecipeService for every recipe that uses the changed food.
+        self.food_service.add_change_listener(self._on_dependency_changed)
+        self.recipe_service.add_change_listener(self._on_dependency_changed)
+
+    def _on_dependency_changed(self, kind: str, entity_id: int) -> None:
+        for meal_id in list(self._dependents.get((kind, entity_id), ())):
+            self._evict(meal_id)
+
+    def _evict(self, meal_id: int) -> None:
+        if self._cache.pop(meal_id, None) is not None:
+            self._evictions += 1
+        for dep in self._dependencies.pop(meal_id, ()):
+            meal_ids = self._dependents.get(dep)
+            if meal_ids is not None:
+                meal_ids.discard(meal_id)
+                if not meal_ids:
+                    del self._dependents[dep]
+
+    def _store(self, meal_id: int, nutrition: NutritionPerServing, dependencies: Set[Dependency]) -> None:
+        self._cache[meal_id] = nutrition
+        self._dependencies[meal_id] = dependencies
+        for dep in dependencies:
+            self._dependents[dep].add(meal_id)
+
+    def cache_stats(self) -> CacheStats:
+        return CacheStats(self._hits, self._misses, self._evictions, len(self._cache))
+
+    def clear_cache(self) -> None:
+        for meal_id in list(self._cache):
+            self._evict(meal_id)
+
     @trace_execution
     def calculate_nutrition(self, meal_id: int) -> NutritionPerServing:
-        meal = self.db.get(Meal, meal_id)
+        cached = self._cache.get(meal_id)
+        if cached is not None:
+            self._hits += 1
+            return cached
+        self._misses += 1
+
+        meal = load_one(self.db, Meal, meal_id, MEAL_RESOLVED)
         if not meal or not meal.items:
-            return NutritionPerServing(0.0, 0.0, 0.0, 0.0, 0.0)
-            
-        total_cal = total_prot = total_carb = total_fat = total_w = 0.0
-        total_sat = total_trans = total_fib = total_sod = total_sug = 0.0
-        
-        for item in meal.items:
-            if item.food_id:
-                n = self.food_service.calculate_nutrition(item.food_id, item.quantity, item.unit_name)
-            elif item.recipe_id:
-                n = self.recipe_service.calculate_nutrition(item.recipe_id, item.quantity, item.unit_name)
-            else:
-                continue
-                
-            total_cal += n.calories
-            total_prot += n.proteins
-            total_carb += n.carbs
-            total_fat += n.fats
-            total_w += n.weight_grams
-            total_sat += n.saturated_fats
-            total_trans += n.trans_fats
-            total_fib += n.fiber
-            total_sod += n.sodium
-            total_sug += n.sugar
-            
-        return NutritionPerServing(
-            calories=total_cal,
-            proteins=total_prot,
-            carbs=total_carb,
-            fats=total_fat,
-            weight_grams=total_w,
-            saturated_fats=total_sat,
-            trans_fats=total_trans,
-            fiber=total_fib,
-            sodium=total_sod,
-            sugar=total_sug,
+            nutrition = NutritionPerServing(0.0, 0.0, 0.0, 0.0, 0.0)
+            self._store(meal_id, nutrition, set())
+            return nutrition
+
+        dependencies: Set[Dependency] = set()
+        food_items = [item for item in meal.items if item.food_id]
+        recipe_items = [item for item in meal.items if not item.food_id and item.recipe_id]
+
+        grams = self.food_service.resolve_grams(
+            [(item.food_id, item.quantity, item.unit_name) for item in food_items]
         )
+        total = self.food_service.engine.total([item.food_id for item in food_items], grams)
+        for item in recipe_items:
+            total += self.recipe_service.scaled_vector(item.recipe_id, item.quantity)
+
+        dependencies.update(("food", item.food_id) for item in food_items)
+        dependencies.update(("recipe", item.recipe_id) for item in recipe_items)
+        nutrition = to_nutrition(total)
+        self._store(meal_id, nutrition, dependencies)
+        return nutrition
 
     def create(self, name: str) -> Meal:
         meal = Meal(name=name)
         self.db.add(meal)
         self.db.flush()
+        self._evict(meal.id)
         return meal
 
     def add_item(self, meal_id: int, quantity: float, unit_name: str, food_id: int = None, recipe_id: int = None) -> MealItem:
         item = MealItem(meal_id=meal_id, food_id=food_id, recipe_id=recipe_id, quantity=quantity, unit_name=unit_name)
         self.db.add(item)
         self.db.flush()
+        meal = self.db.get(Meal, meal_id)
+        if meal is not None:
+            self.db.expire(meal, ["items"])
+        self._evict(meal_id)
+        self._notify_change("meal", meal_id)
         return item
@@ -0,0 +1,177 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from ..infrastructure.models import Food
+from .nutrition_dataclass import NutritionPerServing
+
+# Column order of every nutrient vector; the last column carries weight in grams
+NUTRIENT_FIELDS = (
+    "calories", "proteins", "carbs", "fats",
+    "saturated_fats", "trans_fats", "fiber", "sodium", "sugar",
+)
+VECTOR_FIELDS = NUTRIENT_FIELDS + ("weight_grams",)
+VECTOR_SIZE = len(VECTOR_FIELDS)
+
+# NutritionPerServing field -> per-100g column on Food
+FOOD_NUTRIENT_COLUMNS = {
+    "calories": Food.calories_100g,
+    "proteins": Food.proteins_100g,
+    "carbs": Food.carbs_100g,
+    "fats": Food.fats_100g,
+    "saturated_fats": Food.saturated_fats_100g,
+    "trans_fats": Food.trans_fats_100g,
+    "fiber": Food.fiber_100g,
+    "sodium": Food.sodium_100g,
+    "sugar": Food.sugar_100g,
+}
+
+# Keeps IN (...) lists well below SQLite's bound-parameter limit
+_LOAD_CHUNK = 5000
+
+
+def zero_vector() -> np.ndarray:
+    return np.zeros(VECTOR_SIZE)
+
+
+def to_nutrition(vector: np.ndarray) -> NutritionPerServing:
+    """Converts a nutrient vector back to the dataclass returned by the services."""
+    return NutritionPerServing(**dict(zip(VECTOR_FIELDS, vector.tolist())))
+
+
+def to_vector(nutrition) -> np.ndarray:
+    """Reads the VECTOR_FIELDS attributes of a NutritionPerServing-like object."""
+    return np.array([getattr(nutrition, f) for f in VECTOR_FIELDS], dtype=np.float64)
+
+
+class NutrientEngine:
+    """Per-100g food nutrition held as rows of a float64 matrix.
+
+    Row 0 is all zeros and stands in for unknown foods, so a batch of
+    (food_id, grams) pairs becomes one gather plus one matrix product.
+    Every other row ends with 100.0 in the weight column, which makes the
+    same product also return the total grams of the foods that exist.
+
+    Given a CatalogSnapshot of the current database, foods in it are read
+    from its mapped rows instead of queried; only foods missing from it, or
+    invalidated since, get rows of their own, numbered after the snapshot's.
+    """
+
+    def __init__(self, db: Session, catalog=None):
+        self.db = db
+        self.catalog = catalog
+        # Foods changed since the snapshot was taken; survives clear(), which drops only this process's rows
+        self._changed: set = set()
+        self.clear()
+
+    def clear(self) -> None:
+        self._rows: Dict[int, int] = {}
+        self._matrix = np.zeros((64, VECTOR_SIZE))
+        self._size = 1
+        self._stale: set = set()
+        self._base = len(self.catalog.vectors) if self.catalog is not None else 0
+
+    def set_catalog(self, catalog) -> None:
+        """Reads another snapshot (or none) from now on; everything tracked against the old one is dropped."""
+        self.catalog = catalog
+        self._changed = set()
+        self.clear()
+
+    def invalidate(self, food_id: int) -> None:
+        if food_id in self._rows:
+            self._stale.add(food_id)
+        elif self.catalog is not None:
+            self._changed.add(food_id)
+
+    def _append_row(self) -> int:
+        if self._size == len(self._matrix):
+            grown = np.zeros((len(self._matrix) * 2, VECTOR_SIZE))
+            grown[: self._size] = self._matrix[: self._size]
+            self._matrix = grown
+        self._size += 1
+        return self._size - 1
+
+    def _missing(self, food_ids: Iterable[int]) -> List[int]:
+        unique = set(food_ids)
+        if self.catalog is None:
+            return [fid for fid in unique if fid not in self._rows or fid in self._stale]
+        unique = list(unique)
+        in_catalog = self.catalog.rows(unique).astype(bool).tolist()
+        return [
+            fid for fid, cataloged in zip(unique, in_catalog)
+            if fid in self._stale or (fid not in self._rows and (not cataloged or fid in self._changed))
+        ]
+
+    def _load(self, food_ids: Iterable[int]) -> None:
+        missing = self._missing(food_ids)
+        for start in range(0, len(missing), _LOAD_CHUNK):
+            chunk = missing[start:start + _LOAD_CHUNK]
+            stmt = (
+                select(Food.id, *[func.coalesce(col, 0.0) for col in FOOD_NUTRIENT_COLUMNS.values()])
+                .where(Food.id.in_(chunk))
+            )
+            found = set()
+            for food_id, *values in self.db.execute(stmt):
+                row = self._rows.get(food_id)
+                if row is None:
+                    row = self._rows[food_id] = self._append_row()
+                self._matrix[row, :-1] = values
+                self._matrix[row, -1] = 100.0
+                found.add(food_id)
+            for food_id in (self._stale | self._changed).intersection(chunk) - found:
+                # Deleted since it was loaded; its old row is simply abandoned
+                self._rows.pop(food_id, None)
+            self._stale.difference_update(chunk)
+
+    def row_indices(self, food_ids: Sequence[int]) -> np.ndarray:
+        """Matrix rows for the given foods, loading unseen ones with one query per chunk.
+
+        With a catalog, rows below its length are snapshot rows.
+        """
+        self._load(food_ids)
+        rows = self._rows
+        if self.catalog is None:
+            return np.fromiter((rows.get(fid, 0) for fid in food_ids), dtype=np.intp, count=len(food_ids))
+        indices = self.catalog.rows(food_ids)
+        if rows or self._changed:
+            base, changed = self._base, self._changed
+            for i, fid in enumerate(food_ids):
+                own = rows.get(fid)
+                if own is not None:
+                    indices[i] = base + own
+                elif fid in changed:
+                    # Deleted since the snapshot
+                    indices[i] = 0
+        return indices
+
+    def _gather(self, rows: np.ndarray) -> np.ndarray:
+        if self.catalog is None:
+            return self._matrix[rows]
+        own = rows >= self._base
+        if not own.any():
+            return self.catalog.vectors[rows]
+        vectors = self.catalog.vectors[np.where(own, 0, rows)]
+        vectors[own] = self._matrix[rows[own] - self._base]
+        return vectors
+
+    def per_100g(self, food_id: int) -> Optional[np.ndarray]:
+        rows = self.row_indices([food_id])
+        vector = self._gather(rows)[0]
+        return vector if vector[-1] else None
+
+    def evaluate(self, food_ids: Sequence[int], grams: Sequence[float]) -> np.ndarray:
+        """One nutrient vector per (food, grams) pair, shape (n, VECTOR_SIZE)."""
+        if not len(food_ids):
+            return np.zeros((0, VECTOR_SIZE))
+        factors = np.asarray(grams, dtype=np.float64) / 100.0
+        # Loading may grow (replace) the matrix, so resolve rows before reading it
+        rows = self.row_indices(food_ids)
+        return self._gather(rows) * factors[:, None]
+
+    def total(self, food_ids: Sequence[int], grams: Sequence[float]) -> np.ndarray:
+        """Summed nutrient vector of a batch of (food, grams) pairs."""
+        if not len(food_ids):
+            return zero_vector()
+        factors = np.asarray(grams, dtype=np.float64) / 100.0
+        rows = self.row_indices(food_ids)
+        return factors @ self._gather(rows)
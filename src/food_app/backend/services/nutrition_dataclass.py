@@ -1,4 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List
 
 @dataclass(frozen=True)
 class NutritionPerServing:
@@ -12,3 +14,45 @@ class NutritionPerServing:
     fiber: float = 0.0
     sodium: float = 0.0
     sugar: float = 0.0
+
+@dataclass(frozen=True)
+class DailyLogNutrition:
+    log_id: int
+    loggable_type: str
+    loggable_id: int
+    name: str
+    quantity: float
+    unit_name: str
+    nutrition: NutritionPerServing
+
+@dataclass(frozen=True)
+class DailyNutritionReport:
+    log_date: date
+    entries: List[DailyLogNutrition] = field(default_factory=list)
+    totals: NutritionPerServing = NutritionPerServing(0.0, 0.0, 0.0, 0.0, 0.0)
+
+@dataclass(frozen=True)
+class DailySummary:
+    log_date: date
+    entry_count: int = 0
+    totals: NutritionPerServing = NutritionPerServing(0.0, 0.0, 0.0, 0.0, 0.0)
+
+@dataclass(frozen=True)
+class MacroGoals:
+    """Daily (or remaining) calories and grams of protein, carbs and fat."""
+    calories: float
+    proteins: float
+    carbs: float
+    fats: float
+
+@dataclass(frozen=True)
+class Recommendation:
+    """A serving suggested to fill the remaining macros; loggable_type through unit_name can be logged as-is."""
+    loggable_type: str
+    loggable_id: int
+    quantity: float
+    unit_name: str
+    name: str
+    weight_grams: float
+    macros: MacroGoals
+    score: float
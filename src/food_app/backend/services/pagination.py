@@ -0,0 +1,91 @@
+import base64
+import json
+from dataclasses import dataclass, field
+from typing import Generic, List, Optional, Sequence, TypeVar
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+from ..infrastructure.models import Food, Recipe, Meal
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+
+@dataclass(frozen=True)
+class Page(Generic[T]):
+    items: List[T] = field(default_factory=list)
+    # Pass back to fetch the following page; None on the last page
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"after": last_id}).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))["after"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"invalid page cursor {cursor!r}") from e
+    if not isinstance(last_id, int):
+        raise ValueError(f"invalid page cursor {cursor!r}")
+    return last_id
+
+
+def paginate(db: Session, stmt: Select, entity, cursor: Optional[str], limit: int, options: Sequence = ()) -> Page:
+    """Runs stmt as one keyset page ordered by entity.id.
+
+    Rows are found with `id > last id` instead of OFFSET, so every page
+    costs the same index range scan however deep the caller has paged,
+    and rows inserted meanwhile never shift or repeat earlier results.
+    """
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"page size must be between 1 and {MAX_PAGE_SIZE}, got {limit}")
+    if cursor:
+        stmt = stmt.where(entity.id > decode_cursor(cursor))
+    # One extra row tells whether another page exists
+    rows = db.scalars(stmt.options(*options).order_by(entity.id).limit(limit + 1)).all()
+    if len(rows) <= limit:
+        return Page(items=list(rows))
+    items = list(rows[:limit])
+    return Page(items=items, next_cursor=encode_cursor(items[-1].id))
+
+
+def _name_filter(stmt: Select, entity, name: Optional[str]) -> Select:
+    if name:
+        stmt = stmt.where(entity.name.icontains(name.strip(), autoescape=True))
+    return stmt
+
+
+def list_foods(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    category: Optional[str] = None,
+    name: Optional[str] = None,
+    options: Sequence = (),
+) -> Page[Food]:
+    stmt = _name_filter(select(Food).where(Food.is_active == True), Food, name)
+    if category:
+        stmt = stmt.where(Food.category == category)
+    return paginate(db, stmt, Food, cursor, limit, options)
+
+
+def list_recipes(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    name: Optional[str] = None,
+    options: Sequence = (),
+) -> Page[Recipe]:
+    return paginate(db, _name_filter(select(Recipe), Recipe, name), Recipe, cursor, limit, options)
+
+
+def list_meals(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    name: Optional[str] = None,
+    options: Sequence = (),
+) -> Page[Meal]:
+    return paginate(db, _name_filter(select(Meal), Meal, name), Meal, cursor, limit, options)
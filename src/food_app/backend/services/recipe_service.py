@@ -1,13 +1,148 @@
+from graphlib import TopologicalSorter
+from typing import Dict, Iterable, Optional, Set
+import numpy as np
+from sqlalchemy import select
 from .base import BaseService
-from ..infrastructure.models import Recipe, RecipeIngredient
+from ..infrastructure.models import Recipe, RecipeIngredient, RecipeNutrition
 from ..infrastructure.logger import trace_execution
 from .nutrition_dataclass import NutritionPerServing
+from .nutrient_engine import VECTOR_FIELDS, to_nutrition, to_vector, zero_vector
 from .food_service import FoodService
+from .loading_plans import RECIPE_WITH_INGREDIENTS, load_one
+
+
+class RecipeCycleError(ValueError):
+    """An ingredient would make a recipe contain itself, directly or through sub-recipes."""
+
+
+def _scaled(portion: Optional[np.ndarray], quantity: float) -> np.ndarray:
+    """`quantity` portions; zero when the served weight is not positive."""
+    if portion is None or portion[-1] * quantity <= 0:
+        return zero_vector()
+    return portion * quantity
+
 
 class RecipeService(BaseService):
     def __init__(self, db, food_service: FoodService):
         super().__init__(db)
         self.food_service = food_service
+        self.food_service.add_change_listener(self._on_food_changed)
+
+    def _on_food_changed(self, kind: str, food_id: int) -> None:
+        recipe_ids = self.db.scalars(
+            select(RecipeIngredient.recipe_id).where(RecipeIngredient.food_id == food_id).distinct()
+        ).all()
+        self._refresh_upward(recipe_ids)
+
+    def _closure(self, recipe_ids: Iterable[int], upward: bool) -> Set[int]:
+        """The given recipes plus every recipe above (containing) or below (contained in) them."""
+        recipe_ids = list(recipe_ids)
+        if not recipe_ids:
+            return set()
+        parent, child = RecipeIngredient.recipe_id, RecipeIngredient.sub_recipe_id
+        source, target = (child, parent) if upward else (parent, child)
+        closure = select(Recipe.id.label("id")).where(Recipe.id.in_(recipe_ids)).cte("closure", recursive=True)
+        # UNION (not UNION ALL) drops revisited rows, so even a corrupt cyclic graph terminates
+        closure = closure.union(select(target).join(closure, source == closure.c.id).where(target.is_not(None)))
+        return set(self.db.scalars(select(closure.c.id)))
+
+    def _evaluate(self, recipe_ids: Set[int]) -> Dict[int, np.ndarray]:
+        """Per-portion vectors of the given recipes, computed children first.
+
+        Each recipe is computed once and shared by every parent in the set;
+        sub-recipes outside the set are read from their materialized rows.
+        """
+        if not recipe_ids:
+            return {}
+        recipes = {
+            r.id: r for r in self.db.scalars(
+                select(Recipe).where(Recipe.id.in_(recipe_ids)).options(*RECIPE_WITH_INGREDIENTS)
+            )
+        }
+        graph = {
+            recipe_id: {ing.sub_recipe_id for ing in recipe.ingredients if ing.sub_recipe_id in recipes}
+            for recipe_id, recipe in recipes.items()
+        }
+        portions: Dict[int, np.ndarray] = {}
+        for recipe_id in TopologicalSorter(graph).static_order():
+            portions[recipe_id] = self._compute_portion(recipes[recipe_id], portions)
+        return portions
+
+    def _sub_recipe_portions(self, portion: np.ndarray, ing: RecipeIngredient) -> float:
+        """Portions of a sub-recipe an ingredient uses; a mass unit is converted through the portion weight."""
+        if not self.food_service.units.is_mass_unit(ing.unit_name):
+            return ing.quantity
+        return ing.quantity / portion[-1] if portion[-1] > 0 else 0.0
+
+    def _compute_portion(self, recipe: Recipe, portions: Dict[int, np.ndarray]) -> np.ndarray:
+        """Nutrient vector of a single portion, from one batched pass over the food ingredients."""
+        if not recipe.ingredients or recipe.portions_yield <= 0:
+            return zero_vector()
+        foods = [ing for ing in recipe.ingredients if ing.food_id is not None]
+        grams = self.food_service.resolve_grams([(ing.food_id, ing.quantity, ing.unit_name) for ing in foods])
+        total = self.food_service.engine.total([ing.food_id for ing in foods], grams)
+        for ing in recipe.ingredients:
+            if ing.sub_recipe_id is None:
+                continue
+            portion = portions.get(ing.sub_recipe_id)
+            if portion is None:
+                portion = self.portion_vector(ing.sub_recipe_id)
+            if portion is not None:
+                total = total + _scaled(portion, self._sub_recipe_portions(portion, ing))
+        return total / recipe.portions_yield
+
+    def _store(self, recipe: Recipe, portion: np.ndarray) -> RecipeNutrition:
+        row = recipe.nutrition
+        if row is None:
+            row = recipe.nutrition = RecipeNutrition(recipe_id=recipe.id)
+        for field, value in zip(VECTOR_FIELDS, portion.tolist()):
+            setattr(row, field, value)
+        return row
+
+    def _refresh_upward(self, recipe_ids: Iterable[int]) -> None:
+        """Re-materializes the given recipes and every recipe containing them, children first."""
+        affected = self._closure(recipe_ids, upward=True)
+        portions = self._evaluate(affected)
+        for recipe_id, portion in portions.items():
+            self._store(self.db.get(Recipe, recipe_id), portion)
+        self.db.flush()
+        for recipe_id in portions:
+            self._notify_change("recipe", recipe_id)
+
+    def evaluate(self, recipe_ids: Iterable[int]) -> Dict[int, np.ndarray]:
+        """Freshly computed per-portion vectors of the given recipes and all their sub-recipes.
+
+        Ignores the materialized rows; the whole DAG below the recipes is
+        loaded at once and every sub-recipe is evaluated a single time.
+        """
+        return self._evaluate(self._closure(recipe_ids, upward=False))
+
+    def refresh_nutrition(self, recipe_id: int) -> Optional[RecipeNutrition]:
+        """Recomputes and stores the per-portion nutrition row of a recipe."""
+        recipe = load_one(self.db, Recipe, recipe_id, RECIPE_WITH_INGREDIENTS)
+        if not recipe:
+            return None
+        row = self._store(recipe, self._compute_portion(recipe, {}))
+        self.db.flush()
+        return row
+
+    def portion_vector(self, recipe_id: int) -> Optional[np.ndarray]:
+        """Per-portion nutrient vector read from the materialized row, or None for unknown recipes.
+
+        A recipe without a row is computed but not stored: reads must not
+        open a write transaction. Migration 8 fills the rows of older files.
+        """
+        portion = self.db.get(RecipeNutrition, recipe_id)
+        if portion is not None:
+            return to_vector(portion)
+        recipe = load_one(self.db, Recipe, recipe_id, RECIPE_WITH_INGREDIENTS)
+        if not recipe:
+            return None
+        return self._compute_portion(recipe, {})
+
+    def scaled_vector(self, recipe_id: int, quantity: float) -> np.ndarray:
+        """Nutrient vector of `quantity` portions; zero when the served weight is not positive."""
+        return _scaled(self.portion_vector(recipe_id), quantity)
 
     @trace_execution
     def calculate_nutrition(
@@ -16,54 +151,49 @@ class RecipeService(BaseService):
         quantity: float = 1.0,
         unit_name: str = "portion",
     ) -> NutritionPerServing:
-        recipe = self.db.get(Recipe, recipe_id)
-        if not recipe or not recipe.ingredients:
-            return NutritionPerServing(0.0, 0.0, 0.0, 0.0, 0.0)
-        
-        total_cal = total_prot = total_carb = total_fat = total_w = 0.0
-        total_sat = total_trans = total_fib = total_sod = total_sug = 0.0
-        
-        for ing in recipe.ingredients:
-            n = self.food_service.calculate_nutrition(ing.food_id, ing.quantity, ing.unit_name)
-            total_cal += n.calories
-            total_prot += n.proteins
-            total_carb += n.carbs
-            total_fat += n.fats
-            total_w += n.weight_grams
-            total_sat += n.saturated_fats
-            total_trans += n.trans_fats
-            total_fib += n.fiber
-            total_sod += n.sodium
-            total_sug += n.sugar
-            
-        weight_per_portion = total_w / recipe.portions_yield
-        grams = weight_per_portion * quantity
-        if grams <= 0:
-            return NutritionPerServing(0.0, 0.0, 0.0, 0.0, 0.0)
-            
-        ratio = grams / weight_per_portion
-        return NutritionPerServing(
-            calories=(total_cal / recipe.portions_yield) * ratio,
-            proteins=(total_prot / recipe.portions_yield) * ratio,
-            carbs=(total_carb / recipe.portions_yield) * ratio,
-            fats=(total_fat / recipe.portions_yield) * ratio,
-            weight_grams=grams,
-            saturated_fats=(total_sat / recipe.portions_yield) * ratio,
-            trans_fats=(total_trans / recipe.portions_yield) * ratio,
-            fiber=(total_fib / recipe.portions_yield) * ratio,
-            sodium=(total_sod / recipe.portions_yield) * ratio,
-            sugar=(total_sug / recipe.portions_yield) * ratio,
-        )
+        return to_nutrition(self.scaled_vector(recipe_id, quantity))
 
     @trace_execution
     def create(self, name: str, portions_yield: int) -> Recipe:
         recipe = Recipe(name=name, portions_yield=portions_yield)
         self.db.add(recipe)
         self.db.flush()
+        self.refresh_nutrition(recipe.id)
         return recipe
 
-    def add_ingredient(self, recipe_id: int, food_id: int, quantity: float, unit_name: str) -> RecipeIngredient:
-        ing = RecipeIngredient(recipe_id=recipe_id, food_id=food_id, quantity=quantity, unit_name=unit_name)
+    def add_ingredient(
+        self,
+        recipe_id: int,
+        food_id: Optional[int],
+        quantity: float,
+        unit_name: str,
+        sub_recipe_id: Optional[int] = None,
+    ) -> RecipeIngredient:
+        """Adds a food, or with sub_recipe_id another recipe, as an ingredient.
+
+        Raises RecipeCycleError when the sub-recipe already contains this recipe.
+        """
+        if (food_id is None) == (sub_recipe_id is None):
+            raise ValueError("an ingredient needs exactly one of food_id and sub_recipe_id")
+        if sub_recipe_id is not None and recipe_id in self._closure([sub_recipe_id], upward=False):
+            raise RecipeCycleError(f"recipe {sub_recipe_id} contains recipe {recipe_id}; adding it would create a cycle")
+        ing = RecipeIngredient(
+            recipe_id=recipe_id, food_id=food_id, sub_recipe_id=sub_recipe_id, quantity=quantity, unit_name=unit_name,
+        )
         self.db.add(ing)
         self.db.flush()
+        recipe = self.db.get(Recipe, recipe_id)
+        if recipe is not None:
+            self.db.expire(recipe, ["ingredients"])
+        self._refresh_upward([recipe_id])
         return ing
+
+    def update_portions_yield(self, recipe_id: int, portions_yield: int) -> Optional[Recipe]:
+        recipe = self.db.get(Recipe, recipe_id)
+        if not recipe:
+            return None
+        if recipe.portions_yield != portions_yield:
+            recipe.portions_yield = portions_yield
+            self.db.flush()
+            self._refresh_upward([recipe_id])
+        return recipe
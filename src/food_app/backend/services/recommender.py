@@ -0,0 +1,177 @@
+"""Ranks catalog servings by how well they fill the day's remaining macros.
+
+The catalog is held as arrays with one row per realistic serving: one of
+each of a food's FoodUnits (mass units like "g" excluded), 100 g of foods
+that have none, and one portion of each recipe. Scoring a request is a few
+array operations over all rows at once, so it stays in the low
+milliseconds for a 100k-food catalog; only the first call after a change
+pays for reading the catalog.
+"""
+from dataclasses import astuple, dataclass
+from typing import Dict, List, Optional
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..infrastructure.models import Food, FoodUnit, Recipe, RecipeNutrition
+from .nutrition_dataclass import MacroGoals, Recommendation
+from .unit_resolver import UnitResolver
+
+# Weighs the macros against each other when the caller gives no goals
+REFERENCE_GOALS = MacroGoals(calories=2000.0, proteins=50.0, carbs=275.0, fats=78.0)
+# Going over a remaining target costs this many times more than staying under it
+OVERSHOOT_PENALTY = 4.0
+# Serving of a food without any non-mass unit
+DEFAULT_SERVING_GRAMS = 100.0
+# Candidate rows read per requested result, to leave room for dropping duplicate items
+_OVERSAMPLE = 4
+
+
+@dataclass(frozen=True)
+class _Catalog:
+    loggable_types: np.ndarray  # object: "food" / "recipe"
+    loggable_ids: np.ndarray
+    names: List[str]
+    quantities: np.ndarray
+    unit_names: List[str]
+    grams: np.ndarray
+    macros: np.ndarray  # (rows, 4): calories, proteins, carbs, fats per serving
+
+
+class MacroRecommender:
+    def __init__(self, db: Session, *services):
+        """`services` are watched through their change listeners; any change reloads the catalog."""
+        self.db = db
+        self._catalog: Optional[_Catalog] = None
+        for service in services:
+            service.add_change_listener(lambda kind, entity_id: self.invalidate())
+
+    def invalidate(self) -> None:
+        self._catalog = None
+
+    def _connection(self):
+        # Core rows; the ORM result layer costs more than the query at catalog size
+        return self.db.connection()
+
+    def _load_foods(self):
+        foods = self._connection().execute(
+            select(Food.id, Food.name, Food.is_liquid, Food.calories_100g, Food.proteins_100g, Food.carbs_100g, Food.fats_100g)
+            .where(Food.is_active == True)
+            .order_by(Food.id)
+        ).all()
+        if not foods:
+            return []
+        ids, names, liquid, *columns = zip(*foods)
+        ids = np.array(ids, dtype=np.int64)
+        per_100g = np.column_stack(columns).astype(np.float64)
+
+        units = self._connection().execute(
+            select(FoodUnit.food_id, FoodUnit.unit_name, FoodUnit.grams)
+            .join(Food, Food.id == FoodUnit.food_id)
+            .where(Food.is_active == True, FoodUnit.grams > 0)
+            .order_by(FoodUnit.food_id, FoodUnit.id)
+        ).all()
+        unit_food_ids, unit_names, unit_grams = zip(*units) if units else ((), (), ())
+        resolver = UnitResolver(self.db)
+        mass: Dict[str, bool] = {name: resolver.is_mass_unit(name) for name in set(unit_names)}
+        keep = np.array([not mass[name] for name in unit_names], dtype=bool)
+        unit_names = [name for name, kept in zip(unit_names, keep) if kept]
+        unit_rows = np.searchsorted(ids, np.array(unit_food_ids, dtype=np.int64)[keep])
+        unit_grams = np.array(unit_grams, dtype=np.float64)[keep]
+        bare = np.ones(len(ids), dtype=bool)
+        bare[unit_rows] = False
+        bare_rows = np.flatnonzero(bare)
+
+        rows = np.concatenate([unit_rows, bare_rows])
+        grams = np.concatenate([unit_grams, np.full(len(bare_rows), DEFAULT_SERVING_GRAMS)])
+        return [(
+            np.full(len(rows), "food", dtype=object),
+            ids[rows],
+            [names[i] for i in rows],
+            np.concatenate([np.ones(len(unit_rows)), grams[len(unit_rows):]]),
+            unit_names + ["ml" if liquid[i] else "g" for i in bare_rows],
+            grams,
+            per_100g[rows] * (grams / 100.0)[:, None],
+        )]
+
+    def _load_recipes(self):
+        recipes = self._connection().execute(
+            select(Recipe.id, Recipe.name, RecipeNutrition.weight_grams, RecipeNutrition.calories,
+                   RecipeNutrition.proteins, RecipeNutrition.carbs, RecipeNutrition.fats)
+            .join(RecipeNutrition, RecipeNutrition.recipe_id == Recipe.id)
+            .where(Recipe.is_active == True, RecipeNutrition.weight_grams > 0)
+        ).all()
+        if not recipes:
+            return []
+        ids, names, grams, *columns = zip(*recipes)
+        return [(
+            np.full(len(ids), "recipe", dtype=object),
+            np.array(ids, dtype=np.int64),
+            list(names),
+            np.ones(len(ids)),
+            ["portion"] * len(ids),
+            np.array(grams, dtype=np.float64),
+            np.column_stack(columns).astype(np.float64),
+        )]
+
+    def _load(self) -> _Catalog:
+        parts = self._load_foods() + self._load_recipes()
+        if not parts:
+            return _Catalog(np.empty(0, dtype=object), np.empty(0, dtype=np.int64), [], np.empty(0), [], np.empty(0), np.empty((0, 4)))
+        types, ids, names, quantities, units, grams, macros = zip(*parts)
+        return _Catalog(
+            np.concatenate(types), np.concatenate(ids), sum(names, []), np.concatenate(quantities),
+            sum(units, []), np.concatenate(grams), np.concatenate(macros),
+        )
+
+    def scores(self, remaining: MacroGoals, goals: MacroGoals = REFERENCE_GOALS) -> np.ndarray:
+        """How much each catalog serving closes the remaining gap; positive means better than nothing.
+
+        Each macro's gap is measured as a fraction of its goal, squared, with
+        overshoot weighted by OVERSHOOT_PENALTY.
+        """
+        if self._catalog is None:
+            self._catalog = self._load()
+        scale = np.array(astuple(goals), dtype=np.float64)
+        scale[scale <= 0] = 1.0
+        target = np.maximum(np.array(astuple(remaining), dtype=np.float64), 0.0) / scale
+        gap = target - self._catalog.macros / scale
+        cost = np.square(gap) * np.where(gap < 0, OVERSHOOT_PENALTY, 1.0)
+        return np.square(target).sum() - cost.sum(axis=1)
+
+    def recommend(self, remaining: MacroGoals, limit: int = 10, goals: MacroGoals = REFERENCE_GOALS) -> List[Recommendation]:
+        """The best-fitting serving of up to `limit` distinct foods and recipes, best first."""
+        score = self.scores(remaining, goals)
+        catalog = self._catalog
+        if limit <= 0 or not len(score):
+            return []
+        candidates = min(len(score), limit * _OVERSAMPLE)
+        while True:
+            top = np.argpartition(-score, candidates - 1)[:candidates]
+            top = top[np.argsort(-score[top], kind="stable")]
+            picked, seen = [], set()
+            for row in top:
+                if score[row] <= 0:
+                    break
+                item = (catalog.loggable_types[row], catalog.loggable_ids[row])
+                if item not in seen:
+                    seen.add(item)
+                    picked.append(row)
+                    if len(picked) == limit:
+                        break
+            if len(picked) == limit or candidates == len(score) or score[top[-1]] <= 0:
+                break
+            # Duplicates crowded out distinct items; widen the candidate set
+            candidates = min(len(score), candidates * 2)
+        return [
+            Recommendation(
+                loggable_type=catalog.loggable_types[row],
+                loggable_id=int(catalog.loggable_ids[row]),
+                quantity=float(catalog.quantities[row]),
+                unit_name=catalog.unit_names[row],
+                name=catalog.names[row],
+                weight_grams=float(catalog.grams[row]),
+                macros=MacroGoals(*catalog.macros[row].tolist()),
+                score=float(score[row]),
+            )
+            for row in picked
+        ]
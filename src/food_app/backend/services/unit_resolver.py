@@ -0,0 +1,153 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+from ..infrastructure.models import Food, FoodUnit, UnitAlias
+from ..infrastructure.sql_functions import unit_key
+
+logger = logging.getLogger(__name__)
+
+# Units whose quantity already is the weight
+MASS_UNITS = ("g", "ml")
+# Grams assumed per unit when a food has no unit of that name
+FALLBACK_UNIT_GRAMS = 100.0
+
+@dataclass
+class FoodUnitIndex:
+    """One food's units keyed by unit_key(name) and by alias-canonical key; first unit by id wins."""
+    exact: Dict[str, float] = field(default_factory=dict)
+    canonical: Dict[str, float] = field(default_factory=dict)
+
+
+class UnitResolver:
+    """Resolves (food_id, quantity, unit_name) to grams.
+
+    Unit names are compared after unit_key() normalization: first the name
+    itself, then its alias target, then any unit with the same alias target.
+    So "Colher", "colheres" and "colher de sopa" all find a food's
+    "Colher de Sopa" unit, and "tablespoon" finds a unit named "tbsp". Per-food indexes
+    are cached until invalidate(); the alias table is read once.
+
+    Given a CatalogSnapshot of the current database, units of foods in it
+    are read from the snapshot until the food is invalidated.
+    """
+
+    def __init__(self, db: Session, catalog=None):
+        self.db = db
+        self.catalog = catalog
+        self._aliases: Optional[Dict[str, str]] = None
+        self._indexes: Dict[int, Optional[FoodUnitIndex]] = {}
+        self._fallbacks_logged: Set[Tuple[int, str]] = set()
+        # Foods whose units changed since the snapshot was taken; survives clear()
+        self._changed: Set[int] = set()
+
+    def clear(self) -> None:
+        self._aliases = None
+        self._indexes.clear()
+
+    def set_catalog(self, catalog) -> None:
+        self.catalog = catalog
+        self._changed.clear()
+        self.clear()
+
+    def invalidate(self, food_id: int) -> None:
+        self._indexes.pop(food_id, None)
+        if self.catalog is not None:
+            self._changed.add(food_id)
+
+    @property
+    def aliases(self) -> Dict[str, str]:
+        if self._aliases is None:
+            self._aliases = dict(self.db.execute(select(UnitAlias.alias, UnitAlias.canonical)).all())
+        return self._aliases
+
+    def canonical(self, key: str) -> str:
+        return self.aliases.get(key, key)
+
+    def _build_index(self, units: Iterable[Tuple[str, float]]) -> FoodUnitIndex:
+        index = FoodUnitIndex()
+        for unit_name, grams in units:
+            key = unit_key(unit_name)
+            index.exact.setdefault(key, grams)
+            index.canonical.setdefault(self.canonical(key), grams)
+        return index
+
+    def _load_indexes(self, food_ids: Set[int]) -> None:
+        missing = set()
+        for food_id in food_ids - self._indexes.keys():
+            # Units already fetched by a loading plan save the query
+            food = self.db.identity_map.get(identity_key(Food, food_id))
+            if food is not None and "units" not in inspect(food).unloaded:
+                units = sorted(food.units, key=lambda u: u.id)
+                self._indexes[food_id] = self._build_index((u.unit_name, u.grams) for u in units)
+            else:
+                missing.add(food_id)
+        if self.catalog is not None and missing:
+            candidates = sorted(missing - self._changed)
+            for food_id, row in zip(candidates, self.catalog.rows(candidates).tolist()):
+                if row:
+                    self._indexes[food_id] = self._build_index(self.catalog.units(food_id))
+                    missing.discard(food_id)
+        if not missing:
+            return
+        rows = self.db.execute(
+            select(Food.id, FoodUnit.unit_name, FoodUnit.grams)
+            .outerjoin(FoodUnit, FoodUnit.food_id == Food.id)
+            .where(Food.id.in_(missing))
+            .order_by(Food.id, FoodUnit.id)
+        ).all()
+        units_by_food: Dict[int, List[Tuple[str, float]]] = {}
+        for food_id, unit_name, grams in rows:
+            units = units_by_food.setdefault(food_id, [])
+            if unit_name is not None:
+                units.append((unit_name, grams))
+        for food_id in missing:
+            # None marks a food that does not exist
+            units = units_by_food.get(food_id)
+            self._indexes[food_id] = self._build_index(units) if units is not None else None
+
+    def grams_per_unit(self, food_id: int, unit_name: str) -> Optional[float]:
+        """Grams in one unit, FALLBACK_UNIT_GRAMS if the food lacks it, None for unknown foods.
+
+        The food's index must already be loaded; resolve_grams takes care of that.
+        """
+        index = self._indexes[food_id]
+        if index is None:
+            return None
+        key = unit_key(unit_name)
+        canonical = self.canonical(key)
+        grams = index.exact.get(key)
+        if grams is None:
+            grams = index.exact.get(canonical)
+        if grams is None:
+            grams = index.canonical.get(canonical)
+        if grams is None:
+            if (food_id, key) not in self._fallbacks_logged:
+                self._fallbacks_logged.add((food_id, key))
+                logger.warning(
+                    f"Food {food_id} has no unit {unit_name!r}; assuming {FALLBACK_UNIT_GRAMS:g} g per unit"
+                )
+            grams = FALLBACK_UNIT_GRAMS
+        return grams
+
+    def is_mass_unit(self, unit_name: str) -> bool:
+        return self.canonical(unit_key(unit_name)) in MASS_UNITS
+
+    def resolve_grams(self, items: Sequence[Tuple[int, float, str]]) -> List[float]:
+        """Grams for each (food_id, quantity, unit_name), in input order.
+
+        Unknown foods weigh 0 g. The whole batch costs at most one query
+        (plus one the first time aliases are needed).
+        """
+        mass = [self.is_mass_unit(unit_name) for _, _, unit_name in items]
+        self._load_indexes({item[0] for item, is_mass in zip(items, mass) if not is_mass})
+        grams = []
+        for (food_id, quantity, unit_name), is_mass in zip(items, mass):
+            if is_mass:
+                grams.append(quantity)
+                continue
+            per_unit = self.grams_per_unit(food_id, unit_name)
+            grams.append(quantity * per_unit if per_unit is not None else 0.0)
+        return grams
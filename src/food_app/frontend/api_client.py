@@ -1,42 +1,152 @@
 import logging
 from typing import List, Optional
-from food_app.backend.infrastructure.database import SessionLocal
+from food_app.backend.infrastructure.database import DataVersion, SessionLocal, ReadSessionLocal
 from food_app.backend.infrastructure.models import Food, DailyLog, Recipe, Meal
-from food_app.backend.infrastructure.logger import trace_execution
+from food_app.backend.infrastructure.logger import trace_execution, logging_stats, LoggingStats
+from food_app.backend.infrastructure import metrics
+from food_app.backend.infrastructure.catalog_version import content_stamps
 from food_app.backend.services.food_service import FoodService
 from food_app.backend.services.recipe_service import RecipeService
-from food_app.backend.services.meal_service import MealService
-from food_app.backend.services.log_service import DailyLogService
-from food_app.backend.domain.food import FoodCreate
+from food_app.backend.services.meal_service import MealService, CacheStats
+from food_app.backend.services.log_service import DailyLogService, daily_nutrition_report, range_summary
+from food_app.backend.services.nutrition_dataclass import DailyNutritionReport, DailySummary, MacroGoals, Recommendation
+from food_app.backend.services.recommender import REFERENCE_GOALS, MacroRecommender
+from food_app.backend.services.food_search import search_foods
+from food_app.backend.services.food_similarity import FoodSimilarityIndex
+from food_app.backend.services.loading_plans import load_one, loading_options
+from food_app.backend.services.pagination import Page, DEFAULT_PAGE_SIZE, list_foods, list_recipes, list_meals
+from food_app.backend.domain.food import FoodCreate, FoodSearchResult, SimilarFood
 from food_app.backend.domain.log import DailyLogCreate
+from food_app.frontend.read_cache import ReadCache, ReadCacheStats, cached_read
 
 logger = logging.getLogger(__name__)
 
 class ApiClient:
-    def __init__(self):
-        self.db = SessionLocal()
-        self.food_service = FoodService(self.db)
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        read_session_factory=ReadSessionLocal,
+        catalog=None,
+        data_version: Optional[DataVersion] = None,
+    ):
+        """`data_version` may be shared between clients (see ApiServer); without one the client opens its own."""
+        self.db = session_factory()
+        # query_only connections for listings and reports; never used for writes, so a commit
+        # only ends the transaction and need not expire what the cached reads returned
+        self.read_db = read_session_factory(expire_on_commit=False)
+        # A CatalogSnapshot (see current_catalog) saves loading foods and units through the session
+        self.food_service = FoodService(self.db, catalog)
         self.recipe_service = RecipeService(self.db, self.food_service)
         self.meal_service = MealService(self.db, self.food_service, self.recipe_service)
         self.log_service = DailyLogService(self.db, self.food_service, self.recipe_service, self.meal_service)
+        self.recommender = MacroRecommender(self.read_db, self.food_service, self.recipe_service)
+        self._recommender_version = None
+        self.similar_foods = FoodSimilarityIndex(self.read_db, self.food_service)
+
+        # Writes through this client, plus SQLite's data_version, which moves when any other connection commits
+        self._writes = 0
+        self._owns_data_version = data_version is None
+        self._data_version = data_version if data_version is not None else DataVersion(self.read_db.get_bind())
+        self._seen_external = None
+        self._seen_stamps = None
+        self.read_cache = ReadCache(self.data_version)
+
+    def data_version(self) -> tuple:
+        """Token that changes whenever the database may have changed."""
+        return self._writes, self._data_version()
+
+    def refresh(self) -> None:
+        """Catches up with commits of other connections; call before serving a request.
+
+        data_version only says that some connection committed (SQLite cannot
+        tell this client's own commits from others'), so the catalog and
+        recipe stamps decide what is stale. A moved catalog stamp re-checks
+        the snapshot and drops the food-derived caches; either stamp drops
+        the meal memo and both sessions' loaded objects. A commit that only
+        logged entries keeps them all; read_cache follows data_version on its own.
+        """
+        external = self.data_version()[1]
+        if external == self._seen_external:
+            return
+        self._seen_external = external
+        catalog, recipes = content_stamps(self.db)
+        if self._seen_stamps is None:
+            self.food_service.check_catalog()
+        elif (catalog, recipes) != self._seen_stamps:
+            if catalog != self._seen_stamps[0]:
+                self.food_service.check_catalog()
+                self.food_service.engine.clear()
+                self.food_service.units.clear()
+                self.similar_foods.clear()
+            self.meal_service.clear_cache()
+            self.db.expire_all()
+            self.read_db.expire_all()
+        self._seen_stamps = (catalog, recipes)
+
+    def finish_request(self) -> None:
+        """Ends the read session's transaction, returning its pooled connection until the next read."""
+        self.read_db.commit()
+
+    def _after_commit(self):
+        self._writes += 1
+        # Objects loaded through read_db may predate this write
+        self.read_db.expire_all()
+
+    def _reset_caches(self):
+        # In-process caches may hold values computed from the rolled-back writes
+        self.food_service.engine.clear()
+        self.food_service.units.clear()
+        self.meal_service.clear_cache()
+        self.recommender.invalidate()
+        self.similar_foods.clear()
+        self.read_cache.clear()
 
     # Food Methods
     @trace_execution
-    def get_active_foods(self) -> List[Food]:
-        return self.db.query(Food).filter(Food.is_active == True).all()
+    @cached_read(maxsize=8)
+    def get_active_foods(self, plan: Optional[str] = None) -> List[Food]:
+        return self.read_db.query(Food).options(*loading_options(plan)).filter(Food.is_active == True).all()
+
+    @trace_execution
+    @cached_read(maxsize=64)
+    def list_foods(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        category: Optional[str] = None,
+        name: Optional[str] = None,
+        plan: Optional[str] = None,
+    ) -> Page[Food]:
+        return list_foods(self.read_db, cursor, limit, category, name, loading_options(plan))
+
+    @trace_execution
+    @cached_read(maxsize=64)
+    def search_foods(self, query: str, limit: int = 20, category: Optional[str] = None) -> List[FoodSearchResult]:
+        return search_foods(self.read_db, query, limit, category)
+
+    @trace_execution
+    @cached_read(maxsize=32)
+    def find_similar_foods(self, food_id: int, limit: int = 10, same_category: bool = False) -> List[SimilarFood]:
+        """Active foods with the nearest nutrition profile, for substitutions."""
+        return self.similar_foods.similar(food_id, limit, same_category)
 
     @trace_execution
-    def get_food_by_id(self, food_id: int) -> Optional[Food]:
-        return self.db.get(Food, food_id)
+    @cached_read(maxsize=256)
+    def get_food_by_id(self, food_id: int, plan: Optional[str] = None) -> Optional[Food]:
+        if plan is None:
+            return self.db.get(Food, food_id)
+        return load_one(self.db, Food, food_id, loading_options(plan))
 
     @trace_execution
     def create_food(self, data: FoodCreate):
         try:
             res = self.food_service.create(data)
             self.db.commit()
+            self._after_commit()
             return res
         except Exception as e:
             self.db.rollback()
+            self._reset_caches()
             logger.error(f"ApiClient.create_food error: {e}")
             raise e
 
@@ -45,48 +155,213 @@ class ApiClient:
         try:
             res = self.food_service.add_unit(food_id, unit_name, grams)
             self.db.commit()
+            self._after_commit()
             return res
         except Exception as e:
             self.db.rollback()
+            self._reset_caches()
             logger.error(f"ApiClient.add_custom_unit error: {e}")
             raise e
 
     # Log Methods
     @trace_execution
-    def get_logs_by_date(self, log_date) -> List[DailyLog]:
-        return self.db.query(DailyLog).filter(DailyLog.log_date == log_date).all()
+    @cached_read(maxsize=32)
+    def get_logs_by_date(self, log_date, plan: Optional[str] = None) -> List[DailyLog]:
+        return self.read_db.query(DailyLog).options(*loading_options(plan)).filter(DailyLog.log_date == log_date).all()
+
+    @trace_execution
+    @cached_read(maxsize=32)
+    def get_daily_nutrition(self, log_date) -> DailyNutritionReport:
+        return daily_nutrition_report(self.read_db, log_date)
 
     @trace_execution
     def log_consumption(self, data: DailyLogCreate):
         try:
             res = self.log_service.log_consumption(data)
             self.db.commit()
+            self._after_commit()
             return res
         except Exception as e:
             self.db.rollback()
+            self._reset_caches()
             logger.error(f"ApiClient.log_consumption error: {e}")
             raise e
 
+    @trace_execution
+    def log_consumption_batch(self, entries: List[DailyLogCreate]) -> List[DailyLog]:
+        """Logs all entries in one transaction; see DailyLogService.log_consumption_batch."""
+        try:
+            res = self.log_service.log_consumption_batch(entries)
+            self.db.commit()
+            self._after_commit()
+            return res
+        except Exception as e:
+            self.db.rollback()
+            self._reset_caches()
+            logger.error(f"ApiClient.log_consumption_batch error: {e}")
+            raise e
+
+    @trace_execution
+    def delete_log(self, log_id: int) -> bool:
+        try:
+            res = self.log_service.delete_log(log_id)
+            self.db.commit()
+            self._after_commit()
+            return res
+        except Exception as e:
+            self.db.rollback()
+            self._reset_caches()
+            logger.error(f"ApiClient.delete_log error: {e}")
+            raise e
+
+    @trace_execution
+    @cached_read(maxsize=16)
+    def get_range_summary(self, start, end) -> List[DailySummary]:
+        """Per-day totals from start to end inclusive, zero-filled."""
+        return range_summary(self.read_db, start, end)
+
+    @trace_execution
+    @cached_read(maxsize=16)
+    def recommend_foods(self, remaining: MacroGoals, limit: int = 10, goals: MacroGoals = REFERENCE_GOALS) -> List[Recommendation]:
+        """Foods and recipes whose serving best fills the remaining macros."""
+        # Changes made here reach the recommender through service listeners; others only show in the stamps
+        stamps = content_stamps(self.read_db)
+        if stamps != self._recommender_version:
+            self.recommender.invalidate()
+            self._recommender_version = stamps
+        return self.recommender.recommend(remaining, limit, goals)
+
     # Recipe & Meal Methods
     @trace_execution
-    def get_all_recipes(self) -> List[Recipe]:
-        return self.db.query(Recipe).all()
+    def create_recipe(self, name: str, portions_yield: int):
+        try:
+            res = self.recipe_service.create(name, portions_yield)
+            self.db.commit()
+            self._after_commit()
+            return res
+        except Exception as e:
+            self.db.rollback()
+            self._reset_caches()
+            logger.error(f"ApiClient.create_recipe error: {e}")
+            raise e
+
+    @trace_execution
+    def add_recipe_ingredient(
+        self, recipe_id: int, food_id: Optional[int], quantity: float, unit_name: str, sub_recipe_id: Optional[int] = None
+    ):
+        try:
+            res = self.recipe_service.add_ingredient(recipe_id, food_id, quantity, unit_name, sub_recipe_id=sub_recipe_id)
+            self.db.commit()
+            self._after_commit()
+            return res
+        except Exception as e:
+            self.db.rollback()
+            self._reset_caches()
+            logger.error(f"ApiClient.add_recipe_ingredient error: {e}")
+            raise e
 
     @trace_execution
-    def get_all_meals(self) -> List[Meal]:
-        return self.db.query(Meal).all()
+    def create_meal(self, name: str):
+        try:
+            res = self.meal_service.create(name)
+            self.db.commit()
+            self._after_commit()
+            return res
+        except Exception as e:
+            self.db.rollback()
+            self._reset_caches()
+            logger.error(f"ApiClient.create_meal error: {e}")
+            raise e
 
     @trace_execution
+    def add_meal_item(self, meal_id: int, quantity: float, unit_name: str, food_id: Optional[int] = None, recipe_id: Optional[int] = None):
+        try:
+            res = self.meal_service.add_item(meal_id, quantity, unit_name, food_id=food_id, recipe_id=recipe_id)
+            self.db.commit()
+            self._after_commit()
+            return res
+        except Exception as e:
+            self.db.rollback()
+            self._reset_caches()
+            logger.error(f"ApiClient.add_meal_item error: {e}")
+            raise e
+
+    @trace_execution
+    @cached_read(maxsize=8)
+    def get_all_recipes(self, plan: Optional[str] = None) -> List[Recipe]:
+        return self.read_db.query(Recipe).options(*loading_options(plan)).all()
+
+    @trace_execution
+    @cached_read(maxsize=8)
+    def get_all_meals(self, plan: Optional[str] = None) -> List[Meal]:
+        return self.read_db.query(Meal).options(*loading_options(plan)).all()
+
+    @trace_execution
+    @cached_read(maxsize=64)
+    def list_recipes(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        name: Optional[str] = None,
+        plan: Optional[str] = None,
+    ) -> Page[Recipe]:
+        return list_recipes(self.read_db, cursor, limit, name, loading_options(plan))
+
+    @trace_execution
+    @cached_read(maxsize=64)
+    def list_meals(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        name: Optional[str] = None,
+        plan: Optional[str] = None,
+    ) -> Page[Meal]:
+        return list_meals(self.read_db, cursor, limit, name, loading_options(plan))
+
+    @trace_execution
+    @cached_read()
     def calculate_food_nutrition(self, food_id: int, quantity: float, unit_name: str):
         return self.food_service.calculate_nutrition(food_id, quantity, unit_name)
 
     @trace_execution
+    @cached_read()
     def calculate_recipe_nutrition(self, recipe_id: int, quantity: float = 1.0, unit_name: str = "portion"):
         return self.recipe_service.calculate_nutrition(recipe_id, quantity, unit_name)
 
     @trace_execution
+    @cached_read()
     def calculate_meal_nutrition(self, meal_id: int):
         return self.meal_service.calculate_nutrition(meal_id)
 
+    def get_meal_cache_stats(self) -> CacheStats:
+        return self.meal_service.cache_stats()
+
+    # Diagnostics
+    def get_metrics(self) -> List[metrics.FunctionStats]:
+        return metrics.snapshot()
+
+    def get_metrics_text(self) -> str:
+        """Call metrics in the Prometheus text format."""
+        return metrics.prometheus_text()
+
+    def get_metrics_config(self) -> tuple:
+        """(enabled, sample_every)"""
+        return metrics.is_enabled(), metrics.sample_every()
+
+    def configure_metrics(self, enabled: bool, sample_every: int = 1) -> None:
+        metrics.configure(enabled=enabled, sample_every=sample_every)
+
+    def reset_metrics(self) -> None:
+        metrics.reset()
+
+    def get_logging_stats(self) -> LoggingStats:
+        return logging_stats()
+
+    def get_read_cache_stats(self) -> List[ReadCacheStats]:
+        return self.read_cache.stats()
+
     def close(self):
+        if self._owns_data_version:
+            self._data_version.close()
+        self.read_db.close()
         self.db.close()
@@ -1,52 +1,52 @@
-import sys
+import importlib
 import os
+import sys
 
-# Add the parent directory (food_app) to sys.path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(current_dir)
-if parent_dir not in sys.path:
-    sys.path.append(parent_dir)
+# Make food_app importable when the script is run from a source checkout
+src_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if src_dir not in sys.path:
+    sys.path.append(src_dir)
 
 import streamlit as st
-from food_app.backend.infrastructure.logger import setup_logging, get_logger, trace_execution
-from food_app.frontend.api_client import ApiClient
+# Standard library only; the backend proper loads in get_api_client
+from food_app.backend.infrastructure.logger import trace_execution
 from food_app.frontend.constants import get_text
-from food_app.frontend.views.dashboard import render_dashboard
-from food_app.frontend.views.registry import render_registry
-from food_app.frontend.views.kitchen import render_kitchen
 
-# Configure logging
-setup_logging()
-logger = get_logger(__name__)
+# page id -> (navigation text key, view module, render function).
+# A view module, and whatever it imports, loads the first time its page is shown.
+PAGES = {
+    "dashboard": ("nav_dashboard", "food_app.frontend.views.dashboard", "render_dashboard"),
+    "registry": ("nav_registry", "food_app.frontend.views.registry", "render_registry"),
+    "kitchen": ("nav_kitchen", "food_app.frontend.views.kitchen", "render_kitchen"),
+    "diagnostics": ("nav_diagnostics", "food_app.frontend.views.diagnostics", "render_diagnostics"),
+}
 
 # 1. Setup & Architecture
 @st.cache_resource
 def get_api_client():
-    return ApiClient()
+    # Once per process: imports the backend, upgrades the schema and maps the catalog snapshot.
+    # Streamlit re-executes this script on every interaction; the cached client survives.
+    from food_app.frontend.runtime import create_api_client
+    return create_api_client()
 
-api_client = get_api_client()
+def load_view(page_id):
+    _, module, function = PAGES[page_id]
+    return getattr(importlib.import_module(module), function)
 
 # Page Config
 st.set_page_config(page_title=get_text("app_title"), layout="wide")
 
 # 2. UI Structure (Sidebar Navigation)
 st.sidebar.title(get_text("sidebar_title"))
-nav_options = {
-    get_text("nav_dashboard"): "dashboard",
-    get_text("nav_registry"): "registry",
-    get_text("nav_kitchen"): "kitchen"
-}
+nav_options = {get_text(text_key): page_id for page_id, (text_key, _, _) in PAGES.items()}
 selected_nav = st.sidebar.radio(get_text("sidebar_title"), options=list(nav_options.keys()))
 page_id = nav_options[selected_nav]
 
-# 3. Router
+# 3. Router; the sidebar above is already on screen while the backend loads
 @trace_execution
 def route_page(page_id, api_client):
-    if page_id == "dashboard":
-        render_dashboard(api_client)
-    elif page_id == "registry":
-        render_registry(api_client)
-    elif page_id == "kitchen":
-        render_kitchen(api_client)
+    load_view(page_id)(api_client)
 
+api_client = get_api_client()
+api_client.refresh()
 route_page(page_id, api_client)
@@ -0,0 +1,223 @@
+"""Coroutine facade over the ApiClient operations.
+
+Every call runs on a bounded thread pool in its own short-lived session, so
+independent reads can be awaited together with asyncio.gather and overlap
+their time in SQLite. Reads, nutrition calculations included, use the
+query_only pool; writes use the writer pool and commit when done.
+
+Services are built per call on that call's session, so their nutrient and
+unit caches start empty every time and are never reused across calls. Keep
+a long-lived ApiClient where warm catalog caches matter.
+
+Returned ORM objects are detached from their closed session: columns stay
+readable, relationships only if the call's loading plan fetched them.
+
+A call that times out or is cancelled interrupts its running SQL statement
+through sqlite3's Connection.interrupt(); Python work between statements is
+only stopped at the next statement.
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Callable, List, Optional, TypeVar
+
+from sqlalchemy.orm import Session
+
+from food_app.backend.infrastructure.database import SessionLocal, ReadSessionLocal
+from food_app.backend.infrastructure.models import Food, DailyLog, Recipe, Meal
+from food_app.backend.services.food_service import FoodService
+from food_app.backend.services.recipe_service import RecipeService
+from food_app.backend.services.meal_service import MealService
+from food_app.backend.services.log_service import DailyLogService, daily_nutrition_report, range_summary
+from food_app.backend.services.nutrition_dataclass import DailyNutritionReport, DailySummary, NutritionPerServing
+from food_app.backend.services.food_search import search_foods
+from food_app.backend.services.loading_plans import load_one, loading_options
+from food_app.backend.services.pagination import Page, DEFAULT_PAGE_SIZE, list_foods, list_recipes, list_meals
+from food_app.backend.domain.food import FoodCreate, FoodSearchResult
+from food_app.backend.domain.log import DailyLogCreate
+
+T = TypeVar("T")
+
+ASYNC_API_WORKERS = int(os.getenv("YAZIO_ASYNC_API_WORKERS", "4"))
+# Seconds a call may take before it is cancelled; 0 disables
+ASYNC_API_TIMEOUT = float(os.getenv("YAZIO_ASYNC_API_TIMEOUT", "30"))
+
+_DEFAULT = object()
+
+
+class _Call:
+    """Links an awaiting coroutine to the connection its worker is using."""
+
+    __slots__ = ("cancelled", "connection", "_lock")
+
+    def __init__(self):
+        self.cancelled = False
+        self.connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def attach(self, connection: sqlite3.Connection) -> None:
+        with self._lock:
+            if self.cancelled:
+                raise asyncio.CancelledError()
+            self.connection = connection
+
+    def detach(self) -> None:
+        with self._lock:
+            self.connection = None
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            if self.connection is not None:
+                self.connection.interrupt()
+
+
+class _Services:
+    def __init__(self, db: Session):
+        self.food = FoodService(db)
+        self.recipe = RecipeService(db, self.food)
+        self.meal = MealService(db, self.food, self.recipe)
+        self.log = DailyLogService(db, self.food, self.recipe, self.meal)
+
+
+class AsyncApiClient:
+    def __init__(
+        self,
+        max_workers: int = ASYNC_API_WORKERS,
+        timeout: Optional[float] = ASYNC_API_TIMEOUT or None,
+        session_factory=SessionLocal,
+        read_session_factory=ReadSessionLocal,
+    ):
+        self.timeout = timeout
+        self._session_factory = session_factory
+        self._read_session_factory = read_session_factory
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="async-api")
+
+    async def __aenter__(self) -> "AsyncApiClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stops accepting calls; queued ones are cancelled, running ones finish."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _execute(self, call: _Call, func: Callable[..., T], args: tuple, write: bool) -> T:
+        factory = self._session_factory if write else self._read_session_factory
+        with factory(expire_on_commit=False) as db:
+            call.attach(db.connection().connection.driver_connection)
+            try:
+                result = func(db, *args)
+                if write:
+                    db.commit()
+                return result
+            except Exception:
+                if write:
+                    db.rollback()
+                raise
+            finally:
+                call.detach()
+
+    async def run(self, func: Callable[..., T], *args, write: bool = False, timeout=_DEFAULT) -> T:
+        """Runs func(session, *args) on the pool and awaits its result.
+
+        Raises asyncio.TimeoutError after `timeout` seconds (default: the
+        client's timeout; None waits forever).
+        """
+        timeout = self.timeout if timeout is _DEFAULT else timeout
+        call = _Call()
+        future = asyncio.get_running_loop().run_in_executor(self._executor, self._execute, call, func, args, write)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            call.cancel()
+            raise
+
+    # Food Methods
+    async def get_active_foods(self, plan: Optional[str] = None) -> List[Food]:
+        def query(db):
+            return db.query(Food).options(*loading_options(plan)).filter(Food.is_active == True).all()
+        return await self.run(query)
+
+    async def list_foods(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        category: Optional[str] = None,
+        name: Optional[str] = None,
+        plan: Optional[str] = None,
+    ) -> Page[Food]:
+        return await self.run(list_foods, cursor, limit, category, name, loading_options(plan))
+
+    async def search_foods(self, query: str, limit: int = 20, category: Optional[str] = None) -> List[FoodSearchResult]:
+        return await self.run(search_foods, query, limit, category)
+
+    async def get_food_by_id(self, food_id: int, plan: Optional[str] = None) -> Optional[Food]:
+        return await self.run(load_one, Food, food_id, loading_options(plan))
+
+    async def create_food(self, data: FoodCreate) -> Food:
+        return await self.run(lambda db: _Services(db).food.create(data), write=True)
+
+    async def add_custom_unit(self, food_id: int, unit_name: str, grams: float):
+        return await self.run(lambda db: _Services(db).food.add_unit(food_id, unit_name, grams), write=True)
+
+    # Log Methods
+    async def get_logs_by_date(self, log_date: date, plan: Optional[str] = None) -> List[DailyLog]:
+        def query(db):
+            return db.query(DailyLog).options(*loading_options(plan)).filter(DailyLog.log_date == log_date).all()
+        return await self.run(query)
+
+    async def get_daily_nutrition(self, log_date: date) -> DailyNutritionReport:
+        return await self.run(daily_nutrition_report, log_date)
+
+    async def get_range_summary(self, start: date, end: date) -> List[DailySummary]:
+        return await self.run(range_summary, start, end)
+
+    async def log_consumption(self, data: DailyLogCreate) -> DailyLog:
+        return await self.run(lambda db: _Services(db).log.log_consumption(data), write=True)
+
+    async def log_consumption_batch(self, entries: List[DailyLogCreate]) -> List[DailyLog]:
+        return await self.run(lambda db: _Services(db).log.log_consumption_batch(entries), write=True)
+
+    async def delete_log(self, log_id: int) -> bool:
+        return await self.run(lambda db: _Services(db).log.delete_log(log_id), write=True)
+
+    # Recipe & Meal Methods
+    async def get_all_recipes(self, plan: Optional[str] = None) -> List[Recipe]:
+        return await self.run(lambda db: db.query(Recipe).options(*loading_options(plan)).all())
+
+    async def get_all_meals(self, plan: Optional[str] = None) -> List[Meal]:
+        return await self.run(lambda db: db.query(Meal).options(*loading_options(plan)).all())
+
+    async def list_recipes(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        name: Optional[str] = None,
+        plan: Optional[str] = None,
+    ) -> Page[Recipe]:
+        return await self.run(list_recipes, cursor, limit, name, loading_options(plan))
+
+    async def list_meals(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        name: Optional[str] = None,
+        plan: Optional[str] = None,
+    ) -> Page[Meal]:
+        return await self.run(list_meals, cursor, limit, name, loading_options(plan))
+
+    async def calculate_food_nutrition(self, food_id: int, quantity: float, unit_name: str) -> NutritionPerServing:
+        return await self.run(lambda db: _Services(db).food.calculate_nutrition(food_id, quantity, unit_name))
+
+    async def calculate_recipe_nutrition(
+        self, recipe_id: int, quantity: float = 1.0, unit_name: str = "portion"
+    ) -> NutritionPerServing:
+        return await self.run(lambda db: _Services(db).recipe.calculate_nutrition(recipe_id, quantity, unit_name))
+
+    async def calculate_meal_nutrition(self, meal_id: int) -> NutritionPerServing:
+        return await self.run(lambda db: _Services(db).meal.calculate_nutrition(meal_id))
@@ -0,0 +1,21 @@
+import streamlit as st
+from food_app.frontend.constants import get_text
+
+def current_cursor(key, filters=()):
+    """Cursor of the page being shown; going back to page one whenever the filters change."""
+    state = st.session_state.get(key)
+    if state is None or state["filters"] != filters:
+        state = st.session_state[key] = {"filters": filters, "cursors": [None]}
+    return state["cursors"][-1]
+
+def render_pager(key, next_cursor):
+    # Cursors of the pages seen so far, so "previous" needs no reverse query
+    cursors = st.session_state[key]["cursors"]
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    if prev_col.button(get_text("page_prev"), key=f"{key}_prev", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    page_col.caption(get_text("page_number").format(page=len(cursors)))
+    if next_col.button(get_text("page_next"), key=f"{key}_next", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
@@ -8,6 +8,7 @@ TEXTS = {
         "nav_dashboard": "Dashboard & Diário",
         "nav_registry": "Registro de Alimentos",
         "nav_kitchen": "Cozinha (Receitas/Refeições)",
+        "nav_diagnostics": "Diagnóstico",
         
         "dashboard_header": "Dashboard & Diário",
         "select_date": "Selecione a Data",
@@ -20,11 +21,18 @@ TEXTS = {
         "no_logs": "Nenhum registro para esta data.",
         "log_consumption_header": "Registrar Consumo",
         "select_food": "Selecione o Alimento",
+        "search_food": "Buscar Alimento",
+        "search_food_placeholder": "ex: feijão, almôndega",
+        "search_no_results": "Nenhum alimento encontrado.",
         "quantity": "Quantidade",
         "unit": "Unidade",
         "btn_log": "Registrar Consumo",
         "log_success": "Registrado {quantity} {unit} de {name}",
         "log_error": "Erro ao registrar consumo: {error}",
+        "recommend_header": "Sugestões para completar suas metas",
+        "recommend_remaining": "Faltam {kcal:.0f} kcal · P: {p:.0f}g · C: {c:.0f}g · G: {f:.0f}g",
+        "recommend_done": "Metas do dia atingidas.",
+        "recommend_empty": "Nenhum alimento cabe no que falta hoje.",
         
         "registry_header": "Registrar Novo Alimento",
         "food_name": "Nome do Alimento",
@@ -56,6 +64,23 @@ TEXTS = {
         "no_meals": "Nenhuma refeição encontrada.",
         "nutrition_per_portion": "**Nutrição por porção:** {kcal:.1f} kcal | P: {p:.1f}g | C: {c:.1f}g | F: {f:.1f}g",
         "total_nutrition": "**Nutrição Total:** {kcal:.1f} kcal | P: {p:.1f}g | C: {c:.1f}g | F: {f:.1f}g",
+        "filter_name": "Filtrar por nome",
+        "filter_category": "Categoria",
+        "all_categories": "Todas",
+        "page_prev": "← Anterior",
+        "page_next": "Próxima →",
+        "page_number": "Página {page}",
+        "meal_cache_stats": "Cache de refeições: {hits} acertos / {misses} cálculos",
+        "diagnostics_header": "Diagnóstico de Desempenho",
+        "metrics_enabled": "Métricas ativas",
+        "metrics_sample_every": "Cronometrar 1 a cada N chamadas",
+        "metrics_reset": "Zerar métricas",
+        "metrics_empty": "Nenhuma chamada registrada ainda.",
+        "metrics_download": "Baixar métricas (Prometheus)",
+        "metrics_prometheus": "Formato Prometheus",
+        "logging_stats": "Logs: {queued} na fila, {dropped} descartados, {suppressed} suprimidos",
+        "read_cache_header": "Cache de leituras",
+        "read_cache_stats": "Versão dos dados: {version} · {invalidations} invalidações",
         "has_serving_unit": "Este item possui uma unidade de medida padrão? (ex: pote, embalagem)",
         "serving_unit_name": "Nome da Unidade (ex: pote, fatia)",
         "serving_unit_weight": "Peso da Unidade (g/ml)",
@@ -63,6 +88,10 @@ TEXTS = {
     }
 }
 
+# Daily goals shown on the dashboard and used to rank recommendations
+MACRO_GOALS = {"calories": 2000.0, "proteins": 100.0, "carbs": 250.0, "fats": 65.0}
+RECOMMENDATION_LIMIT = 5
+
 FOOD_CATEGORIES = ["Carnes", "Grãos", "Laticínios", "Vegetais", "Pratos Prontos", "Outros"]
 COMMON_UNITS = ["g", "ml", "fatia", "unidade", "colher", "Outro..."]
 
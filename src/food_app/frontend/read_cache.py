@@ -0,0 +1,121 @@
+"""Memoized ApiClient reads that survive Streamlit reruns.
+
+The ApiClient lives in st.cache_resource, so a cache held by it outlives the
+script reruns triggered by every widget interaction. Entries are only valid
+for the data version they were read at: when the version token changes
+(a write through the client, or a commit by any other connection) every
+table is emptied before the next lookup. Each cached method has its own
+bounded LRU table.
+
+Cached values are shared between callers and must not be mutated.
+"""
+import functools
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List
+
+READ_CACHE_ENABLED = os.getenv("YAZIO_READ_CACHE", "1") not in ("0", "false", "off")
+# Default entries per cached method
+READ_CACHE_SIZE = int(os.getenv("YAZIO_READ_CACHE_SIZE", "128"))
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class ReadCacheStats:
+    name: str
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+class _Table:
+    __slots__ = ("entries", "maxsize", "hits", "misses", "evictions")
+
+    def __init__(self, maxsize: int):
+        self.entries: OrderedDict = OrderedDict()
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+
+
+class ReadCache:
+    def __init__(self, version: Callable[[], Hashable], enabled: bool = READ_CACHE_ENABLED):
+        self._version_of = version
+        self.enabled = enabled
+        self.invalidations = 0
+        self._version = _MISSING
+        self._tables: Dict[str, _Table] = {}
+        self._lock = threading.Lock()
+
+    def _table(self, name: str, maxsize: int) -> _Table:
+        table = self._tables.get(name)
+        if table is None:
+            table = self._tables[name] = _Table(maxsize)
+        return table
+
+    def _check_version(self) -> None:
+        version = self._version_of()
+        if version != self._version:
+            if self._version is not _MISSING:
+                self.invalidations += 1
+            self._version = version
+            for table in self._tables.values():
+                table.entries.clear()
+
+    def get_or_compute(self, name: str, maxsize: int, key: Hashable, compute: Callable):
+        if not self.enabled:
+            return compute()
+        try:
+            hash(key)
+        except TypeError:
+            return compute()
+        with self._lock:
+            self._check_version()
+            version = self._version
+            table = self._table(name, maxsize)
+            value = table.entries.get(key, _MISSING)
+            if value is not _MISSING:
+                table.entries.move_to_end(key)
+                table.hits += 1
+                return value
+            table.misses += 1
+        value = compute()
+        with self._lock:
+            # A write that landed meanwhile makes the value stale before it is stored
+            if self._version == version and self._version_of() == version:
+                table.entries[key] = value
+                if len(table.entries) > table.maxsize:
+                    table.entries.popitem(last=False)
+                    table.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            for table in self._tables.values():
+                table.entries.clear()
+
+    def stats(self) -> List[ReadCacheStats]:
+        with self._lock:
+            return [
+                ReadCacheStats(name, t.hits, t.misses, t.evictions, len(t.entries), t.maxsize)
+                for name, t in sorted(self._tables.items())
+            ]
+
+
+def cached_read(maxsize: int = READ_CACHE_SIZE):
+    """Caches a method in the instance's `read_cache`, keyed by its arguments."""
+    def decorate(func):
+        name = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            return self.read_cache.get_or_compute(name, maxsize, key, lambda: func(self, *args, **kwargs))
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,22 @@
+"""Backend setup for a frontend process, kept out of the Streamlit script.
+
+Importing this module is what loads SQLAlchemy, the models, numpy and the
+services, so app.py defers it until the first page needs a client. The
+setup itself (schema upgrade, catalog snapshot) belongs to
+create_api_client, which the app runs once per process.
+"""
+from food_app.backend.infrastructure.database import CATALOG_PATH, engine
+from food_app.backend.infrastructure.logger import setup_logging
+from food_app.backend.infrastructure.migrations import init_db
+from food_app.backend.services.catalog_snapshot import current_catalog
+from food_app.frontend.api_client import ApiClient
+
+
+def create_api_client() -> ApiClient:
+    """Upgrades the schema, maps the shared catalog snapshot and returns a client over them."""
+    setup_logging()
+    init_db(engine)
+    # Exports the snapshot first if the foods changed since it was written
+    with engine.connect() as conn:
+        catalog = current_catalog(conn, CATALOG_PATH)
+    return ApiClient(catalog=catalog)
@@ -1,9 +1,38 @@
 import streamlit as st
-import pandas as pd
 from datetime import date
-from food_app.frontend.constants import get_text
+from food_app.frontend.constants import get_text, FOOD_CATEGORIES, MACRO_GOALS, RECOMMENDATION_LIMIT
 from food_app.frontend.components.metrics import render_nutrition_metrics
+from food_app.frontend.components.pager import current_cursor, render_pager
 from food_app.backend.domain.log import DailyLogCreate
+from food_app.backend.services.nutrition_dataclass import MacroGoals
+
+FOOD_SEARCH_LIMIT = 25
+
+def render_recommendations(api_client, goals: MacroGoals, remaining: MacroGoals):
+    st.subheader(get_text("recommend_header"))
+    if remaining.calories <= 0:
+        st.info(get_text("recommend_done"))
+        return
+    st.caption(get_text("recommend_remaining").format(
+        kcal=remaining.calories, p=max(remaining.proteins, 0), c=max(remaining.carbs, 0), f=max(remaining.fats, 0),
+    ))
+    try:
+        suggestions = api_client.recommend_foods(remaining, RECOMMENDATION_LIMIT, goals)
+    except Exception as e:
+        st.error(f"Error fetching recommendations: {e}")
+        return
+    if not suggestions:
+        st.info(get_text("recommend_empty"))
+        return
+    # Rows as plain dicts; streamlit only loads pandas once there is a table to draw
+    st.dataframe([{
+        "Name": s.name,
+        "Serving": f"{s.quantity:g} {s.unit_name} ({s.weight_grams:.0f} g)",
+        "Calories": round(s.macros.calories, 1),
+        "Protein": round(s.macros.proteins, 1),
+        "Carbs": round(s.macros.carbs, 1),
+        "Fat": round(s.macros.fats, 1),
+    } for s in suggestions], width="stretch")
 
 def render_dashboard(api_client):
     st.header(get_text("dashboard_header"))
@@ -12,73 +41,81 @@ def render_dashboard(api_client):
     with col1:
         selected_date = st.date_input(get_text("select_date"), date.today())
     
-    goal_kcal = 2000
+    goals = MacroGoals(**MACRO_GOALS)
     
-    # Fetch logs
+    # Fetch the day's nutrition in one aggregated query
     try:
-        logs = api_client.get_logs_by_date(selected_date)
+        report = api_client.get_daily_nutrition(selected_date)
     except Exception as e:
         st.error(f"Error fetching logs: {e}")
-        logs = []
+        report = None
     
     total_kcal = total_prot = total_carb = total_fat = 0.0
     log_data = []
     
-    if logs:
-        for log in logs:
-            try:
-                if log.food_id:
-                    n = api_client.calculate_food_nutrition(log.food_id, log.quantity, log.unit_name)
-                    name = log.food.name if log.food else "Unknown Food"
-                elif log.recipe_id:
-                    n = api_client.calculate_recipe_nutrition(log.recipe_id, log.quantity, log.unit_name)
-                    name = log.recipe.name if log.recipe else "Unknown Recipe"
-                elif log.meal_id:
-                    n = api_client.calculate_meal_nutrition(log.meal_id)
-                    name = log.meal.name if log.meal else "Unknown Meal"
-                else:
-                    continue
-                
-                if n:
-                    total_kcal += n.calories
-                    total_prot += n.proteins
-                    total_carb += n.carbs
-                    total_fat += n.fats
-                    
-                    log_data.append({
-                        "Name": name,
-                        "Quantity": f"{log.quantity} {log.unit_name}",
-                        "Calories": round(n.calories, 1),
-                        "Protein": round(n.proteins, 1),
-                        "Carbs": round(n.carbs, 1),
-                        "Fat": round(n.fats, 1)
-                    })
-            except Exception as e:
-                st.warning(f"Error processing log entry: {e}")
+    if report:
+        total_kcal = report.totals.calories
+        total_prot = report.totals.proteins
+        total_carb = report.totals.carbs
+        total_fat = report.totals.fats
+        for entry in report.entries:
+            n = entry.nutrition
+            log_data.append({
+                "Name": entry.name,
+                "Quantity": f"{entry.quantity} {entry.unit_name}",
+                "Calories": round(n.calories, 1),
+                "Protein": round(n.proteins, 1),
+                "Carbs": round(n.carbs, 1),
+                "Fat": round(n.fats, 1)
+            })
 
-    render_nutrition_metrics(total_kcal, total_prot, total_carb, total_fat, goal_kcal)
+    render_nutrition_metrics(total_kcal, total_prot, total_carb, total_fat, int(goals.calories))
+    render_recommendations(
+        api_client, goals,
+        MacroGoals(goals.calories - total_kcal, goals.proteins - total_prot, goals.carbs - total_carb, goals.fats - total_fat),
+    )
 
     st.subheader(get_text("daily_log_subheader"))
     if log_data:
-        st.dataframe(pd.DataFrame(log_data), width="stretch")
+        st.dataframe(log_data, width="stretch")
     else:
         st.info(get_text("no_logs"))
 
     st.divider()
     st.subheader(get_text("log_consumption_header"))
     
+    search_col, category_col = st.columns([2, 1])
+    with search_col:
+        search_query = st.text_input(get_text("search_food"), placeholder=get_text("search_food_placeholder"))
+    with category_col:
+        category = st.selectbox(get_text("filter_category"), [get_text("all_categories")] + FOOD_CATEGORIES)
+    category = None if category == get_text("all_categories") else category
+
+    # Typed text goes to the search index; otherwise browse the catalog a page at a time
+    browse_page = None
     try:
-        all_foods = api_client.get_active_foods()
+        if search_query.strip():
+            matches = api_client.search_foods(search_query, limit=FOOD_SEARCH_LIMIT, category=category)
+        else:
+            browse_page = api_client.list_foods(
+                current_cursor("food_pages", (category,)), FOOD_SEARCH_LIMIT, category=category
+            )
+            matches = browse_page.items
     except Exception as e:
         st.error(f"Error fetching foods: {e}")
-        all_foods = []
+        matches = []
 
-    if not all_foods:
-        st.info("No data yet. Please go to 'Food Registry' to add some.")
+    if not matches:
+        if search_query or category:
+            st.info(get_text("search_no_results"))
+        else:
+            st.info("No data yet. Please go to 'Food Registry' to add some.")
         return
+    if browse_page is not None:
+        render_pager("food_pages", browse_page.next_cursor)
 
     with st.form("log_food_form"):
-        food_options = {f"{f.name} ({f.category})": f.id for f in all_foods}
+        food_options = {f"{f.name} ({f.category})": f.id for f in matches}
         
         selected_food_name = st.selectbox(get_text("select_food"), options=list(food_options.keys()))
         food_id = food_options[selected_food_name] if selected_food_name else None
@@ -89,7 +126,7 @@ def render_dashboard(api_client):
         with q_col2:
             available_units = ["g", "ml"]
             if food_id:
-                food_obj = api_client.get_food_by_id(food_id)
+                food_obj = api_client.get_food_by_id(food_id, plan="food_with_units")
                 if food_obj:
                     available_units += [u.unit_name for u in food_obj.units]
             unit = st.selectbox(get_text("unit"), options=list(set(available_units)))
@@ -0,0 +1,61 @@
+import streamlit as st
+from food_app.frontend.constants import get_text
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+def render_diagnostics(api_client):
+    st.header(get_text("diagnostics_header"))
+
+    enabled, sample_every = api_client.get_metrics_config()
+    c1, c2, c3 = st.columns([1, 1, 1])
+    with c1:
+        new_enabled = st.toggle(get_text("metrics_enabled"), value=enabled)
+    with c2:
+        new_sample_every = st.number_input(get_text("metrics_sample_every"), min_value=1, value=sample_every, step=1)
+    with c3:
+        if st.button(get_text("metrics_reset")):
+            api_client.reset_metrics()
+    if (new_enabled, new_sample_every) != (enabled, sample_every):
+        api_client.configure_metrics(new_enabled, int(new_sample_every))
+
+    stats = api_client.get_metrics()
+    if stats:
+        rows = [{
+            "Function": ".".join(s.name.split(".")[-2:]),
+            "Calls": s.calls,
+            "Errors": s.errors,
+            "Sampled": s.sampled,
+            "p50 (ms)": _ms(s.p50),
+            "p95 (ms)": _ms(s.p95),
+            "p99 (ms)": _ms(s.p99),
+            "Mean (ms)": _ms(s.mean),
+        } for s in stats]
+        st.dataframe(rows, width="stretch")
+    else:
+        st.info(get_text("metrics_empty"))
+
+    st.subheader(get_text("read_cache_header"))
+    reads = api_client.get_read_cache_stats()
+    if reads:
+        st.dataframe([{
+            "Method": s.name,
+            "Hits": s.hits,
+            "Misses": s.misses,
+            "Hit rate": round(s.hits / (s.hits + s.misses), 3) if s.hits + s.misses else 0.0,
+            "Evictions": s.evictions,
+            "Size": f"{s.size}/{s.maxsize}",
+        } for s in reads], width="stretch")
+    st.caption(get_text("read_cache_stats").format(
+        version=api_client.data_version(), invalidations=api_client.read_cache.invalidations,
+    ))
+
+    cache = api_client.get_meal_cache_stats()
+    st.caption(get_text("meal_cache_stats").format(hits=cache.hits, misses=cache.misses))
+    logs = api_client.get_logging_stats()
+    st.caption(get_text("logging_stats").format(queued=logs.queued, dropped=logs.dropped, suppressed=logs.suppressed))
+
+    text = api_client.get_metrics_text()
+    st.download_button(get_text("metrics_download"), text, file_name="metrics.prom", mime="text/plain")
+    with st.expander(get_text("metrics_prometheus")):
+        st.code(text, language="text")
@@ -1,36 +1,45 @@
 import streamlit as st
 from food_app.frontend.constants import get_text
+from food_app.frontend.components.pager import current_cursor, render_pager
+
+KITCHEN_PAGE_SIZE = 20
 
 def render_kitchen(api_client):
     st.header(get_text("kitchen_header"))
-    
+
     tab1, tab2 = st.tabs([get_text("tab_recipes"), get_text("tab_meals")])
-    
+
     with tab1:
         st.subheader(get_text("existing_recipes"))
+        name = st.text_input(get_text("filter_name"), key="recipe_name_filter")
         try:
-            recipes = api_client.get_all_recipes()
-            if recipes:
-                for r in recipes:
+            page = api_client.list_recipes(current_cursor("recipe_pages", (name,)), KITCHEN_PAGE_SIZE, name=name)
+            if page.items:
+                for r in page.items:
                     with st.expander(f"{r.name} ({r.portions_yield} porções)"):
                         n = api_client.calculate_recipe_nutrition(r.id)
                         if n:
                             st.write(get_text("nutrition_per_portion").format(kcal=n.calories, p=n.proteins, c=n.carbs, f=n.fats))
+                render_pager("recipe_pages", page.next_cursor)
             else:
                 st.info("No data yet.")
         except Exception as e:
             st.info("No data yet.")
-            
+
     with tab2:
         st.subheader(get_text("existing_meals"))
+        name = st.text_input(get_text("filter_name"), key="meal_name_filter")
         try:
-            meals = api_client.get_all_meals()
-            if meals:
-                for m in meals:
+            page = api_client.list_meals(current_cursor("meal_pages", (name,)), KITCHEN_PAGE_SIZE, name=name)
+            if page.items:
+                for m in page.items:
                     with st.expander(m.name):
                         n = api_client.calculate_meal_nutrition(m.id)
                         if n:
                             st.write(get_text("total_nutrition").format(kcal=n.calories, p=n.proteins, c=n.carbs, f=n.fats))
+                render_pager("meal_pages", page.next_cursor)
+                stats = api_client.get_meal_cache_stats()
+                st.caption(get_text("meal_cache_stats").format(hits=stats.hits, misses=stats.misses))
             else:
                 st.info("No data yet.")
         except Exception as e:
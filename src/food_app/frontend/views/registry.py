@@ -76,10 +76,7 @@ def render_registry(api_client):
                     
                     # 2. Add Serving Unit if requested
                     if has_serving and serving_unit_name:
-                        # We need a method in api_client to add units, or use food_service directly if allowed
-                        # Since ApiClient is our abstraction, let's assume it has add_food_unit
-                        api_client.food_service.add_unit(new_food.id, serving_unit_name, serving_weight)
-                        api_client.db.commit()
+                        api_client.add_custom_unit(new_food.id, serving_unit_name, serving_weight)
                     
                     st.success(get_text("registry_success").format(name=name))
                 except Exception as e:
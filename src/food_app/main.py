@@ -1,25 +1,72 @@
-import csv
+import argparse
 import os
 from datetime import date
 from sqlalchemy.orm import Session
 
-from food_app.backend.infrastructure.database import engine, SessionLocal
-from food_app.backend.infrastructure.base import Base
+from food_app.backend.infrastructure.database import CATALOG_PATH, engine, SessionLocal
+from food_app.backend.infrastructure.migrations import init_db
 from food_app.backend.infrastructure.logger import setup_logging, get_logger
 from food_app.backend.services.food_service import FoodService
 from food_app.backend.services.recipe_service import RecipeService
 from food_app.backend.services.meal_service import MealService
-from food_app.backend.services.log_service import DailyLogService
+from food_app.backend.services.log_service import DailyLogService, backfill_log_snapshots, rebuild_daily_summary
+from food_app.backend.services.import_service import FoodImportService, ImportStats
+from food_app.backend.services.catalog_snapshot import export_catalog
 from food_app.backend.domain.food import FoodCreate
 from food_app.backend.domain.log import DailyLogCreate
 
 logger = get_logger(__name__)
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Food tracker backend tools")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("demo", help="create sample data and load data/frutifica.csv (default)")
+    rebuild = commands.add_parser("rebuild-summary", help="recompute the daily nutrition summary from the logs")
+    rebuild.add_argument("--start", type=date.fromisoformat, help="first day, YYYY-MM-DD (default: earliest)")
+    rebuild.add_argument("--end", type=date.fromisoformat, help="last day, YYYY-MM-DD (default: latest)")
+    backfill = commands.add_parser(
+        "backfill-snapshots", help="store nutrient snapshots on entries logged before they existed, using current food values"
+    )
+    backfill.add_argument("--start", type=date.fromisoformat, help="first day, YYYY-MM-DD (default: earliest)")
+    backfill.add_argument("--end", type=date.fromisoformat, help="last day, YYYY-MM-DD (default: latest)")
+    export = commands.add_parser(
+        "export-catalog", help="write the memory-mapped catalog snapshot the app and server load at startup"
+    )
+    export.add_argument("--path", default=str(CATALOG_PATH), help=f"output file (default: {CATALOG_PATH})")
+    args = parser.parse_args(argv)
+
     setup_logging()
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    # Create tables and upgrade older database files
+    init_db(engine)
+
+    if args.command == "rebuild-summary":
+        rebuild_summary(args.start, args.end)
+    elif args.command == "backfill-snapshots":
+        backfill_snapshots(args.start, args.end)
+    elif args.command == "export-catalog":
+        export_catalog_snapshot(args.path)
+    else:
+        demo()
+
+def rebuild_summary(start=None, end=None) -> int:
+    with SessionLocal() as db:
+        days = rebuild_daily_summary(db, start, end)
+        db.commit()
+    logger.info(f"Rebuilt daily summary for {days} days")
+    return days
 
+def backfill_snapshots(start=None, end=None) -> int:
+    with SessionLocal() as db:
+        rows = backfill_log_snapshots(db, start, end)
+        db.commit()
+    logger.info(f"Stored nutrient snapshots on {rows} log entries")
+    return rows
+
+def export_catalog_snapshot(path=CATALOG_PATH):
+    with SessionLocal() as db:
+        return export_catalog(db, path)
+
+def demo():
     with SessionLocal() as db:
         # Initialize services
         food_service = FoodService(db)
@@ -76,40 +123,15 @@ def main():
         project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         csv_path = os.path.join(project_root, "data", "frutifica.csv")
         if os.path.exists(csv_path):
-            load_csv(db, food_service, csv_path)
-
-def load_csv(db: Session, food_service: FoodService, csv_path: str):
-    with open(csv_path, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            name = row.get('nome', '')
-            portion = row.get('porcao', 0)
-            calories = row.get('kcal', 0)
-            proteins = row.get('proteina', 0)
-            carbs = row.get('carboidrato', 0)
-            fats = row.get('gordura', 0)
-            weight_g = row.get('peso_g', 0)
-            quantity_type = row.get('tipo_quantidade', '')
-
-            logger.info(f"Loading food from CSV: {name}")
-            food_data = FoodCreate(
-                name=name,
-                category="Food",
-                unit_label="g",
-                unit_val=float(portion),
-                calories=float(calories),
-                proteins=float(proteins),
-                carbs=float(carbs),
-                fats=float(fats),
-                saturated_fats=float(row.get('gordura_saturada', 0)) if row.get('gordura_saturada') else None,
-                trans_fats=float(row.get('gordura_trans', 0)) if row.get('gordura_trans') else None,
-                fiber=float(row.get('fibra', 0)) if row.get('fibra') else None,
-                sodium=float(row.get('sodio_mg', 0)) if row.get('sodio_mg') else None,
-                sugar=float(row.get('acucar_total', 0)) if row.get('acucar_total') else None,
-            )
-            food = food_service.create(food_data)
-            food_service.add_unit(food.id, quantity_type, float(weight_g))
-            db.commit()
+            load_csv(db, csv_path)
+
+def load_csv(db: Session, csv_path: str) -> ImportStats:
+    stats = FoodImportService(db).import_csv(csv_path)
+    logger.info(
+        f"Loaded {stats.rows} foods from {csv_path} in {stats.seconds:.2f}s "
+        f"({stats.rows_per_sec:.0f} rows/s, {stats.invalid_rows} invalid rows skipped)"
+    )
+    return stats
 
 if __name__ == "__main__":
     main()
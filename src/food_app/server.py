@@ -0,0 +1,466 @@
+"""JSON-over-HTTP API for the food services, built on http.server.
+
+Several frontends can share one warm backend process instead of each
+opening the database and rebuilding its caches. Requests are handled by a
+fixed pool of worker threads, each with its own ApiClient (sessions, unit
+and nutrient caches, read cache).
+
+GET responses carry an ETag made of the data version, so a client sending
+it back in If-None-Match gets 304 Not Modified until something is written.
+The tag is weak (W/"..."): the gzip and identity bodies of one resource
+share it, which only semantic equivalence allows.
+Responses are gzip-compressed when the client accepts it, and connections
+are kept alive (HTTP/1.1) until idle for KEEPALIVE_TIMEOUT seconds.
+
+    python -m food_app.server --port 8080 --workers 8
+
+Endpoints:
+    GET    /foods?cursor=&limit=&category=&name=   GET  /foods/search?q=&limit=&category=
+    GET    /foods/<id>                             POST /foods
+    GET    /foods/<id>/similar?limit=&same_category=
+    GET    /foods/<id>/nutrition?quantity=&unit=   POST /foods/<id>/units
+    GET    /recipes?cursor=&limit=&name=           POST /recipes
+    GET    /recipes/<id>/nutrition?quantity=&unit= POST /recipes/<id>/ingredients
+    GET    /meals?cursor=&limit=&name=             POST /meals
+    GET    /meals/<id>/nutrition                   POST /meals/<id>/items
+    GET    /logs/<yyyy-mm-dd>                      POST /logs
+    GET    /summary?start=&end=                    DELETE /logs/<id>
+    GET    /metrics (Prometheus text)              POST /logs/batch  {"entries": [...]}
+"""
+import argparse
+import dataclasses
+import gzip
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import inspect
+from sqlalchemy.orm import sessionmaker
+
+from food_app.backend.infrastructure import metrics
+from food_app.backend.infrastructure.base import Base
+from food_app.backend.infrastructure.database import CATALOG_PATH, DataVersion, SessionLocal, ReadSessionLocal, engine
+from food_app.backend.infrastructure.migrations import init_db
+from food_app.backend.infrastructure.logger import setup_logging
+from food_app.backend.domain.food import FoodCreate
+from food_app.backend.domain.log import DailyLogCreate
+from food_app.backend.services.catalog_snapshot import current_catalog
+from food_app.backend.services.log_service import BatchValidationError
+from food_app.frontend.api_client import ApiClient
+
+logger = logging.getLogger(__name__)
+
+HTTP_WORKERS = int(os.getenv("YAZIO_HTTP_WORKERS", "8"))
+# Idle seconds before a kept-alive connection is closed and its worker freed
+KEEPALIVE_TIMEOUT = float(os.getenv("YAZIO_HTTP_KEEPALIVE", "15"))
+# Smaller bodies are sent uncompressed
+GZIP_MIN_BYTES = 1024
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(obj):
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Base):
+        return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+    if dataclasses.is_dataclass(obj):
+        # Shallow, so ORM objects inside come back through this function
+        return {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if hasattr(obj, "item"):
+        # numpy scalars
+        return obj.item()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def _arg(params: Dict[str, List[str]], name: str, convert: Callable = str, default=None):
+    values = params.get(name)
+    if not values or values[-1] == "":
+        return default
+    try:
+        return convert(values[-1])
+    except ValueError as e:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"invalid {name}: {e}") from None
+
+
+def _found(value, what: str):
+    if value is None:
+        raise HttpError(HTTPStatus.NOT_FOUND, f"{what} not found")
+    return value
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    # If-None-Match uses the weak comparison: W/ prefixes are ignored on both sides
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in (tag.removeprefix("W/") for tag in tags)
+
+
+# Handlers take (api, match, params, body) and return (status, payload)
+def _list_foods(api, match, params, body):
+    return HTTPStatus.OK, api.list_foods(
+        cursor=_arg(params, "cursor"), limit=_arg(params, "limit", int, 20),
+        category=_arg(params, "category"), name=_arg(params, "name"),
+    )
+
+
+def _search_foods(api, match, params, body):
+    return HTTPStatus.OK, api.search_foods(
+        _arg(params, "q", default=""), _arg(params, "limit", int, 20), category=_arg(params, "category"),
+    )
+
+
+def _get_food(api, match, params, body):
+    food = _found(api.get_food_by_id(int(match["id"]), plan="food_with_units"), "food")
+    return HTTPStatus.OK, dict(_json_default(food), units=list(food.units))
+
+
+def _similar_foods(api, match, params, body):
+    same_category = _arg(params, "same_category", default="false").lower() in ("1", "true", "yes")
+    return HTTPStatus.OK, api.find_similar_foods(int(match["id"]), _arg(params, "limit", int, 10), same_category)
+
+
+def _food_nutrition(api, match, params, body):
+    return HTTPStatus.OK, api.calculate_food_nutrition(
+        int(match["id"]), _arg(params, "quantity", float, 100.0), _arg(params, "unit", default="g"),
+    )
+
+
+def _create_food(api, match, params, body):
+    return HTTPStatus.CREATED, api.create_food(FoodCreate.model_validate(body))
+
+
+def _add_unit(api, match, params, body):
+    return HTTPStatus.CREATED, api.add_custom_unit(int(match["id"]), _field(body, "unit_name"), float(_field(body, "grams")))
+
+
+def _list_recipes(api, match, params, body):
+    return HTTPStatus.OK, api.list_recipes(
+        cursor=_arg(params, "cursor"), limit=_arg(params, "limit", int, 20), name=_arg(params, "name"),
+    )
+
+
+def _recipe_nutrition(api, match, params, body):
+    return HTTPStatus.OK, api.calculate_recipe_nutrition(
+        int(match["id"]), _arg(params, "quantity", float, 1.0), _arg(params, "unit", default="portion"),
+    )
+
+
+def _create_recipe(api, match, params, body):
+    return HTTPStatus.CREATED, api.create_recipe(_field(body, "name"), int(_field(body, "portions_yield")))
+
+
+def _add_ingredient(api, match, params, body):
+    return HTTPStatus.CREATED, api.add_recipe_ingredient(
+        int(match["id"]), body.get("food_id"), float(_field(body, "quantity")), _field(body, "unit_name"),
+        sub_recipe_id=body.get("sub_recipe_id"),
+    )
+
+
+def _list_meals(api, match, params, body):
+    return HTTPStatus.OK, api.list_meals(
+        cursor=_arg(params, "cursor"), limit=_arg(params, "limit", int, 20), name=_arg(params, "name"),
+    )
+
+
+def _meal_nutrition(api, match, params, body):
+    return HTTPStatus.OK, api.calculate_meal_nutrition(int(match["id"]))
+
+
+def _create_meal(api, match, params, body):
+    return HTTPStatus.CREATED, api.create_meal(_field(body, "name"))
+
+
+def _add_meal_item(api, match, params, body):
+    return HTTPStatus.CREATED, api.add_meal_item(
+        int(match["id"]), float(_field(body, "quantity")), _field(body, "unit_name"),
+        food_id=body.get("food_id"), recipe_id=body.get("recipe_id"),
+    )
+
+
+def _daily_nutrition(api, match, params, body):
+    try:
+        log_date = date.fromisoformat(match["date"])
+    except ValueError as e:
+        raise HttpError(HTTPStatus.BAD_REQUEST, str(e)) from None
+    return HTTPStatus.OK, api.get_daily_nutrition(log_date)
+
+
+def _range_summary(api, match, params, body):
+    end = _arg(params, "end", date.fromisoformat, date.today())
+    start = _arg(params, "start", date.fromisoformat, end)
+    return HTTPStatus.OK, api.get_range_summary(start, end)
+
+
+def _log_consumption(api, match, params, body):
+    return HTTPStatus.CREATED, api.log_consumption(DailyLogCreate.model_validate(body))
+
+
+def _log_consumption_batch(api, match, params, body):
+    entries = _field(body, "entries")
+    if not isinstance(entries, list):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "entries must be a list")
+    return HTTPStatus.CREATED, api.log_consumption_batch(entries)
+
+
+def _delete_log(api, match, params, body):
+    if not api.delete_log(int(match["id"])):
+        raise HttpError(HTTPStatus.NOT_FOUND, "log entry not found")
+    return HTTPStatus.NO_CONTENT, None
+
+
+def _field(body: dict, name: str):
+    if name not in body:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"missing field {name!r}")
+    return body[name]
+
+
+ROUTES: List[Tuple[str, "re.Pattern", Callable]] = [
+    (method, re.compile(f"^{pattern}$"), handler)
+    for method, pattern, handler in (
+        ("GET", r"/foods", _list_foods),
+        ("GET", r"/foods/search", _search_foods),
+        ("GET", r"/foods/(?P<id>\d+)", _get_food),
+        ("GET", r"/foods/(?P<id>\d+)/nutrition", _food_nutrition),
+        ("GET", r"/foods/(?P<id>\d+)/similar", _similar_foods),
+        ("POST", r"/foods", _create_food),
+        ("POST", r"/foods/(?P<id>\d+)/units", _add_unit),
+        ("GET", r"/recipes", _list_recipes),
+        ("GET", r"/recipes/(?P<id>\d+)/nutrition", _recipe_nutrition),
+        ("POST", r"/recipes", _create_recipe),
+        ("POST", r"/recipes/(?P<id>\d+)/ingredients", _add_ingredient),
+        ("GET", r"/meals", _list_meals),
+        ("GET", r"/meals/(?P<id>\d+)/nutrition", _meal_nutrition),
+        ("POST", r"/meals", _create_meal),
+        ("POST", r"/meals/(?P<id>\d+)/items", _add_meal_item),
+        ("GET", r"/logs/(?P<date>[0-9-]+)", _daily_nutrition),
+        ("POST", r"/logs", _log_consumption),
+        ("POST", r"/logs/batch", _log_consumption_batch),
+        ("DELETE", r"/logs/(?P<id>\d+)", _delete_log),
+        ("GET", r"/summary", _range_summary),
+    )
+]
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT
+    server: "ApiServer"
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _read_body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            # The unread body would be parsed as the next request
+            self.close_connection = True
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError as e:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"invalid JSON: {e}") from None
+        if not isinstance(body, dict):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "request body must be a JSON object")
+        return body
+
+    def _dispatch(self, method: str):
+        url = urlsplit(self.path)
+        etag = None
+        try:
+            # Read the body first, so an error response leaves the connection usable
+            body = self._read_body() if method != "GET" else {}
+            if method == "GET" and url.path == "/metrics":
+                # Process-wide counters; no client, so no read transaction to release
+                self._send(HTTPStatus.OK, metrics.prometheus_text().encode(), "text/plain; version=0.0.4")
+                return
+            handler, match = self._route(method, url.path)
+            if method == "GET":
+                # Taken before the read, so a write landing during it changes the next tag
+                etag = self.server.etag()
+                if _etag_matches(etag, self.headers.get("If-None-Match", "")):
+                    self._send(HTTPStatus.NOT_MODIFIED, None, etag=etag)
+                    return
+            status, payload = handler(self.server.client(), match.groupdict(), parse_qs(url.query), body)
+            if method != "GET":
+                self.server.record_write()
+        except HttpError as e:
+            status, payload, etag = e.status, {"error": str(e)}, None
+        except BatchValidationError as e:
+            status, payload, etag = HTTPStatus.UNPROCESSABLE_ENTITY, {"error": "invalid entries", "entries": e.errors}, None
+        except (ValidationError, ValueError, TypeError) as e:
+            status, payload, etag = HTTPStatus.BAD_REQUEST, {"error": str(e)}, None
+        except sqlite3.Error as e:
+            logger.error(f"{method} {url.path} failed: {e}")
+            status, payload, etag = HTTPStatus.SERVICE_UNAVAILABLE, {"error": "database error"}, None
+        except Exception as e:
+            logger.error(f"{method} {url.path} failed: {e}", exc_info=True)
+            status, payload, etag = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal error"}, None
+        try:
+            data = None if payload is None else json.dumps(payload, default=_json_default, ensure_ascii=False).encode()
+        finally:
+            # After serializing, which may still load attributes through the read session
+            self.server.release_client()
+        self._send(status, data, "application/json; charset=utf-8", etag)
+
+    def _route(self, method: str, path: str):
+        allowed = False
+        for route_method, pattern, handler in ROUTES:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            if route_method == method:
+                return handler, match
+            allowed = True
+        if allowed:
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on {path}")
+        raise HttpError(HTTPStatus.NOT_FOUND, f"no route for {path}")
+
+    def _send(self, status: HTTPStatus, data: Optional[bytes], content_type: str = "", etag: Optional[str] = None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if status == HTTPStatus.NOT_MODIFIED or data is None:
+            # No body allowed (304) or none to send (204)
+            if status != HTTPStatus.NOT_MODIFIED:
+                self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_header("Content-Type", content_type)
+        self.send_header("Vary", "Accept-Encoding")
+        if len(data) >= GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", ""):
+            data = gzip.compress(data, compresslevel=5)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class ApiServer(HTTPServer):
+    """HTTPServer handing each connection to a bounded pool of worker threads."""
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        workers: int = HTTP_WORKERS,
+        session_factory: sessionmaker = SessionLocal,
+        read_session_factory: sessionmaker = ReadSessionLocal,
+        catalog=None,
+    ):
+        super().__init__(address, ApiRequestHandler)
+        self._session_factory = session_factory
+        self._read_session_factory = read_session_factory
+        # One CatalogSnapshot mapping, read by every worker's services
+        self._catalog = catalog
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http")
+        self._local = threading.local()
+        self._clients: List[ApiClient] = []
+        self._clients_lock = threading.Lock()
+
+        # ETag parts: a per-run nonce, writes served here, and SQLite's data_version,
+        # which moves on any other connection's commit. The version is read on one
+        # connection outside the pools, shared with every worker's client.
+        self._boot = f"{time.time_ns():x}"
+        self._writes = 0
+        self._data_version = DataVersion(read_session_factory.kw["bind"])
+        self._version_lock = threading.Lock()
+
+    def client(self) -> ApiClient:
+        """The calling worker thread's ApiClient, caught up with other connections' commits."""
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = ApiClient(
+                self._session_factory, self._read_session_factory, self._catalog, self._data_version,
+            )
+            with self._clients_lock:
+                self._clients.append(client)
+        client.refresh()
+        return client
+
+    def release_client(self) -> None:
+        """Returns the calling worker's read connection to the pool between requests."""
+        client = getattr(self._local, "client", None)
+        if client is not None:
+            client.finish_request()
+
+    def record_write(self) -> None:
+        with self._version_lock:
+            self._writes += 1
+
+    def etag(self) -> str:
+        with self._version_lock:
+            return f'W/"{self._boot}-{self._writes}-{self._data_version()}"'
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=True)
+        with self._clients_lock:
+            for client in self._clients:
+                client.close()
+            self._clients.clear()
+        self._data_version.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Food tracker JSON API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=HTTP_WORKERS, help="worker threads (and open sessions)")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    init_db(engine)
+    with engine.connect() as conn:
+        catalog = current_catalog(conn, CATALOG_PATH)
+    server = ApiServer((args.host, args.port), workers=args.workers, catalog=catalog)
+    logger.info(f"Serving on http://{args.host}:{args.port} with {args.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
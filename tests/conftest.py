@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from food_app.backend.domain.food import FoodCreate
+from food_app.backend.infrastructure import logger as log_setup
+from food_app.backend.infrastructure.database import create_sqlite_engine
+from food_app.backend.infrastructure.migrations import init_db
+from food_app.backend.services.food_service import FoodService
+from food_app.backend.services.recipe_service import RecipeService
+from food_app.backend.services.meal_service import MealService
+from food_app.backend.services.log_service import DailyLogService
+from food_app.frontend.api_client import ApiClient
+
+
+@pytest.fixture(autouse=True)
+def log_dir(tmp_path, monkeypatch):
+    """Code under test that sets up logging with the default directory writes here, not into the checkout."""
+    monkeypatch.setattr(log_setup, "LOG_DIR", str(tmp_path / "logs"))
+    return tmp_path / "logs"
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_sqlite_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    init_db(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def read_engine(engine):
+    """query_only engine on the test database, like database.read_engine."""
+    read_engine = create_sqlite_engine(str(engine.url), read_only=True)
+    yield read_engine
+    read_engine.dispose()
+
+
+@pytest.fixture
+def session_factories(engine, read_engine):
+    """(writer, reader) sessionmakers, as taken by ApiClient, AsyncApiClient and ApiServer."""
+    return (
+        sessionmaker(autocommit=False, autoflush=False, bind=engine),
+        sessionmaker(autocommit=False, autoflush=False, bind=read_engine),
+    )
+
+
+@pytest.fixture
+def api_client(session_factories):
+    client = ApiClient(*session_factories)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def services(db):
+    food_service = FoodService(db)
+    recipe_service = RecipeService(db, food_service)
+    meal_service = MealService(db, food_service, recipe_service)
+    log_service = DailyLogService(db, food_service, recipe_service, meal_service)
+    return food_service, recipe_service, meal_service, log_service
+
+
+@pytest.fixture
+def make_food(services):
+    """Creates foods through FoodService: make_food(name, calories, proteins, carbs, fats, units=[(name, grams)], ...).
+
+    Macros are per unit_val of unit_label (100 g unless given); other keywords go to FoodCreate.
+    """
+    food_service = services[0]
+
+    def make(name, calories=100.0, proteins=10.0, carbs=10.0, fats=1.0, *,
+             category="Test", unit_label="g", unit_val=100.0, units=(), **extra):
+        food = food_service.create(FoodCreate(
+            name=name, category=category, unit_label=unit_label, unit_val=unit_val,
+            calories=calories, proteins=proteins, carbs=carbs, fats=fats, **extra,
+        ))
+        for unit_name, grams in units:
+            food_service.add_unit(food.id, unit_name, grams)
+        return food
+    return make
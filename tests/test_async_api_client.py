@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+from datetime import date
+
+import pytest
+from sqlalchemy import event, text
+
+from food_app.backend.domain.food import FoodCreate
+from food_app.backend.domain.log import DailyLogCreate
+from food_app.frontend.async_api_client import AsyncApiClient, _Services
+
+DAY = date(2024, 5, 1)
+# Seconds added to every statement, standing in for a slow disk or network file system
+LATENCY = 0.03
+
+SLOW_QUERY = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) "
+    "SELECT max(x) FROM (SELECT x FROM c LIMIT 2000000000)"
+)
+
+
+def _client(session_factories, **kwargs):
+    session_factory, read_session_factory = session_factories
+    return AsyncApiClient(session_factory=session_factory, read_session_factory=read_session_factory, **kwargs)
+
+
+async def _seed(api):
+    oats = await api.create_food(FoodCreate(
+        name="Aveia", category="Test", unit_label="g", unit_val=100.0,
+        calories=389.0, proteins=16.9, carbs=66.3, fats=6.9,
+    ))
+    await api.add_custom_unit(oats.id, "colher", 10.0)
+    await api.log_consumption(DailyLogCreate(
+        log_date=DAY, loggable_type="food", loggable_id=oats.id, quantity=3.0, unit_name="colher",
+    ))
+    return oats
+
+
+def test_operations_round_trip(session_factories):
+    async def scenario():
+        async with _client(session_factories) as api:
+            oats = await _seed(api)
+            food = await api.get_food_by_id(oats.id, plan="food_with_units")
+            report = await api.get_daily_nutrition(DAY)
+            nutrition = await api.calculate_food_nutrition(oats.id, 2.0, "colher")
+
+            def add_recipe(db):
+                recipe = _Services(db).recipe.create("Mingau", 2)
+                _Services(db).recipe.add_ingredient(recipe.id, oats.id, 4.0, "colher")
+                return recipe
+            recipe = await api.run(add_recipe, write=True)
+            # Runs on the query_only pool, so it must not write
+            portion = await api.calculate_recipe_nutrition(recipe.id)
+            return oats, food, report, nutrition, portion
+
+    oats, food, report, nutrition, portion = asyncio.run(scenario())
+    assert oats.name == "Aveia"
+    assert [u.unit_name for u in food.units] == ["colher"]
+    assert report.totals.calories == pytest.approx(389.0 * 0.3)
+    assert nutrition.weight_grams == pytest.approx(20.0)
+    assert portion.calories == pytest.approx(389.0 * 0.4 / 2)
+
+
+def test_gathered_reads_overlap(engine, read_engine, session_factories):
+    lock = threading.Lock()
+    in_flight = peak = 0
+
+    def started(*args):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(LATENCY)
+
+    def finished(*args):
+        nonlocal in_flight
+        with lock:
+            in_flight -= 1
+
+    for bind in (engine, read_engine):
+        event.listen(bind, "before_cursor_execute", started)
+        event.listen(bind, "after_cursor_execute", finished)
+
+    def reads(api, food_id):
+        return [
+            api.get_logs_by_date(DAY),
+            api.get_active_foods(),
+            api.get_daily_nutrition(DAY),
+            api.search_foods("aveia"),
+            api.list_foods(),
+            api.get_range_summary(DAY, DAY),
+            api.get_food_by_id(food_id),
+            api.get_all_recipes(),
+        ]
+
+    async def scenario():
+        async with _client(session_factories, max_workers=8) as api:
+            oats = await _seed(api)
+            for read in reads(api, oats.id):
+                await read
+            sequential_peak = peak
+            return sequential_peak, await asyncio.gather(*reads(api, oats.id))
+
+    sequential_peak, results = asyncio.run(scenario())
+    assert results[2].totals.calories == pytest.approx(389.0 * 0.3)
+    assert sequential_peak == 1
+    assert peak > 1
+
+
+def test_timeout_interrupts_the_statement(session_factories):
+    async def scenario():
+        async with _client(session_factories, max_workers=1) as api:
+            with pytest.raises(asyncio.TimeoutError):
+                await api.run(lambda db: db.execute(SLOW_QUERY).scalar(), timeout=0.2)
+            # The single worker is free again once the statement was interrupted
+            started = time.perf_counter()
+            foods = await api.get_active_foods()
+            return foods, time.perf_counter() - started
+
+    foods, waited = asyncio.run(scenario())
+    assert foods == []
+    assert waited < 2.0
+
+
+def test_cancel_interrupts_the_statement(session_factories):
+    async def scenario():
+        async with _client(session_factories, max_workers=1) as api:
+            task = asyncio.ensure_future(api.run(lambda db: db.execute(SLOW_QUERY).scalar(), timeout=None))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            started = time.perf_counter()
+            await api.get_active_foods()
+            return time.perf_counter() - started
+
+    assert asyncio.run(scenario()) < 2.0
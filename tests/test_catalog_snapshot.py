@@ -0,0 +1,119 @@
+import pytest
+from sqlalchemy import event, update
+
+from food_app.backend.domain.food import FoodCreate
+from food_app.backend.infrastructure.catalog_version import catalog_stamp
+from food_app.backend.infrastructure.models import Food
+from food_app.backend.services.catalog_snapshot import CatalogSnapshot, current_catalog, export_catalog
+from food_app.backend.services.food_service import FoodService
+from food_app.backend.services.nutrient_engine import to_nutrition
+
+
+@pytest.fixture
+def catalog(db, services):
+    food_service = services[0]
+    oats = food_service.create(FoodCreate(
+        name="Aveia", category="Grãos", unit_label="g", unit_val=100.0,
+        calories=389.0, proteins=16.9, carbs=66.3, fats=6.9, fiber=10.6,
+    ))
+    food_service.add_unit(oats.id, "Colher de Sopa", 15.0)
+    food_service.add_unit(oats.id, "xícara", 80.0)
+    egg = food_service.create(FoodCreate(
+        name="Ovo", category="Ovos", unit_label="unidade", unit_val=50.0,
+        calories=72.0, proteins=6.3, carbs=0.4, fats=4.8,
+    ))
+    db.commit()
+    return oats, egg
+
+
+def test_stamp_follows_catalog_writes(db, services, catalog):
+    _, egg = catalog
+    catalog_id, version = catalog_stamp(db)
+    services[3].log_consumption_batch([])
+    db.commit()
+    assert catalog_stamp(db) == (catalog_id, version)
+
+    db.execute(update(Food).where(Food.id == egg.id).values(calories_100g=150.0))
+    db.commit()
+    assert catalog_stamp(db) == (catalog_id, version + 1)
+
+
+def test_round_trip(db, tmp_path, catalog):
+    oats, egg = catalog
+    path = tmp_path / "foods.catalog"
+    stamp = export_catalog(db, path)
+    snapshot = CatalogSnapshot(path)
+
+    assert snapshot.stamp == stamp and len(snapshot) == 2
+    assert snapshot.units(oats.id) == [("Colher de Sopa", 15.0), ("xícara", 80.0)]
+    assert snapshot.units(egg.id) == [("unidade", 50.0)]
+    assert snapshot.units(999) == []
+    assert snapshot.rows([egg.id, 999, oats.id]).tolist() == [2, 0, 1]
+    per_100g = to_nutrition(snapshot.vectors[1])
+    assert (per_100g.calories, per_100g.fiber, per_100g.sodium, per_100g.weight_grams) == (389.0, 10.6, 0.0, 100.0)
+
+    path.write_bytes(path.read_bytes()[:-8])
+    with pytest.raises(ValueError):
+        CatalogSnapshot(path)
+
+
+def test_current_catalog_reexports_only_when_stale(db, tmp_path, catalog):
+    path = tmp_path / "foods.catalog"
+    first = current_catalog(db, path)
+    mtime = path.stat().st_mtime_ns
+    assert current_catalog(db, path).stamp == first.stamp and path.stat().st_mtime_ns == mtime
+
+    db.execute(update(Food).where(Food.id == catalog[1].id).values(calories_100g=150.0))
+    db.commit()
+    refreshed = current_catalog(db, path)
+    assert refreshed.stamp[1] == first.stamp[1] + 1
+    assert refreshed.vectors[2][0] == 150.0
+    # The earlier mapping still reads the file it was opened on
+    assert first.vectors[2][0] == 144.0
+
+
+def test_services_read_the_snapshot(db, engine, tmp_path, catalog):
+    oats_id, egg_id = (food.id for food in catalog)
+    snapshot = current_catalog(db, tmp_path / "foods.catalog")
+    db.commit()
+    plain, mapped = FoodService(db), FoodService(db, snapshot)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    items = [(oats_id, 2.0, "colher"), (egg_id, 1.0, "unidade"), (oats_id, 50.0, "g")]
+    grams = mapped.resolve_grams(items)
+    vectors = mapped.engine.evaluate([i[0] for i in items], grams)
+    assert not [s for s in statements if "food_units" in s or "FROM foods" in s]
+    assert grams == plain.resolve_grams(items) == [30.0, 50.0, 50.0]
+    assert vectors.tolist() == plain.engine.evaluate([i[0] for i in items], grams).tolist()
+    # Foods the snapshot lacks are still queried
+    assert mapped.engine.evaluate([999], [100.0]).tolist() == [[0.0] * 10]
+
+    mapped.update(egg_id, FoodCreate(
+        name="Ovo", category="Ovos", unit_label="unidade", unit_val=60.0,
+        calories=86.0, proteins=7.6, carbs=0.5, fats=5.8,
+    ))
+    mapped.engine.clear()
+    mapped.units.clear()
+    assert mapped.resolve_grams([(egg_id, 1.0, "unidade")]) == [60.0]
+    assert mapped.calculate_nutrition(egg_id, 1.0, "unidade").calories == pytest.approx(86.0)
+    assert mapped.calculate_nutrition(oats_id, 100.0, "g").calories == pytest.approx(389.0)
+
+
+def test_external_writes_replace_a_stale_snapshot(db, engine, tmp_path, catalog):
+    oats_id, egg_id = (food.id for food in catalog)
+    mapped = FoodService(db, current_catalog(db, tmp_path / "foods.catalog"))
+    first = mapped.engine.catalog
+    mapped.check_catalog()
+    assert mapped.engine.catalog is first
+
+    # Another connection, so the services hear nothing of it
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"UPDATE foods SET calories_100g = 150 WHERE id = {egg_id}")
+        conn.exec_driver_sql(f"INSERT INTO food_units (food_id, unit_name, grams) VALUES ({oats_id}, 'pote', 500)")
+    assert mapped.engine.total([egg_id], [100.0])[0] == pytest.approx(144.0)
+
+    mapped.check_catalog()
+    assert mapped.engine.catalog.stamp == mapped.units.catalog.stamp == catalog_stamp(db)
+    assert mapped.engine.total([egg_id], [100.0])[0] == pytest.approx(150.0)
+    assert mapped.resolve_grams([(oats_id, 1.0, "pote")]) == [500.0]
@@ -0,0 +1,90 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from food_app.backend.domain.log import DailyLogCreate
+from food_app.backend.services.log_service import NUTRIENT_FIELDS
+
+DAY = date(2024, 5, 1)
+
+
+@pytest.fixture
+def populated_day(db, services, make_food):
+    food_service, recipe_service, meal_service, log_service = services
+
+    rice = make_food("Arroz", calories=130.0, proteins=2.7, carbs=28.0, fats=0.3, fiber=0.4, sodium=1.0)
+    beans = make_food("Feijão", calories=77.0, proteins=4.8, carbs=13.6, fats=0.5, sugar=0.3)
+    milk = make_food("Leite", unit_label="ml", unit_val=200.0, calories=120.0, proteins=6.0, carbs=9.0, fats=6.0, saturated_fats=4.0)
+    marmita = make_food("Marmita", calories=112.0, proteins=9.0, carbs=14.0, fats=4.0, trans_fats=0.1)
+    food_service.add_unit(marmita.id, "unidade", 350.0)
+    food_service.add_unit(rice.id, "Colher", 25.0)
+
+    recipe = recipe_service.create("Arroz com Feijão", portions_yield=4)
+    recipe_service.add_ingredient(recipe.id, rice.id, 4.0, "colher")
+    recipe_service.add_ingredient(recipe.id, beans.id, 300.0, "g")
+    recipe_service.add_ingredient(recipe.id, beans.id, 1.0, "concha")  # unknown unit -> 100 g fallback
+    empty_recipe = recipe_service.create("Vazia", portions_yield=2)
+
+    meal = meal_service.create("Almoço")
+    meal_service.add_item(meal.id, 1.0, "unidade", food_id=marmita.id)
+    meal_service.add_item(meal.id, 1.5, "portion", recipe_id=recipe.id)
+    meal_service.add_item(meal.id, 1.0, "portion", recipe_id=empty_recipe.id)
+
+    entries = [
+        ("food", rice.id, 150.0, "g"),
+        ("food", marmita.id, 0.5, "unidade"),
+        ("food", milk.id, 2.0, "copo"),
+        ("recipe", recipe.id, 2.0, "portion"),
+        ("recipe", empty_recipe.id, 1.0, "portion"),
+        ("meal", meal.id, 1.0, "meal"),
+    ]
+    for loggable_type, loggable_id, quantity, unit_name in entries:
+        log_service.log_consumption(DailyLogCreate(
+            log_date=DAY, loggable_type=loggable_type, loggable_id=loggable_id, quantity=quantity, unit_name=unit_name,
+        ))
+    # Another day must not leak into the report
+    log_service.log_consumption(DailyLogCreate(
+        log_date=date(2024, 5, 2), loggable_type="food", loggable_id=rice.id, quantity=500.0, unit_name="g",
+    ))
+    db.commit()
+    return entries
+
+
+def _per_row(services, entry):
+    food_service, recipe_service, meal_service, _ = services
+    loggable_type, loggable_id, quantity, unit_name = entry
+    if loggable_type == "food":
+        return food_service.calculate_nutrition(loggable_id, quantity, unit_name)
+    if loggable_type == "recipe":
+        return recipe_service.calculate_nutrition(loggable_id, quantity, unit_name)
+    return meal_service.calculate_nutrition(loggable_id)
+
+
+def test_daily_nutrition_matches_per_row_path(services, populated_day):
+    log_service = services[3]
+    report = log_service.get_daily_nutrition(DAY)
+
+    assert [(e.loggable_type, e.loggable_id) for e in report.entries] == [(t, i) for t, i, _, _ in populated_day]
+    for entry, expected_entry in zip(report.entries, populated_day):
+        expected = _per_row(services, expected_entry)
+        for field in NUTRIENT_FIELDS + ("weight_grams",):
+            assert getattr(entry.nutrition, field) == pytest.approx(getattr(expected, field)), (entry.name, field)
+
+    for field in NUTRIENT_FIELDS + ("weight_grams",):
+        expected_total = sum(getattr(_per_row(services, e), field) for e in populated_day)
+        assert getattr(report.totals, field) == pytest.approx(expected_total), field
+
+
+def test_daily_nutrition_is_one_query(engine, services, populated_day):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    report = services[3].get_daily_nutrition(DAY)
+    assert len(report.entries) == len(populated_day)
+    assert len(statements) == 1
+
+
+def test_daily_nutrition_empty_day(services):
+    report = services[3].get_daily_nutrition(date(2000, 1, 1))
+    assert report.entries == []
+    assert report.totals.calories == 0.0
@@ -0,0 +1,150 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event, select
+
+from food_app.backend.domain.food import FoodCreate
+from food_app.backend.domain.log import DailyLogCreate
+from food_app.backend.infrastructure.base import Base
+from food_app.backend.infrastructure.database import create_sqlite_engine
+from food_app.backend.infrastructure.migrations import fill_daily_summary, run_migrations
+from food_app.backend.infrastructure.models import DailyLog, DailyNutritionSummary
+from food_app.backend.services.log_service import NUTRIENT_FIELDS, VECTOR_FIELDS, range_summary, rebuild_daily_summary
+
+DAY = date(2024, 5, 1)
+
+
+def _log(log_service, log_date, loggable_type, loggable_id, quantity, unit_name):
+    return log_service.log_consumption(DailyLogCreate(
+        log_date=log_date, loggable_type=loggable_type, loggable_id=loggable_id, quantity=quantity, unit_name=unit_name,
+    ))
+
+
+@pytest.fixture
+def logged_days(db, services):
+    food_service, recipe_service, meal_service, log_service = services
+    rice = food_service.create(FoodCreate(
+        name="Arroz", category="Test", unit_label="g", unit_val=100.0,
+        calories=130.0, proteins=2.7, carbs=28.0, fats=0.3, fiber=0.4,
+    ))
+    food_service.add_unit(rice.id, "Colher", 25.0)
+    recipe = recipe_service.create("Arroz Temperado", portions_yield=2)
+    recipe_service.add_ingredient(recipe.id, rice.id, 300.0, "g")
+    meal = meal_service.create("Almoço")
+    meal_service.add_item(meal.id, 2.0, "colher", food_id=rice.id)
+    meal_service.add_item(meal.id, 1.0, "portion", recipe_id=recipe.id)
+
+    _log(log_service, DAY, "food", rice.id, 150.0, "g")
+    _log(log_service, DAY, "recipe", recipe.id, 1.5, "portion")
+    _log(log_service, DAY, "meal", meal.id, 1.0, "meal")
+    _log(log_service, DAY + timedelta(days=2), "food", rice.id, 4.0, "colher")
+    db.commit()
+    return rice, recipe, meal
+
+
+def _summary_rows(db):
+    return {
+        row.log_date: (row.entry_count, tuple(round(getattr(row, f), 6) for f in VECTOR_FIELDS))
+        for row in db.scalars(select(DailyNutritionSummary))
+    }
+
+
+def test_incremental_summary_matches_report(db, services, logged_days):
+    log_service = services[3]
+    summary = {s.log_date: s for s in log_service.get_range_summary(DAY, DAY + timedelta(days=2))}
+
+    for day in (DAY, DAY + timedelta(days=2)):
+        report = log_service.get_daily_nutrition(day)
+        assert summary[day].entry_count == len(report.entries)
+        for field in VECTOR_FIELDS:
+            assert getattr(summary[day].totals, field) == pytest.approx(getattr(report.totals, field)), (day, field)
+
+
+def test_range_is_zero_filled(services, logged_days):
+    days = services[3].get_range_summary(DAY - timedelta(days=1), DAY + timedelta(days=3))
+
+    assert [d.log_date for d in days] == [DAY + timedelta(days=i) for i in range(-1, 4)]
+    assert [d.entry_count for d in days] == [0, 3, 0, 1, 0]
+    assert days[0].totals.calories == 0.0
+    assert days[3].totals.weight_grams == pytest.approx(100.0)
+
+
+def test_range_rejects_reversed_bounds(db):
+    with pytest.raises(ValueError):
+        range_summary(db, DAY, DAY - timedelta(days=1))
+
+
+def test_range_query_reads_only_summary(engine, services, logged_days):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    services[3].get_range_summary(DAY, DAY + timedelta(days=90))
+    assert len(statements) == 1
+    assert "daily_logs" not in statements[0]
+
+
+def test_rebuild_matches_incremental(db, logged_days):
+    incremental = _summary_rows(db)
+    assert rebuild_daily_summary(db) == 2
+    assert _summary_rows(db) == incremental
+
+    # A bounded rebuild leaves other days alone
+    db.query(DailyNutritionSummary).delete()
+    assert rebuild_daily_summary(db, DAY, DAY) == 1
+    assert _summary_rows(db) == {DAY: incremental[DAY]}
+
+
+def test_migration_sql_matches_rebuild(db, engine, logged_days):
+    # Legacy entries, computed from foods, recipes and meals rather than snapshots
+    db.query(DailyLog).filter(DailyLog.log_date == DAY).update({f: None for f in NUTRIENT_FIELDS})
+    rebuild_daily_summary(db)
+    db.commit()
+    expected = _summary_rows(db)
+
+    with engine.begin() as conn:
+        fill_daily_summary(conn)
+    db.expire_all()
+    assert _summary_rows(db) == expected
+
+
+def test_delete_log_recomputes_day(db, services, logged_days):
+    log_service = services[3]
+    report = log_service.get_daily_nutrition(DAY)
+    removed = report.entries[0]
+
+    assert log_service.delete_log(removed.log_id)
+    assert not log_service.delete_log(removed.log_id)
+    db.commit()
+
+    day = log_service.get_range_summary(DAY, DAY)[0]
+    assert day.entry_count == len(report.entries) - 1
+    assert day.totals.calories == pytest.approx(report.totals.calories - removed.nutrition.calories)
+
+    last = log_service.get_daily_nutrition(DAY + timedelta(days=2)).entries[0]
+    log_service.delete_log(last.log_id)
+    db.commit()
+    assert DAY + timedelta(days=2) not in _summary_rows(db)
+
+
+def test_migration_summarizes_existing_logs(tmp_path):
+    engine = create_sqlite_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    tables = [t for t in Base.metadata.sorted_tables if t.name != "daily_nutrition_summary"]
+    Base.metadata.create_all(bind=engine, tables=tables)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO foods (name, category, calories_100g, proteins_100g, carbs_100g, fats_100g, is_liquid, is_active) "
+            "VALUES ('Aveia', 'Test', 389, 16.9, 66.3, 6.9, 0, 1)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO daily_logs (log_date, food_id, quantity, unit_name, grams) "
+            "VALUES ('2024-05-01', 1, 50, 'g', 50), ('2024-05-01', 1, 30, 'g', 30), ('2024-05-03', 1, 100, 'g', 100)"
+        )
+    try:
+        run_migrations(engine)
+        with engine.connect() as conn:
+            rows = conn.execute(select(
+                DailyNutritionSummary.log_date, DailyNutritionSummary.entry_count, DailyNutritionSummary.calories,
+            ).order_by(DailyNutritionSummary.log_date)).all()
+    finally:
+        engine.dispose()
+    assert [(r.log_date, r.entry_count) for r in rows] == [(DAY, 2), (DAY + timedelta(days=2), 1)]
+    assert rows[0].calories == pytest.approx(389 * 0.8)
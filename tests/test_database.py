@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from food_app.backend.infrastructure.database import STORAGE_PROFILES, create_sqlite_engine
+
+
+def _pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_profile_pragmas_applied_per_connection(tmp_path):
+    engine = create_sqlite_engine(f"sqlite:///{tmp_path / 'p.db'}", profile="balanced")
+    profile = STORAGE_PROFILES["balanced"]
+    assert _pragma(engine, "journal_mode") == "wal"
+    assert _pragma(engine, "synchronous") == 1  # NORMAL
+    assert _pragma(engine, "busy_timeout") == profile["busy_timeout"]
+    assert _pragma(engine, "cache_size") == profile["cache_size"]
+
+
+def test_read_engine_is_query_only(tmp_path):
+    url = f"sqlite:///{tmp_path / 'r.db'}"
+    writer = create_sqlite_engine(url)
+    with writer.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+    reader = create_sqlite_engine(url, read_only=True)
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT x FROM t")).scalar() == 1
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO t VALUES (2)"))
+
+
+def test_unknown_profile_rejected():
+    with pytest.raises(ValueError):
+        create_sqlite_engine("sqlite://", profile="turbo")
@@ -0,0 +1,96 @@
+import pytest
+
+from food_app.backend.domain.food import FoodCreate
+from food_app.backend.infrastructure.models import Food
+from food_app.backend.services.food_search import RANKED_MATCH_LIMIT, fts_query, search_foods
+
+
+@pytest.fixture
+def catalog(db, make_food):
+    names = [
+        "Almôndega de carne, Macarrão Parafuso ao Molho Sugo",
+        "Peito de Frango à Milanesa com Creme de Milho, Arroz e Feijão",
+        "Feijoada Completa com Couve Manteiga",
+        "Feijão Preto",
+    ]
+    foods = {name: make_food(name, category="Pratos Prontos") for name in names}
+    make_food("Queijo Minas", category="Laticínios")
+    db.commit()
+    return foods
+
+
+def _names(db, query, limit=20, category=None):
+    return [hit.name for hit in search_foods(db, query, limit, category)]
+
+
+def test_accent_insensitive_prefix_match(db, catalog):
+    assert _names(db, "almondega") == ["Almôndega de carne, Macarrão Parafuso ao Molho Sugo"]
+    assert _names(db, "ALMÔND") == ["Almôndega de carne, Macarrão Parafuso ao Molho Sugo"]
+    assert set(_names(db, "feij")) == {
+        "Peito de Frango à Milanesa com Creme de Milho, Arroz e Feijão",
+        "Feijoada Completa com Couve Manteiga",
+        "Feijão Preto",
+    }
+    assert _names(db, "feijao frango") == ["Peito de Frango à Milanesa com Creme de Milho, Arroz e Feijão"]
+    assert _names(db, "laticinios") == ["Queijo Minas"]
+
+
+def test_ranking_prefers_short_name_matches(db, catalog):
+    assert _names(db, "feijão")[0] == "Feijão Preto"
+
+
+def test_index_follows_writes(db, services, make_food, catalog):
+    food_service = services[0]
+    food = make_food("Pão de Queijo", category="Pratos Prontos")
+    assert _names(db, "pao queij") == ["Pão de Queijo"]
+
+    food_service.update(food.id, FoodCreate(
+        name="Biscoito de Polvilho", category="Outros", unit_label="g", unit_val=100.0,
+        calories=100.0, proteins=1.0, carbs=1.0, fats=1.0,
+    ))
+    assert _names(db, "pao queij") == []
+    assert _names(db, "polvilho") == ["Biscoito de Polvilho"]
+
+    db.get(Food, food.id).is_active = False
+    db.flush()
+    assert _names(db, "polvilho") == []
+
+
+def test_broad_queries_fall_back_to_name_initial_matches(db, make_food):
+    for i in range(RANKED_MATCH_LIMIT + 5):
+        make_food(f"Prato {i} com arroz", category="Pratos Prontos")
+    make_food("Arroz Integral", category="Pratos Prontos")
+    hits = _names(db, "arr", limit=5)
+    assert hits[0] == "Arroz Integral"
+    assert len(hits) == 5
+
+
+def test_category_filter_applies_before_the_limit(db, make_food):
+    for i in range(10):
+        make_food(f"Queijo Prato {i}", category="Pratos Prontos")
+    make_food("Queijo Minas", category="Laticínios")
+    assert _names(db, "queijo", limit=3, category="Laticínios") == ["Queijo Minas"]
+    assert _names(db, "", limit=3, category="Laticínios") == ["Queijo Minas"]
+    assert len(_names(db, "queijo", limit=3, category="Pratos Prontos")) == 3
+
+    for i in range(RANKED_MATCH_LIMIT):
+        make_food(f"Prato {i} com queijo", category="Pratos Prontos")
+    assert _names(db, "queijo", limit=3, category="Laticínios") == ["Queijo Minas"]
+
+
+def test_query_syntax_is_neutralized():
+    assert fts_query('feijão "OR" -x*') == '"feijão"* "OR"* "x"*'
+    assert fts_query("  ") == ""
+
+
+def test_bulk_import_is_indexed(db, tmp_path):
+    from food_app.backend.services.import_service import FoodImportService
+
+    csv_path = tmp_path / "foods.csv"
+    csv_path.write_text(
+        "nome,porcao,kcal,proteina,carboidrato,gordura,tipo_quantidade,peso_g\n"
+        "Açaí na Tigela,100,58,0.8,6.2,3.9,tigela,300\n",
+        encoding="utf-8",
+    )
+    FoodImportService(db).import_csv(str(csv_path))
+    assert _names(db, "acai") == ["Açaí na Tigela"]
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from sqlalchemy import insert
+
+from food_app.backend.domain.food import FoodCreate
+from food_app.backend.infrastructure.models import Food
+from food_app.backend.services.food_similarity import FoodSimilarityIndex
+from food_app.backend.services.kd_tree import KDTree
+
+
+@pytest.fixture
+def catalog(db, make_food):
+    foods = {
+        "Arroz": make_food("Arroz", 130.0, 2.7, 28.0, 0.3, category="Grãos"),
+        "Quinoa": make_food("Quinoa", 120.0, 4.4, 21.3, 1.9, category="Grãos", fiber=2.8),
+        "Macarrão": make_food("Macarrão", 131.0, 5.0, 25.0, 1.1, category="Massas"),
+        "Frango": make_food("Frango", 165.0, 31.0, 0.0, 3.6, category="Carnes"),
+        "Azeite": make_food("Azeite", 884.0, 0.0, 0.0, 100.0, category="Óleos"),
+    }
+    db.commit()
+    return foods
+
+
+def test_tree_matches_brute_force():
+    rng = np.random.default_rng(7)
+    points = rng.random((2000, 9))
+    indices = np.arange(0, 2000, 3)
+    tree = KDTree(points, indices, leaf_size=8)
+    for query in rng.random((20, 9)):
+        distances = ((points[indices] - query) ** 2).sum(axis=1)
+        expected = indices[np.argsort(distances)[:5]].tolist()
+        assert [index for _, index in tree.query(query, 5)] == expected
+        assert [index for _, index in tree.query(query, 5, skip={expected[0]})] == expected[1:] + [
+            indices[np.argsort(distances)[5]]
+        ]
+
+
+def test_nearest_profiles(db, catalog):
+    index = FoodSimilarityIndex(db)
+    rice = catalog["Arroz"]
+
+    similar = index.similar(rice.id, limit=3)
+    assert [f.name for f in similar] == ["Macarrão", "Quinoa", "Frango"]
+    assert [f.distance for f in similar] == sorted(f.distance for f in similar)
+    assert [f.name for f in index.similar(rice.id, same_category=True)] == ["Quinoa"]
+    assert index.similar(999) == []
+
+
+def test_follows_service_writes_and_bulk_inserts(db, services, make_food, catalog):
+    food_service = services[0]
+    index = FoodSimilarityIndex(db, food_service)
+    rice = catalog["Arroz"]
+    index.similar(rice.id)
+    tree = index._trees[None]
+
+    make_food("Arroz integral", 124.0, 2.6, 25.8, 1.0, category="Grãos")
+    food_service.update(catalog["Quinoa"].id, FoodCreate(
+        name="Quinoa", category="Grãos", unit_label="g", unit_val=100.0,
+        calories=368.0, proteins=14.1, carbs=64.2, fats=6.1,
+    ))
+    db.execute(insert(Food).values(
+        name="Arroz parboilizado", category="Grãos", is_liquid=False, is_active=True,
+        calories_100g=123.0, proteins_100g=2.9, carbs_100g=26.0, fats_100g=0.4,
+    ))
+    db.execute(insert(Food).values(
+        name="Arroz inativo", category="Grãos", is_liquid=False, is_active=False,
+        calories_100g=130.0, proteins_100g=2.7, carbs_100g=28.0, fats_100g=0.3,
+    ))
+    db.commit()
+
+    names = [f.name for f in index.similar(rice.id, limit=5)]
+    assert index._trees[None] is tree
+    assert names == ["Arroz parboilizado", "Arroz integral", "Macarrão", "Quinoa", "Frango"]
+
+
+def test_api_client(api_client, catalog):
+    rice = catalog["Arroz"]
+    assert api_client.find_similar_foods(rice.id, limit=1)[0].name == "Macarrão"
+    api_client.create_food(FoodCreate(
+        name="Arroz branco", category="Grãos", unit_label="g", unit_val=100.0,
+        calories=130.0, proteins=2.7, carbs=28.0, fats=0.3,
+    ))
+    [twin] = api_client.find_similar_foods(rice.id, limit=1)
+    assert (twin.name, twin.distance) == ("Arroz branco", 0.0)
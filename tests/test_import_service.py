@@ -0,0 +1,61 @@
+import csv
+from pathlib import Path
+
+from food_app.backend.domain.food import FoodCreate
+from food_app.backend.infrastructure.models import Food, FoodUnit
+from food_app.backend.services.import_service import FoodImportService
+
+FRUTIFICA = Path(__file__).resolve().parents[1] / "data" / "frutifica.csv"
+NUTRIENT_COLUMNS = [
+    "calories_100g", "proteins_100g", "carbs_100g", "fats_100g",
+    "saturated_fats_100g", "trans_fats_100g", "fiber_100g", "sodium_100g", "sugar_100g",
+]
+
+
+def _opt(row, key):
+    return float(row[key]) if row.get(key) else None
+
+
+def test_import_matches_service_path(db, services):
+    stats = FoodImportService(db).import_csv(str(FRUTIFICA), chunk_size=3)
+    with open(FRUTIFICA, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert (stats.rows, stats.chunks, stats.invalid_rows) == (len(rows), 3, 0)
+
+    food_service = services[0]
+    imported = db.query(Food).order_by(Food.id).all()
+    for food, row in zip(imported, rows):
+        expected = food_service.create(FoodCreate(
+            name=row["nome"], category="Food", unit_label="g", unit_val=float(row["porcao"]),
+            calories=float(row["kcal"]), proteins=float(row["proteina"]),
+            carbs=float(row["carboidrato"]), fats=float(row["gordura"]),
+            saturated_fats=_opt(row, "gordura_saturada"), trans_fats=_opt(row, "gordura_trans"),
+            fiber=_opt(row, "fibra"), sodium=_opt(row, "sodio_mg"), sugar=_opt(row, "acucar_total"),
+        ))
+        assert (food.name, food.category, food.is_liquid, food.is_active) == (expected.name, "Food", False, True)
+        for col in NUTRIENT_COLUMNS:
+            assert getattr(food, col) == getattr(expected, col), col
+        assert [(u.unit_name, u.grams) for u in food.units] == [(row["tipo_quantidade"], float(row["peso_g"]))]
+
+
+def test_invalid_rows_are_skipped(db, tmp_path):
+    path = tmp_path / "foods.csv"
+    path.write_text(
+        "nome,peso_g,porcao,kcal,proteina,carboidrato,gordura,tipo_quantidade\n"
+        "Pão,50,100,270,9,50,3,fatia\n"
+        "Quebrado,50,0,1,1,1,1,fatia\n"
+        "Sem número,50,100,abc,1,1,1,fatia\n"
+        "Ovo,50,100,150,13,1,10,unidade\n"
+        "Negativo,50,100,-5,1,1,1,fatia\n"
+        "Infinito,50,100,inf,1,1,1,fatia\n"
+        "Sem peso,0,100,1,1,1,1,fatia\n"
+        "Sal,,100,0,0,0,0,\n",
+        encoding="utf-8",
+    )
+    stats = FoodImportService(db).import_csv(str(path))
+    assert (stats.rows, stats.invalid_rows) == (3, 5)
+    assert [line for line, _ in stats.errors] == [3, 4, 6, 7, 8]
+    assert "calories" in dict(stats.errors)[6]
+    assert [f.name for f in db.query(Food).order_by(Food.id)] == ["Pão", "Ovo", "Sal"]
+    assert [u.unit_name for u in db.query(FoodUnit).order_by(FoodUnit.id)] == ["fatia", "unidade"]
+    assert stats.rows_per_sec > 0
@@ -0,0 +1,105 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from food_app.backend.domain.food import FoodCreate
+from food_app.backend.services.loading_plans import LOADING_PLANS, load_one, loading_options
+from food_app.backend.infrastructure.models import Recipe
+
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+
+def _foods(food_service, n):
+    foods = []
+    for i in range(n):
+        food = food_service.create(FoodCreate(
+            name=f"Food {i}", category="Outros", unit_label="fatia", unit_val=30.0,
+            calories=90.0, proteins=3.0, carbs=12.0, fats=3.0,
+        ))
+        foods.append(food)
+    return foods
+
+
+def _cold(db, services):
+    # Drop every cached object so each measurement starts from the database
+    db.commit()
+    db.expunge_all()
+    services[0].engine.clear()
+    services[2].clear_cache()
+
+
+@pytest.mark.parametrize("size", [2, 40])
+def test_recipe_refresh_query_count_is_fixed(engine, db, services, size):
+    food_service, recipe_service = services[0], services[1]
+    recipe = recipe_service.create("Sanduíche", 2)
+    for food in _foods(food_service, size):
+        recipe_service.add_ingredient(recipe.id, food.id, 2, "fatia")
+    recipe_id = recipe.id
+    _cold(db, services)
+
+    with count_queries(engine) as statements:
+        recipe_service.refresh_nutrition(recipe_id)
+    # recipe + nutrition, ingredients, foods, units, engine rows, nutrition upsert
+    assert len(statements) <= 6
+
+
+@pytest.mark.parametrize("size", [2, 40])
+def test_meal_query_count_is_fixed(engine, db, services, size):
+    food_service, recipe_service, meal_service = services[:3]
+    foods = _foods(food_service, size)
+    recipe = recipe_service.create("Vitamina", 1)
+    recipe_service.add_ingredient(recipe.id, foods[0].id, 100, "g")
+    meal = meal_service.create("Café")
+    for food in foods:
+        meal_service.add_item(meal.id, 1, "fatia", food_id=food.id)
+    meal_service.add_item(meal.id, 1, "portion", recipe_id=recipe.id)
+    meal_id = meal.id
+    _cold(db, services)
+
+    with count_queries(engine) as statements:
+        nutrition = meal_service.calculate_nutrition(meal_id)
+    # meal, items, foods, units, recipes + nutrition, engine rows
+    assert len(statements) <= 6
+    assert nutrition.weight_grams == pytest.approx(30.0 * size + 100.0)
+
+
+def test_resolve_grams_batches_unit_lookups(engine, db, services):
+    food_service = services[0]
+    food_ids = [food.id for food in _foods(food_service, 10)]
+    _cold(db, services)
+    with count_queries(engine) as statements:
+        grams = food_service.resolve_grams([(fid, 2, "FATIA") for fid in food_ids] + [(food_ids[0], 5, "g"), (999, 1, "fatia")])
+    assert grams == [60.0] * 10 + [5.0, 0.0]
+    assert len(statements) == 2  # alias table (first use only), then every food's units at once
+
+
+def test_plan_loads_graph_up_front(db, services):
+    food_service, recipe_service = services[0], services[1]
+    recipe = recipe_service.create("Torrada", 1)
+    recipe_service.add_ingredient(recipe.id, _foods(food_service, 1)[0].id, 1, "fatia")
+    recipe_id = recipe.id
+    db.commit()
+    db.expunge_all()
+
+    recipe = load_one(db, Recipe, recipe_id, loading_options("recipe_with_ingredients"))
+    db.expunge_all()
+    # Everything the plan names is usable after the session lets go of it
+    assert recipe.ingredients[0].food.units[0].unit_name == "fatia"
+    assert recipe.nutrition.weight_grams == pytest.approx(30.0)
+
+
+def test_unknown_plan_is_rejected():
+    assert loading_options(None) == ()
+    assert set(LOADING_PLANS) >= {"recipe_with_ingredients", "meal_resolved"}
+    with pytest.raises(ValueError):
+        loading_options("everything")
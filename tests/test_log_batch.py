@@ -0,0 +1,98 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from food_app.backend.domain.food import FoodCreate
+from food_app.backend.domain.log import DailyLogCreate
+from food_app.backend.infrastructure.models import DailyLog, DailyNutritionSummary
+from food_app.backend.services.log_service import NUTRIENT_FIELDS, BatchValidationError, rebuild_daily_summary
+
+DAY = date(2024, 5, 1)
+NEXT_DAY = date(2024, 5, 2)
+
+
+def _entry(loggable_type, loggable_id, quantity, unit_name, log_date=DAY):
+    return DailyLogCreate(
+        log_date=log_date, loggable_type=loggable_type, loggable_id=loggable_id, quantity=quantity, unit_name=unit_name,
+    )
+
+
+@pytest.fixture
+def catalog(db, services):
+    food_service, recipe_service, meal_service, _ = services
+    oats = food_service.create(FoodCreate(
+        name="Aveia", category="Test", unit_label="g", unit_val=100.0,
+        calories=389.0, proteins=16.9, carbs=66.3, fats=6.9, fiber=10.6,
+    ))
+    food_service.add_unit(oats.id, "colher", 10.0)
+    milk = food_service.create(FoodCreate(
+        name="Leite", category="Test", unit_label="ml", unit_val=100.0,
+        calories=60.0, proteins=3.2, carbs=4.8, fats=3.0,
+    ))
+    recipe = recipe_service.create("Mingau", portions_yield=2)
+    recipe_service.add_ingredient(recipe.id, oats.id, 80.0, "g")
+    recipe_service.add_ingredient(recipe.id, milk.id, 300.0, "ml")
+    meal = meal_service.create("Café")
+    meal_service.add_item(meal.id, 3.0, "colher", food_id=oats.id)
+    db.commit()
+    return [
+        _entry("food", oats.id, 4.0, "colher"),
+        _entry("food", milk.id, 200.0, "ml"),
+        _entry("recipe", recipe.id, 1.5, "portion"),
+        _entry("meal", meal.id, 2.0, "meal", log_date=NEXT_DAY),
+        _entry("food", oats.id, 30.0, "g", log_date=NEXT_DAY),
+    ]
+
+
+def test_batch_matches_single_entries(db, engine, services, catalog):
+    log_service = services[3]
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    logs = log_service.log_consumption_batch(catalog)
+    db.commit()
+    assert sum(s.lstrip().upper().startswith("INSERT INTO DAILY_LOGS") for s in statements) == 1
+    assert [(log.log_date, log.food_id or log.recipe_id or log.meal_id) for log in logs] == [
+        (e.log_date, e.loggable_id) for e in catalog
+    ]
+    batch_summary = {row.log_date: (row.entry_count, row.calories) for row in db.query(DailyNutritionSummary)}
+
+    singles = [log_service.log_consumption(entry) for entry in catalog]
+    for batched, single in zip(logs, singles):
+        assert batched.grams == pytest.approx(single.grams)
+        for field in NUTRIENT_FIELDS:
+            assert getattr(batched, field) == pytest.approx(getattr(single, field)), field
+
+    rebuild_daily_summary(db)
+    rebuilt = {row.log_date: row for row in db.query(DailyNutritionSummary)}
+    for log_date, (count, calories) in batch_summary.items():
+        assert rebuilt[log_date].entry_count == 2 * count
+        assert rebuilt[log_date].calories == pytest.approx(2 * calories)
+
+
+def test_invalid_entries_are_reported_and_nothing_is_written(db, services, catalog):
+    log_service = services[3]
+    bad = catalog + [
+        _entry("food", 999, 10.0, "g"),
+        {"log_date": "2024-05-01", "loggable_type": "drink", "loggable_id": 1, "quantity": 1, "unit_name": "g"},
+        _entry("recipe", catalog[2].loggable_id, 0.0, "portion"),
+    ]
+    with pytest.raises(BatchValidationError) as raised:
+        log_service.log_consumption_batch(bad)
+    assert [e.index for e in raised.value.errors] == [5, 6, 7]
+    assert "food 999 does not exist" in raised.value.errors[0].message
+    assert "loggable_type" in raised.value.errors[1].message
+    assert db.query(DailyLog).count() == 0
+    assert db.query(DailyNutritionSummary).count() == 0
+
+
+def test_api_client_commits_once(api_client, catalog):
+    commits = []
+    event.listen(api_client.db, "after_commit", lambda session: commits.append(session))
+    with pytest.raises(BatchValidationError):
+        api_client.log_consumption_batch(catalog + [_entry("meal", 999, 1.0, "meal")])
+    assert api_client.get_range_summary(DAY, NEXT_DAY)[0].entry_count == 0
+
+    assert len(api_client.log_consumption_batch(catalog)) == 5
+    assert len(commits) == 1
+    assert [day.entry_count for day in api_client.get_range_summary(DAY, NEXT_DAY)] == [3, 2]
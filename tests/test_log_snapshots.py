@@ -0,0 +1,134 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event, update
+
+from food_app.backend.domain.food import FoodCreate
+from food_app.backend.domain.log import DailyLogCreate
+from food_app.backend.infrastructure.database import create_sqlite_engine
+from food_app.backend.infrastructure.migrations import LATEST_VERSION, LOG_SNAPSHOT_COLUMNS, init_db, run_migrations
+from food_app.backend.infrastructure.models import DailyLog, Food
+from food_app.backend.services.log_service import NUTRIENT_FIELDS, VECTOR_FIELDS, backfill_log_snapshots
+
+DAY = date(2024, 5, 1)
+
+
+def _log(log_service, loggable_type, loggable_id, quantity, unit_name, log_date=DAY):
+    return log_service.log_consumption(DailyLogCreate(
+        log_date=log_date, loggable_type=loggable_type, loggable_id=loggable_id, quantity=quantity, unit_name=unit_name,
+    ))
+
+
+@pytest.fixture
+def logged(db, services):
+    food_service, recipe_service, meal_service, log_service = services
+    oats = food_service.create(FoodCreate(
+        name="Aveia", category="Test", unit_label="g", unit_val=100.0,
+        calories=389.0, proteins=16.9, carbs=66.3, fats=6.9, fiber=10.6,
+    ))
+    food_service.add_unit(oats.id, "colher", 10.0)
+    recipe = recipe_service.create("Mingau", portions_yield=2)
+    recipe_service.add_ingredient(recipe.id, oats.id, 80.0, "g")
+    meal = meal_service.create("Café")
+    meal_service.add_item(meal.id, 3.0, "colher", food_id=oats.id)
+    meal_service.add_item(meal.id, 1.0, "portion", recipe_id=recipe.id)
+
+    _log(log_service, "food", oats.id, 50.0, "g")
+    _log(log_service, "recipe", recipe.id, 1.5, "portion")
+    _log(log_service, "meal", meal.id, 2.0, "meal")
+    db.commit()
+    return oats, recipe, meal
+
+
+def test_entries_store_resolved_nutrition(db, services, logged):
+    food_service, recipe_service, meal_service, _ = services
+    oats, recipe, meal = logged
+    expected = [
+        food_service.calculate_nutrition(oats.id, 50.0, "g"),
+        recipe_service.calculate_nutrition(recipe.id, 1.5, "portion"),
+        meal_service.calculate_nutrition(meal.id),
+    ]
+    factors = [1.0, 1.0, 2.0]
+
+    logs = db.query(DailyLog).order_by(DailyLog.id).all()
+    for entry, nutrition, factor in zip(logs, expected, factors):
+        assert entry.grams == pytest.approx(nutrition.weight_grams * factor)
+        for field in NUTRIENT_FIELDS:
+            assert getattr(entry, field) == pytest.approx(getattr(nutrition, field) * factor), field
+
+
+def test_meal_quantity_scales_report_and_summary(services, logged):
+    log_service = services[3]
+    meal_entry = log_service.get_daily_nutrition(DAY).entries[2]
+    single = services[2].calculate_nutrition(logged[2].id)
+
+    assert meal_entry.nutrition.calories == pytest.approx(2 * single.calories)
+    assert meal_entry.nutrition.weight_grams == pytest.approx(2 * single.weight_grams)
+    totals = log_service.get_daily_nutrition(DAY).totals
+    assert log_service.get_range_summary(DAY, DAY)[0].totals.calories == pytest.approx(totals.calories)
+
+
+def test_report_keeps_history_when_food_changes(db, engine, services, logged):
+    log_service = services[3]
+    before = log_service.get_daily_nutrition(DAY)
+
+    db.execute(update(Food).where(Food.id == logged[0].id).values(calories_100g=100.0))
+    db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    after = log_service.get_daily_nutrition(DAY)
+    assert len(statements) == 1
+    assert "recipe_ingredients" not in statements[0] and "meal_items" not in statements[0]
+    assert [e.nutrition for e in after.entries] == [e.nutrition for e in before.entries]
+    assert [e.name for e in after.entries] == ["Aveia", "Mingau", "Café"]
+
+
+def _forget_snapshots(db):
+    db.execute(update(DailyLog).values(**{f: None for f in NUTRIENT_FIELDS}))
+    db.commit()
+
+
+def test_legacy_entries_fall_back_and_backfill(db, services, logged):
+    log_service = services[3]
+    snapshotted = log_service.get_daily_nutrition(DAY)
+    _forget_snapshots(db)
+
+    legacy = log_service.get_daily_nutrition(DAY)
+    for entry, expected in zip(legacy.entries, snapshotted.entries):
+        for field in VECTOR_FIELDS:
+            assert getattr(entry.nutrition, field) == pytest.approx(getattr(expected.nutrition, field)), field
+
+    assert backfill_log_snapshots(db) == 3
+    assert backfill_log_snapshots(db) == 0
+    db.commit()
+    assert db.query(DailyLog).filter(DailyLog.calories.is_(None)).count() == 0
+    backfilled = log_service.get_daily_nutrition(DAY)
+    assert backfilled.totals.calories == pytest.approx(snapshotted.totals.calories)
+
+
+def test_backfill_respects_date_range(db, services, logged):
+    _log(services[3], "food", logged[0].id, 10.0, "g", log_date=date(2024, 6, 1))
+    db.commit()
+    _forget_snapshots(db)
+
+    assert backfill_log_snapshots(db, end=DAY) == 3
+    db.commit()
+    assert db.query(DailyLog).filter(DailyLog.calories.is_(None)).one().log_date == date(2024, 6, 1)
+
+
+def test_migration_adds_snapshot_columns(tmp_path):
+    engine = create_sqlite_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    try:
+        init_db(engine)
+        with engine.begin() as conn:
+            for column in LOG_SNAPSHOT_COLUMNS:
+                conn.exec_driver_sql(f"ALTER TABLE daily_logs DROP COLUMN {column}")
+            conn.exec_driver_sql("PRAGMA user_version = 4")
+
+        assert run_migrations(engine) == LATEST_VERSION
+        with engine.connect() as conn:
+            columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(daily_logs)")}
+    finally:
+        engine.dispose()
+    assert set(LOG_SNAPSHOT_COLUMNS) <= columns
@@ -0,0 +1,115 @@
+import json
+import logging
+import queue
+import time
+
+import pytest
+
+from food_app.backend.infrastructure import logger as log_setup
+from food_app.backend.infrastructure.logger import DroppingQueueHandler, RateLimitFilter
+
+
+@pytest.fixture
+def root_handlers():
+    root = logging.getLogger()
+    saved, level = list(root.handlers), root.level
+    yield root
+    log_setup.shutdown_logging()
+    root.handlers[:] = saved
+    root.setLevel(level)
+
+
+def _record(msg, name="test", level=logging.INFO, args=None):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_json_lines_are_flushed_on_shutdown(tmp_path, root_handlers):
+    log_setup.setup_logging(json_lines=True, log_dir=str(tmp_path), rate_limit=0)
+    log = logging.getLogger("food_app.test")
+    log.info("hello %s", "world")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        log.error("failed", exc_info=True)
+    log_setup.shutdown_logging()
+
+    lines = [json.loads(line) for line in (tmp_path / "app.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [(entry["level"], entry["message"]) for entry in lines] == [("INFO", "hello world"), ("ERROR", "failed")]
+    assert "ValueError: boom" in lines[1]["exc"]
+    assert lines[0]["logger"] == "food_app.test"
+
+
+def test_slow_disk_does_not_block_callers(tmp_path, root_handlers, monkeypatch):
+    log_setup.setup_logging(log_dir=str(tmp_path), rate_limit=0)
+    file_handler = log_setup._listener.handlers[1]
+    emit = file_handler.emit
+    monkeypatch.setattr(file_handler, "emit", lambda record: (time.sleep(0.02), emit(record)))
+
+    log = logging.getLogger("food_app.slow")
+    start = time.perf_counter()
+    for i in range(25):
+        log.debug("entry %d", i)
+    # 25 records x 20 ms of "disk" would be 0.5 s if written inline
+    assert time.perf_counter() - start < 0.25
+    log_setup.shutdown_logging()
+    assert (tmp_path / "app.log").read_text(encoding="utf-8").count("entry ") == 25
+
+
+def test_setup_is_idempotent(log_dir, root_handlers):
+    # The default directory; see the log_dir fixture
+    log_setup.setup_logging()
+    listener = log_setup._listener
+    log_setup.setup_logging()
+    assert log_setup._listener is listener
+    assert len(logging.getLogger().handlers) == 1
+    assert (log_dir / "app.log").exists()
+
+
+def test_full_queue_drops_and_reports():
+    q = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(q, "drop_new")
+    for i in range(5):
+        handler.handle(_record(f"m{i}"))
+    assert handler.dropped == 3
+    assert [q.get_nowait().msg for _ in range(2)] == ["m0", "m1"]
+
+    handler.handle(_record("after"))
+    assert "dropped 3 records" in q.get_nowait().getMessage()
+    assert q.get_nowait().msg == "after"
+
+
+def test_drop_oldest_keeps_newest():
+    q = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(q, "drop_oldest")
+    for i in range(4):
+        handler.handle(_record(f"m{i}"))
+    assert [q.get_nowait().msg for _ in range(2)] == ["m2", "m3"]
+    with pytest.raises(ValueError):
+        DroppingQueueHandler(q, "block")
+
+
+def test_args_are_frozen_when_queued():
+    q = queue.Queue()
+    handler = DroppingQueueHandler(q)
+    items = [1]
+    handler.handle(_record("items=%s", args=(items,)))
+    items.append(2)
+    assert q.get_nowait().getMessage() == "items=[1]"
+
+
+def test_rate_limit_per_logger_and_level(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(log_setup.time, "monotonic", lambda: now[0])
+    limiter = RateLimitFilter(rate=1.0, burst=3)
+
+    passed = [limiter.filter(_record(f"spam {i}", name="noisy")) for i in range(10)]
+    assert passed.count(True) == 3
+    assert limiter.suppressed == 7
+    # Other loggers and levels have their own budget
+    assert limiter.filter(_record("quiet", name="other"))
+    assert limiter.filter(_record("warn", name="noisy", level=logging.WARNING))
+
+    now[0] += 1.0
+    record = _record("spam again", name="noisy")
+    assert limiter.filter(record)
+    assert record.getMessage() == "spam again [7 similar records suppressed]"
@@ -0,0 +1,64 @@
+import pytest
+
+from food_app.backend.domain.food import FoodCreate
+
+
+@pytest.fixture
+def meals(services, make_food):
+    _, recipe_service, meal_service, _ = services
+    oats = make_food("Aveia", 390.0, 1.0, 1.0, 1.0)
+    banana = make_food("Banana", 90.0, 1.0, 1.0, 1.0)
+    milk = make_food("Leite", 60.0, 1.0, 1.0, 1.0)
+    porridge = recipe_service.create("Mingau", portions_yield=1)
+    recipe_service.add_ingredient(porridge.id, oats.id, 40.0, "g")
+    recipe_service.add_ingredient(porridge.id, milk.id, 200.0, "g")
+
+    breakfast = meal_service.create("Café")
+    meal_service.add_item(breakfast.id, 1.0, "portion", recipe_id=porridge.id)
+    snack = meal_service.create("Lanche")
+    meal_service.add_item(snack.id, 120.0, "g", food_id=banana.id)
+    return dict(oats=oats, banana=banana, milk=milk, porridge=porridge, breakfast=breakfast, snack=snack)
+
+
+def test_repeated_calls_hit_cache(services, meals):
+    meal_service = services[2]
+    first = meal_service.calculate_nutrition(meals["breakfast"].id)
+    second = meal_service.calculate_nutrition(meals["breakfast"].id)
+    assert first is second
+    stats = meal_service.cache_stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+
+
+def test_food_write_evicts_only_dependent_meals(services, meals):
+    food_service, _, meal_service, _ = services
+    breakfast, snack = meals["breakfast"].id, meals["snack"].id
+    meal_service.calculate_nutrition(breakfast)
+    meal_service.calculate_nutrition(snack)
+
+    # milk is reached through the porridge recipe, so only breakfast is affected
+    food_service.add_unit(meals["milk"].id, "copo", 250.0)
+    stats = meal_service.cache_stats()
+    assert (stats.evictions, stats.size) == (1, 1)
+
+    meal_service.calculate_nutrition(snack)
+    assert meal_service.cache_stats().hits == 1
+
+    food_service.update(meals["banana"].id, FoodCreate(
+        name="Banana", category="Test", unit_label="g", unit_val=100.0,
+        calories=100.0, proteins=1.0, carbs=1.0, fats=1.0,
+    ))
+    assert meal_service.calculate_nutrition(snack).calories == pytest.approx(120.0)
+
+
+def test_meal_and_recipe_writes_evict(services, meals):
+    _, recipe_service, meal_service, _ = services
+    breakfast = meals["breakfast"].id
+    before = meal_service.calculate_nutrition(breakfast)
+
+    recipe_service.update_portions_yield(meals["porridge"].id, 2)
+    halved = meal_service.calculate_nutrition(breakfast)
+    assert halved.calories == pytest.approx(before.calories / 2)
+
+    meal_service.add_item(breakfast, 100.0, "g", food_id=meals["banana"].id)
+    assert meal_service.calculate_nutrition(breakfast).calories == pytest.approx(halved.calories + 90.0)
+    assert meal_service.cache_stats().misses == 3
@@ -0,0 +1,128 @@
+import threading
+import timeit
+
+import pytest
+
+from food_app.backend.infrastructure import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    enabled, sample_every = metrics.is_enabled(), metrics.sample_every()
+    metrics.configure(enabled=True, sample_every=1)
+    metrics.reset()
+    yield
+    metrics.configure(enabled=enabled, sample_every=sample_every)
+    metrics.reset()
+
+
+def _stats(func):
+    name = f"{func.__module__}.{func.__qualname__}"
+    return next(s for s in metrics.snapshot() if s.name == name)
+
+
+def test_buckets_are_contiguous_and_tight():
+    previous_upper = 0
+    for index in range(metrics.NUM_BUCKETS):
+        upper = metrics.bucket_upper_ns(index)
+        assert metrics.bucket_index(previous_upper) == index
+        assert metrics.bucket_index(upper - 1) == index
+        # Relative width of a bucket never exceeds 25% of its lower bound
+        assert index < 4 or (upper - previous_upper) / previous_upper <= 0.25
+        previous_upper = upper
+
+
+def test_quantiles_from_histogram():
+    buckets = [0] * metrics.NUM_BUCKETS
+    buckets[metrics.bucket_index(1_000)] = 90        # 1 us
+    buckets[metrics.bucket_index(1_000_000)] = 9     # 1 ms
+    buckets[metrics.bucket_index(100_000_000)] = 1   # 100 ms
+    assert 1e-6 <= metrics.quantile(buckets, 0.5) <= 1.25e-6
+    assert 1e-3 <= metrics.quantile(buckets, 0.95) <= 1.25e-3
+    assert 1e-3 <= metrics.quantile(buckets, 0.99) <= 1.25e-3
+    assert 1e-1 <= metrics.quantile(buckets, 1.0) <= 1.25e-1
+    assert metrics.quantile([0] * metrics.NUM_BUCKETS, 0.5) == 0.0
+
+
+@metrics.trace_execution
+def _work(fail=False):
+    if fail:
+        raise ValueError("boom")
+    return 42
+
+
+def test_counts_errors_and_sampling():
+    for _ in range(7):
+        assert _work() == 42
+    with pytest.raises(ValueError):
+        _work(fail=True)
+    stats = _stats(_work)
+    assert (stats.calls, stats.errors, stats.sampled) == (8, 1, 7)
+    assert 0 < stats.p50 <= stats.p95 <= stats.p99
+
+    metrics.reset()
+    metrics.configure(sample_every=4)
+    for _ in range(10):
+        _work()
+    stats = _stats(_work)
+    assert (stats.calls, stats.sampled) == (10, 2)
+
+
+def test_threads_record_into_their_own_shards():
+    def run():
+        for _ in range(500):
+            _work()
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = _stats(_work)
+    assert stats.calls == stats.sampled == 2000
+    assert sum(stats.buckets) == 2000
+
+
+def test_exited_threads_are_folded_into_one_total():
+    for round_ in range(1, 4):
+        threads = [threading.Thread(target=_work) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert _stats(_work).calls == 20 * round_
+    assert not [thread for thread, _ in metrics.REGISTRY._shards if not thread.is_alive()]
+
+    metrics.reset()
+    assert metrics.snapshot() == []
+
+
+def test_disabled_records_nothing():
+    metrics.configure(enabled=False)
+    _work()
+    assert metrics.snapshot() == []
+
+
+def test_prometheus_text():
+    for _ in range(3):
+        _work()
+    text = metrics.prometheus_text()
+    name = f"{_work.__module__}.{_work.__qualname__}"
+    assert f'food_app_calls_total{{function="{name}"}} 3' in text
+    assert f'food_app_call_duration_seconds_count{{function="{name}"}} 3' in text
+    assert f'food_app_call_duration_seconds_bucket{{function="{name}",le="+Inf"}} 3' in text
+    buckets = [int(line.rsplit(" ", 1)[1]) for line in text.splitlines()
+               if line.startswith("food_app_call_duration_seconds_bucket") and name in line]
+    assert buckets == sorted(buckets)
+    assert f'food_app_call_duration_quantile_seconds{{function="{name}",quantile="0.99"}}' in text
+    for line in text.splitlines():
+        assert line.startswith("#") or len(line.rsplit(" ", 1)) == 2
+
+
+def test_disabled_overhead_is_below_a_microsecond():
+    def bare(x):
+        return x
+    wrapped = metrics.trace_execution(bare)
+    metrics.configure(enabled=False)
+    n = 100_000
+    per_call = lambda fn: min(timeit.repeat(lambda: fn(1), number=n, repeat=7)) / n
+    assert per_call(wrapped) - per_call(bare) < 1e-6
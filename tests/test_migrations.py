@@ -0,0 +1,56 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from food_app.backend.infrastructure.base import Base
+from food_app.backend.infrastructure.database import create_sqlite_engine
+from food_app.backend.infrastructure.migrations import LATEST_VERSION, current_version, init_db, run_migrations
+from food_app.backend.services.log_service import _daily_nutrition_query, _daily_snapshot_query
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """A database as created before the migration runner: tables only, no secondary indexes."""
+    engine = create_sqlite_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        names = conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'ix_%'").scalars().all()
+        for name in names:
+            conn.exec_driver_sql(f"DROP INDEX {name}")
+        conn.exec_driver_sql("PRAGMA user_version = 0")
+    yield engine
+    engine.dispose()
+
+
+def _plan(engine, sql, **params):
+    with engine.connect() as conn:
+        return " | ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params))
+
+
+def test_upgrade_in_place_uses_indexes(legacy_engine):
+    assert "SCAN daily_logs" in _plan(legacy_engine, "SELECT * FROM daily_logs WHERE log_date = :d", d="2024-01-01")
+
+    assert run_migrations(legacy_engine) == LATEST_VERSION
+    with legacy_engine.connect() as conn:
+        assert current_version(conn) == LATEST_VERSION
+
+    plan = _plan(legacy_engine, "SELECT * FROM daily_logs WHERE log_date = :d ORDER BY id", d="2024-01-01")
+    assert "USING INDEX ix_daily_logs_log_date_id" in plan
+    assert "TEMP B-TREE" not in plan
+    assert "ix_recipe_ingredients_recipe_id" in _plan(legacy_engine, "SELECT * FROM recipe_ingredients WHERE recipe_id = 1")
+    assert "ix_meal_items_meal_id" in _plan(legacy_engine, "SELECT * FROM meal_items WHERE meal_id = 1")
+    assert "ix_daily_logs_food_id" in _plan(legacy_engine, "SELECT * FROM daily_logs WHERE food_id = 1")
+    assert "ix_foods_is_active" in _plan(legacy_engine, "SELECT * FROM foods WHERE is_active = 1")
+
+
+def test_daily_report_query_uses_date_index(engine):
+    for query in (_daily_nutrition_query(date(2024, 1, 1)), _daily_snapshot_query(date(2024, 1, 1))):
+        compiled = query.compile(engine, compile_kwargs={"literal_binds": True})
+        assert "ix_daily_logs_log_date_id" in _plan(engine, str(compiled))
+
+
+def test_init_db_is_idempotent(engine):
+    assert init_db(engine) == LATEST_VERSION
+    with engine.connect() as conn:
+        assert current_version(conn) == LATEST_VERSION
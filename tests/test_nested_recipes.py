@@ -0,0 +1,170 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import update
+
+from food_app.backend.domain.food import FoodCreate
+from food_app.backend.domain.log import DailyLogCreate
+from food_app.backend.infrastructure.database import create_sqlite_engine
+from food_app.backend.infrastructure.migrations import LATEST_VERSION, init_db, run_migrations
+from food_app.backend.infrastructure.models import DailyLog, RecipeIngredient, RecipeNutrition
+from food_app.backend.services.log_service import NUTRIENT_FIELDS
+from food_app.backend.services.recipe_service import RecipeCycleError, RecipeService
+
+DAY = date(2024, 5, 1)
+
+
+@pytest.fixture
+def pizza(db, services, make_food):
+    _, recipe_service, _, _ = services
+    tomato = make_food("Tomate", 20.0, 10.0, 20.0, 5.0)
+    flour = make_food("Farinha", 360.0, 10.0, 20.0, 5.0)
+    sauce = recipe_service.create("Molho", portions_yield=4)
+    recipe_service.add_ingredient(sauce.id, tomato.id, 400.0, "g")  # 100 g, 20 kcal per portion
+    dough = recipe_service.create("Massa", portions_yield=2)
+    recipe_service.add_ingredient(dough.id, flour.id, 200.0, "g")  # 100 g, 360 kcal per portion
+    pizza = recipe_service.create("Pizza", portions_yield=2)
+    recipe_service.add_ingredient(pizza.id, None, 2.0, "portion", sub_recipe_id=dough.id)
+    recipe_service.add_ingredient(pizza.id, None, 150.0, "g", sub_recipe_id=sauce.id)
+    db.commit()
+    return tomato, sauce, dough, pizza
+
+
+def test_sub_recipes_feed_parent_nutrition(db, services, pizza):
+    recipe_service = services[1]
+    tomato, sauce, dough, pizza = pizza
+    # (2 portions of dough + 150 g of sauce) / 2 portions
+    expected_calories = (2 * 360.0 + 1.5 * 20.0) / 2
+    row = db.get(RecipeNutrition, pizza.id)
+    assert row.calories == pytest.approx(expected_calories)
+    assert row.weight_grams == pytest.approx((200.0 + 150.0) / 2)
+
+    fresh = recipe_service.evaluate([pizza.id])
+    assert set(fresh) == {sauce.id, dough.id, pizza.id}
+    assert fresh[pizza.id][0] == pytest.approx(expected_calories)
+
+
+def test_shared_sub_recipe_is_evaluated_once(db, services, make_food, monkeypatch):
+    _, recipe_service, _, _ = services
+    base = recipe_service.create("Base", portions_yield=1)
+    recipe_service.add_ingredient(base.id, make_food("Leite", 60.0, 10.0, 20.0, 5.0).id, 100.0, "g")
+    left = recipe_service.create("Creme", portions_yield=1)
+    right = recipe_service.create("Pudim", portions_yield=1)
+    top = recipe_service.create("Sobremesa", portions_yield=1)
+    for parent in (left, right):
+        recipe_service.add_ingredient(parent.id, None, 1.0, "portion", sub_recipe_id=base.id)
+        recipe_service.add_ingredient(top.id, None, 1.0, "portion", sub_recipe_id=parent.id)
+
+    computed = []
+    compute = RecipeService._compute_portion
+    monkeypatch.setattr(RecipeService, "_compute_portion", lambda self, r, p: computed.append(r.id) or compute(self, r, p))
+    portions = recipe_service.evaluate([top.id])
+    assert sorted(computed) == sorted([base.id, left.id, right.id, top.id])
+    assert computed[0] == base.id and computed[-1] == top.id
+    assert portions[top.id][0] == pytest.approx(120.0)
+
+
+def test_cycles_are_rejected(db, services, pizza):
+    recipe_service = services[1]
+    _, sauce, dough, pizza = pizza
+    for recipe_id, sub_recipe_id in ((pizza.id, pizza.id), (dough.id, pizza.id), (sauce.id, pizza.id)):
+        with pytest.raises(RecipeCycleError):
+            recipe_service.add_ingredient(recipe_id, None, 1.0, "portion", sub_recipe_id=sub_recipe_id)
+    assert db.query(RecipeIngredient).count() == 4
+
+    with pytest.raises(ValueError):
+        recipe_service.add_ingredient(pizza.id, None, 1.0, "portion")
+
+
+def test_leaf_changes_propagate_upward(db, services, pizza):
+    food_service, recipe_service, meal_service, _ = services
+    tomato, sauce, dough, pizza = pizza
+    meal = meal_service.create("Jantar")
+    meal_service.add_item(meal.id, 1.0, "portion", recipe_id=pizza.id)
+    before = meal_service.calculate_nutrition(meal.id).calories
+
+    food_service.update(tomato.id, FoodCreate(
+        name="Tomate", category="Test", unit_label="g", unit_val=100.0,
+        calories=40.0, proteins=10.0, carbs=20.0, fats=5.0,
+    ))
+    assert db.get(RecipeNutrition, sauce.id).calories == pytest.approx(40.0)
+    expected = (2 * 360.0 + 1.5 * 40.0) / 2
+    assert db.get(RecipeNutrition, pizza.id).calories == pytest.approx(expected)
+    assert meal_service.calculate_nutrition(meal.id).calories == pytest.approx(expected) != before
+
+    recipe_service.update_portions_yield(dough.id, 4)
+    assert db.get(RecipeNutrition, pizza.id).calories == pytest.approx((2 * 180.0 + 1.5 * 40.0) / 2)
+
+
+def test_legacy_log_entries_use_materialized_recipes(db, services, pizza):
+    log_service = services[3]
+    pizza = pizza[3]
+    log_service.log_consumption(DailyLogCreate(
+        log_date=DAY, loggable_type="recipe", loggable_id=pizza.id, quantity=1.5, unit_name="portion",
+    ))
+    db.commit()
+    snapshotted = log_service.get_daily_nutrition(DAY).totals
+    db.execute(update(DailyLog).values(**{f: None for f in NUTRIENT_FIELDS}))
+    db.commit()
+
+    legacy = log_service.get_daily_nutrition(DAY).totals
+    assert legacy.calories == pytest.approx(snapshotted.calories)
+    assert legacy.weight_grams == pytest.approx(snapshotted.weight_grams)
+
+
+def test_migration_rebuilds_ingredient_table(tmp_path):
+    engine = create_sqlite_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    try:
+        init_db(engine)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE recipe_ingredients")
+            conn.exec_driver_sql(
+                "CREATE TABLE recipe_ingredients (id INTEGER PRIMARY KEY, recipe_id INTEGER NOT NULL, "
+                "food_id INTEGER NOT NULL, quantity FLOAT NOT NULL, unit_name VARCHAR(64) NOT NULL)"
+            )
+            conn.exec_driver_sql("CREATE INDEX ix_recipe_ingredients_recipe_id ON recipe_ingredients (recipe_id)")
+            conn.exec_driver_sql("INSERT INTO recipe_ingredients VALUES (7, 1, 2, 50.0, 'g')")
+            conn.exec_driver_sql("PRAGMA user_version = 5")
+
+        assert run_migrations(engine) == LATEST_VERSION
+        with engine.begin() as conn:
+            assert conn.exec_driver_sql("SELECT id, food_id, sub_recipe_id FROM recipe_ingredients").all() == [(7, 2, None)]
+            conn.exec_driver_sql(
+                "INSERT INTO recipe_ingredients (recipe_id, sub_recipe_id, quantity, unit_name) VALUES (1, 3, 1.0, 'portion')"
+            )
+            indexes = {row[1] for row in conn.exec_driver_sql("PRAGMA index_list(recipe_ingredients)")}
+    finally:
+        engine.dispose()
+    assert {"ix_recipe_ingredients_recipe_id", "ix_recipe_ingredients_sub_recipe_id"} <= indexes
+
+
+def test_migration_materializes_legacy_recipes(tmp_path):
+    engine = create_sqlite_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    try:
+        init_db(engine)
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO foods (id, name, category, calories_100g, proteins_100g, carbs_100g, fats_100g, is_liquid, is_active) "
+                "VALUES (1, 'Farinha', 'Test', 360, 10, 70, 1, 0, 1)"
+            )
+            conn.exec_driver_sql("INSERT INTO food_units (food_id, unit_name, grams) VALUES (1, 'xícara', 120)")
+            conn.exec_driver_sql("INSERT INTO recipes (id, name, portions_yield, is_active) VALUES (1, 'Pão', 4, 1)")
+            conn.exec_driver_sql(
+                "INSERT INTO recipe_ingredients (recipe_id, food_id, quantity, unit_name) VALUES (1, 1, 200, 'g'), (1, 1, 1, 'xícaras')"
+            )
+            conn.exec_driver_sql(
+                "INSERT INTO daily_logs (log_date, recipe_id, quantity, unit_name, grams) VALUES ('2024-05-01', 1, 2, 'portion', 0)"
+            )
+            # A file upgraded past migration 4 before recipe_nutrition was filled
+            conn.exec_driver_sql("PRAGMA user_version = 7")
+
+        assert run_migrations(engine) == LATEST_VERSION
+        with engine.connect() as conn:
+            portion = conn.exec_driver_sql("SELECT calories, weight_grams FROM recipe_nutrition WHERE recipe_id = 1").one()
+            day = conn.exec_driver_sql("SELECT entry_count, calories FROM daily_nutrition_summary").one()
+    finally:
+        engine.dispose()
+    # (200 g + 120 g) / 4 portions
+    assert portion.weight_grams == pytest.approx(80.0)
+    assert portion.calories == pytest.approx(288.0)
+    assert (day.entry_count, day.calories) == (1, pytest.approx(576.0))
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from sqlalchemy import event
+
+from food_app.backend.domain.food import FoodCreate
+from food_app.backend.infrastructure.models import Food
+from food_app.backend.services.nutrient_engine import FOOD_NUTRIENT_COLUMNS, NUTRIENT_FIELDS, VECTOR_FIELDS, to_nutrition
+
+
+def _from_columns(food, grams):
+    """The vector the stored per-100g columns give for `grams` of a food, or zeros without one."""
+    if food is None:
+        return [0.0] * len(VECTOR_FIELDS)
+    return [(getattr(food, FOOD_NUTRIENT_COLUMNS[f].key) or 0.0) * grams / 100.0 for f in NUTRIENT_FIELDS] + [grams]
+
+
+def test_batch_matches_food_columns(db, services):
+    food_service = services[0]
+    ids = [
+        food_service.create(FoodCreate(
+            name=f"Food {i}", category="Test", unit_label="g", unit_val=100.0,
+            calories=50.0 + i, proteins=i, carbs=2.0 * i, fats=0.5,
+            sodium=10.0 * i if i % 2 else None,
+        )).id
+        for i in range(20)
+    ]
+    food_ids = ids * 3 + [10_000]  # includes an unknown food
+    grams = np.linspace(5.0, 500.0, len(food_ids))
+
+    per_item = food_service.engine.evaluate(food_ids, grams)
+    total = to_nutrition(food_service.engine.total(food_ids, grams))
+
+    expected = [_from_columns(db.get(Food, fid), g) for fid, g in zip(food_ids, grams)]
+    for row, vector in zip(per_item, expected):
+        assert row == pytest.approx(vector)
+    for i, field in enumerate(VECTOR_FIELDS):
+        assert getattr(total, field) == pytest.approx(sum(vector[i] for vector in expected))
+
+
+def test_calculate_nutrition_goes_through_resolver_and_engine(engine, db, services, make_food):
+    food_service = services[0]
+    cheese = make_food("Queijo", 300.0, 20.0, 1.0, 25.0, sodium=600.0, units=[("fatia", 30.0)])
+    db.commit()
+
+    slices = food_service.calculate_nutrition(cheese.id, 2.0, "Fatias")
+    assert [getattr(slices, f) for f in VECTOR_FIELDS] == pytest.approx(_from_columns(cheese, 60.0))
+    assert food_service.calculate_nutrition(10_000, 2.0, "fatia") == to_nutrition(np.zeros(len(VECTOR_FIELDS)))
+
+    cheese_id = cheese.id
+    db.expire_all()
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        # Both the unit index and the matrix row are cached; the expired ORM row is not read
+        food_service.calculate_nutrition(cheese_id, 1.0, "fatia")
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert statements == []
+
+
+def test_update_refreshes_matrix_row(services):
+    food_service = services[0]
+    data = dict(name="Queijo", category="Test", unit_label="g", unit_val=100.0, proteins=20.0, carbs=1.0, fats=25.0)
+    food = food_service.create(FoodCreate(calories=300.0, **data))
+    assert food_service.engine.total([food.id], [50.0])[0] == pytest.approx(150.0)
+    food_service.update(food.id, FoodCreate(calories=280.0, **data))
+    assert food_service.engine.total([food.id], [50.0])[0] == pytest.approx(140.0)
+
+
+def test_batch_larger_than_initial_matrix(services):
+    food_service = services[0]
+    ids = [
+        food_service.create(FoodCreate(
+            name=f"Food {i}", category="Test", unit_label="g", unit_val=100.0,
+            calories=float(i), proteins=1.0, carbs=1.0, fats=1.0,
+        )).id
+        for i in range(150)
+    ]
+    food_service.engine.clear()
+    # The first batch has to grow the matrix while loading
+    assert food_service.engine.total(ids, [100.0] * len(ids))[0] == pytest.approx(sum(range(150)))
+    food_service.engine.clear()
+    assert food_service.engine.evaluate(ids, [100.0] * len(ids))[-1, 0] == pytest.approx(149.0)
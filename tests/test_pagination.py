@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import select
+
+from food_app.backend.infrastructure.models import Food, Recipe, Meal
+from food_app.backend.services.pagination import MAX_PAGE_SIZE, list_foods, list_meals, list_recipes
+
+
+@pytest.fixture
+def catalog(db):
+    db.add_all(
+        Food(
+            name=f"{'Feijão' if i % 3 == 0 else 'Arroz'} {i}",
+            category="Grãos" if i % 2 == 0 else "Outros", is_liquid=False,
+            is_active=i % 7 != 0,
+            calories_100g=100.0, proteins_100g=1.0, carbs_100g=1.0, fats_100g=1.0,
+        )
+        for i in range(1, 51)
+    )
+    db.add_all(Recipe(name=f"Receita {i}", portions_yield=1) for i in range(5))
+    db.add_all(Meal(name=f"Refeição {i}") for i in range(5))
+    db.commit()
+
+
+def _walk(fetch, **filters):
+    pages, cursor = [], None
+    while True:
+        page = fetch(cursor=cursor, **filters)
+        pages.append([item.id for item in page.items])
+        if page.next_cursor is None:
+            return pages
+        cursor = page.next_cursor
+
+
+def test_pages_cover_every_active_food_once(db, catalog):
+    pages = _walk(lambda **kw: list_foods(db, limit=8, **kw))
+    ids = [food_id for page in pages for food_id in page]
+    expected = db.scalars(select(Food.id).where(Food.is_active == True).order_by(Food.id)).all()
+    assert ids == expected
+    assert all(len(page) == 8 for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= 8
+
+
+def test_filters_apply_to_every_page(db, catalog):
+    foods = [food for page in _walk(lambda **kw: list_foods(db, limit=3, **kw), category="Grãos", name="feij")
+             for food in db.scalars(select(Food).where(Food.id.in_(page)))]
+    assert foods
+    assert all(f.category == "Grãos" and f.name.startswith("Feijão") and f.is_active for f in foods)
+    assert list_foods(db, name="100%").items == []
+
+
+def test_new_rows_do_not_shift_pages(db, catalog):
+    first = list_foods(db, limit=5)
+    db.add(Food(name="Aveia", category="Grãos", is_liquid=False, calories_100g=1.0, proteins_100g=1.0, carbs_100g=1.0, fats_100g=1.0))
+    db.commit()
+    second = list_foods(db, cursor=first.next_cursor, limit=5)
+    assert second.items[0].id > first.items[-1].id
+
+
+def test_recipes_and_meals(db, catalog):
+    assert [len(p) for p in _walk(lambda **kw: list_recipes(db, limit=2, **kw))] == [2, 2, 1]
+    assert [len(p) for p in _walk(lambda **kw: list_meals(db, limit=5, **kw))] == [5]
+    assert [r.name for r in list_recipes(db, name="receita 3").items] == ["Receita 3"]
+
+
+def test_rejects_bad_cursor_and_page_size(db, catalog):
+    with pytest.raises(ValueError):
+        list_foods(db, cursor="not-a-cursor")
+    with pytest.raises(ValueError):
+        list_foods(db, limit=MAX_PAGE_SIZE + 1)
+
+
+def test_page_query_is_an_index_range_scan(engine):
+    stmt = select(Food).where(Food.is_active == True, Food.id > 5).order_by(Food.id).limit(6)
+    sql = str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        plan = " | ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+    assert "USING INDEX ix_foods_is_active" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,165 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event, text
+
+from food_app.backend.domain.food import FoodCreate
+from food_app.backend.domain.log import DailyLogCreate
+from food_app.backend.services.nutrition_dataclass import MacroGoals
+from food_app.frontend.api_client import ApiClient
+from food_app.frontend.read_cache import ReadCache
+
+DAY = date(2024, 5, 1)
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, value):
+        self.calls += 1
+        return value
+
+
+def test_hits_until_version_changes():
+    version = [0]
+    cache = ReadCache(lambda: version[0], enabled=True)
+    compute = Counter()
+
+    assert cache.get_or_compute("f", 4, ("a",), lambda: compute(1)) == 1
+    assert cache.get_or_compute("f", 4, ("a",), lambda: compute(2)) == 1
+    assert compute.calls == 1
+
+    version[0] += 1
+    assert cache.get_or_compute("f", 4, ("a",), lambda: compute(3)) == 3
+    assert compute.calls == 2
+    assert cache.invalidations == 1
+    [stats] = cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 2, 1)
+
+
+def test_tables_are_bounded_lru():
+    cache = ReadCache(lambda: 0, enabled=True)
+    for key in range(3):
+        cache.get_or_compute("f", 2, key, lambda: key)
+    cache.get_or_compute("f", 2, 1, lambda: None)  # refresh 1, so 2 is the oldest
+    cache.get_or_compute("f", 2, 3, lambda: 3)
+
+    [stats] = cache.stats()
+    assert (stats.size, stats.maxsize, stats.evictions) == (2, 2, 2)
+    assert cache.get_or_compute("f", 2, 1, lambda: "recomputed") == 1
+    assert cache.get_or_compute("f", 2, 2, lambda: "recomputed") == "recomputed"
+
+
+def test_value_computed_across_a_write_is_not_stored():
+    version = [0]
+    cache = ReadCache(lambda: version[0], enabled=True)
+
+    def racing_read():
+        version[0] += 1
+        return "old"
+
+    assert cache.get_or_compute("f", 4, "k", racing_read) == "old"
+    assert cache.get_or_compute("f", 4, "k", lambda: "new") == "new"
+
+
+def test_unhashable_arguments_bypass_the_cache():
+    cache = ReadCache(lambda: 0, enabled=True)
+    assert cache.get_or_compute("f", 4, ([1],), lambda: "a") == "a"
+    assert cache.stats() == []
+
+
+@pytest.fixture
+def api(api_client):
+    api_client.read_cache.enabled = True
+    return api_client
+
+
+def _oats():
+    return FoodCreate(name="Aveia", category="Test", unit_label="g", unit_val=100.0,
+                      calories=389.0, proteins=16.9, carbs=66.3, fats=6.9)
+
+
+def test_client_reads_are_cached_until_a_write(api, engine):
+    oats = api.create_food(_oats())
+    statements = []
+    for bind in (engine, api.read_db.get_bind()):
+        event.listen(bind, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    assert [r.name for r in api.search_foods("aveia")] == ["Aveia"]
+    assert api.calculate_food_nutrition(oats.id, 50.0, "g").calories == pytest.approx(194.5)
+    issued = len(statements)
+    assert issued > 0
+    # The version probe bypasses the engine; cached reads issue nothing else
+    assert [r.name for r in api.search_foods("aveia")] == ["Aveia"]
+    assert api.calculate_food_nutrition(oats.id, 50.0, "g").calories == pytest.approx(194.5)
+    assert len(statements) == issued
+
+    api.log_consumption(DailyLogCreate(log_date=DAY, loggable_type="food", loggable_id=oats.id, quantity=50.0, unit_name="g"))
+    assert api.get_daily_nutrition(DAY).totals.calories == pytest.approx(194.5)
+    stats = {s.name: s for s in api.get_read_cache_stats()}
+    assert stats["search_foods"].hits == 1
+    assert stats["calculate_food_nutrition"].hits == 1
+
+
+def test_commits_by_other_connections_invalidate(api, engine):
+    api.create_food(_oats())
+    assert len(api.get_active_foods()) == 1
+    version = api.data_version()
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO foods (name, category, calories_100g, proteins_100g, carbs_100g, fats_100g, is_liquid, is_active) "
+            "VALUES ('Leite', 'Test', 60, 3, 5, 3, 1, 1)"
+        ))
+
+    assert api.data_version() != version
+    assert len(api.get_active_foods()) == 2
+
+
+def test_other_clients_logging_keeps_computed_caches(api, session_factories):
+    oats = api.create_food(_oats())
+    meal = api.create_meal("Café")
+    api.add_meal_item(meal.id, 50.0, "g", food_id=oats.id)
+    other = ApiClient(*session_factories)
+    try:
+        api.refresh()
+        engine = api.food_service.engine
+        engine.total([oats.id], [50.0])
+        api.calculate_meal_nutrition(meal.id)
+        rows = dict(engine._rows)
+        assert rows
+
+        other.log_consumption(DailyLogCreate(log_date=DAY, loggable_type="meal", loggable_id=meal.id, quantity=1.0, unit_name="meal"))
+        api.refresh()
+        assert engine._rows == rows
+        assert api.get_meal_cache_stats().size == 1
+
+        # A catalog change does drop them
+        other.add_custom_unit(oats.id, "pote", 500.0)
+        api.refresh()
+        assert engine._rows == {}
+        assert api.get_meal_cache_stats().size == 0
+    finally:
+        other.close()
+
+
+def test_recommender_reloads_only_on_catalog_or_recipe_changes(api, session_factories):
+    oats = api.create_food(_oats())
+    gap = MacroGoals(calories=400.0, proteins=20.0, carbs=60.0, fats=10.0)
+    other = ApiClient(*session_factories)
+    try:
+        assert api.recommend_foods(gap)
+        catalog = api.recommender._catalog
+
+        other.log_consumption(DailyLogCreate(log_date=DAY, loggable_type="food", loggable_id=oats.id, quantity=50.0, unit_name="g"))
+        api.refresh()
+        api.recommend_foods(gap, limit=5)
+        assert api.recommender._catalog is catalog
+
+        other.create_recipe("Mingau", portions_yield=1)
+        api.refresh()
+        api.recommend_foods(gap, limit=3)
+        assert api.recommender._catalog is not catalog
+    finally:
+        other.close()
@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import event
+
+from food_app.backend.domain.food import FoodCreate
+from food_app.backend.infrastructure.models import RecipeNutrition
+
+
+@pytest.fixture
+def recipe(db, services, make_food):
+    food_service, recipe_service, _, _ = services
+    flour = make_food("Farinha", 360.0, 10.0, 20.0, 5.0, fiber=2.0)
+    egg = make_food("Ovo", 150.0, 10.0, 20.0, 5.0, fiber=2.0)
+    food_service.add_unit(egg.id, "unidade", 50.0)
+    recipe = recipe_service.create("Panqueca", portions_yield=2)
+    recipe_service.add_ingredient(recipe.id, flour.id, 100.0, "g")
+    recipe_service.add_ingredient(recipe.id, egg.id, 2.0, "unidade")
+    db.commit()
+    return recipe, flour, egg
+
+
+def test_lookup_reads_one_row(engine, db, services, recipe):
+    recipe_id = recipe[0].id
+    db.expunge_all()
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    n = services[1].calculate_nutrition(recipe_id, 1.5)
+    assert len(statements) == 1
+    # (360 + 2 * 0.5 * 150) / 2 portions * 1.5
+    assert n.calories == pytest.approx(382.5)
+    assert n.weight_grams == pytest.approx(150.0)
+
+
+def test_materialized_row_follows_writes(db, services, recipe):
+    food_service, recipe_service, _, _ = services
+    recipe, flour, egg = recipe
+    row = db.get(RecipeNutrition, recipe.id)
+    assert row.calories == pytest.approx(255.0)
+
+    food_service.add_unit(egg.id, "unidade", 60.0)
+    assert row.calories == pytest.approx((360.0 + 180.0) / 2)
+    assert row.weight_grams == pytest.approx(110.0)
+
+    food_service.update(flour.id, FoodCreate(
+        name="Farinha", category="Test", unit_label="g", unit_val=100.0,
+        calories=340.0, proteins=10.0, carbs=20.0, fats=5.0,
+    ))
+    assert row.calories == pytest.approx((340.0 + 180.0) / 2)
+    assert row.fiber == pytest.approx(1.2)  # fiber dropped from flour
+
+    recipe_service.update_portions_yield(recipe.id, 4)
+    assert row.calories == pytest.approx((340.0 + 180.0) / 4)
+
+    recipe_service.add_ingredient(recipe.id, flour.id, 50.0, "g")
+    assert row.calories == pytest.approx((340.0 + 180.0 + 170.0) / 4)
+
+
+def test_missing_row_is_computed_without_writing(engine, db, services, recipe):
+    recipe_id = recipe[0].id
+    db.query(RecipeNutrition).delete()
+    db.commit()
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    assert services[1].calculate_nutrition(recipe_id, 1.5).calories == pytest.approx(382.5)
+    assert not [s for s in statements if not s.lstrip().startswith("SELECT")]
+    assert db.get(RecipeNutrition, recipe_id) is None
@@ -0,0 +1,59 @@
+import pytest
+
+from food_app.backend.services.nutrition_dataclass import MacroGoals
+from food_app.backend.services.recommender import MacroRecommender
+
+GOALS = MacroGoals(calories=2000.0, proteins=100.0, carbs=250.0, fats=65.0)
+
+
+@pytest.fixture
+def catalog(db, services, make_food):
+    food_service, recipe_service, _, _ = services
+    chicken = make_food("Frango", 198.0, 37.0, 0.0, 4.6, unit_label="filé", unit_val=120.0)
+    rice = make_food("Arroz", 205.0, 4.2, 44.5, 0.4, unit_label="xícara", unit_val=160.0)
+    oil = make_food("Azeite", 119.0, 0.0, 0.0, 13.5, unit_label="colher", unit_val=13.5)
+    food_service.add_unit(oil.id, "g", 1.0)  # mass units are not servings
+    egg = make_food("Ovo", 155.0, 13.0, 1.1, 11.0)
+    bowl = recipe_service.create("Arroz com frango", portions_yield=2)
+    recipe_service.add_ingredient(bowl.id, chicken.id, 2.0, "filé")
+    recipe_service.add_ingredient(bowl.id, rice.id, 2.0, "xícara")
+    db.commit()
+    return chicken, rice, oil, egg, bowl
+
+
+def test_ranks_servings_by_fit(db, services, catalog):
+    chicken, rice, oil, egg, bowl = catalog
+    recommender = MacroRecommender(db)
+
+    [best] = recommender.recommend(MacroGoals(200.0, 40.0, 0.0, 5.0), limit=1, goals=GOALS)
+    assert (best.loggable_type, best.loggable_id, best.quantity, best.unit_name) == ("food", chicken.id, 1.0, "filé")
+    assert best.macros.proteins == pytest.approx(37.0)
+
+    meal_gap = recommender.recommend(MacroGoals(400.0, 40.0, 45.0, 5.0), limit=5, goals=GOALS)
+    assert (meal_gap[0].loggable_type, meal_gap[0].loggable_id, meal_gap[0].unit_name) == ("recipe", bowl.id, "portion")
+    assert [r.score for r in meal_gap] == sorted((r.score for r in meal_gap), reverse=True)
+
+
+def test_servings_come_from_units(db, catalog):
+    chicken, rice, oil, egg, bowl = catalog
+    recommendations = MacroRecommender(db).recommend(MacroGoals(2000.0, 100.0, 250.0, 65.0), limit=10, goals=GOALS)
+    servings = {(r.loggable_type, r.loggable_id): (r.quantity, r.unit_name, r.weight_grams) for r in recommendations}
+
+    assert len(servings) == len(recommendations) == 5
+    assert servings[("food", oil.id)] == (1.0, "colher", 13.5)
+    assert servings[("food", egg.id)] == (100.0, "g", 100.0)
+
+
+def test_nothing_fits_a_closed_gap(db, catalog):
+    assert MacroRecommender(db).recommend(MacroGoals(0.0, 0.0, 0.0, 0.0), goals=GOALS) == []
+
+
+def test_catalog_follows_service_writes(db, services, make_food, catalog):
+    food_service = services[0]
+    recommender = MacroRecommender(db, food_service, services[1])
+    gap = MacroGoals(120.0, 24.0, 2.0, 2.0)
+    assert "Whey" not in [r.name for r in recommender.recommend(gap, goals=GOALS)]
+
+    whey = make_food("Whey", 120.0, 24.0, 2.0, 2.0, unit_label="scoop", unit_val=30.0)
+    [best] = recommender.recommend(gap, limit=1, goals=GOALS)
+    assert (best.loggable_id, best.unit_name) == (whey.id, "scoop")
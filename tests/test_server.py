@@ -0,0 +1,232 @@
+import gzip
+import http.client
+import json
+import threading
+
+import pytest
+
+from food_app.server import ApiServer
+
+OATS = {
+    "name": "Aveia", "category": "Grãos", "unit_label": "g", "unit_val": 100.0,
+    "calories": 389.0, "proteins": 16.9, "carbs": 66.3, "fats": 6.9,
+}
+
+
+@pytest.fixture
+def serve(session_factories):
+    servers = []
+    session_factory, read_session_factory = session_factories
+
+    def start(workers):
+        server = ApiServer(
+            ("127.0.0.1", 0),
+            workers=workers,
+            session_factory=session_factory,
+            read_session_factory=read_session_factory,
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def server(serve):
+    return serve(2)
+
+
+@pytest.fixture
+def conn(server):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=10)
+    yield conn
+    conn.close()
+
+
+def request(conn, method, path, body=None, headers=None):
+    headers = dict(headers or {})
+    payload = None
+    if body is not None:
+        payload = json.dumps(body)
+        headers["Content-Type"] = "application/json"
+    conn.request(method, path, body=payload, headers=headers)
+    response = conn.getresponse()
+    data = response.read()
+    if response.getheader("Content-Encoding") == "gzip":
+        data = gzip.decompress(data)
+    return response, json.loads(data) if data else None
+
+
+def test_round_trip_over_one_connection(conn):
+    response, food = request(conn, "POST", "/foods", OATS)
+    assert response.status == 201 and food["name"] == "Aveia"
+    sock = conn.sock
+
+    response, unit = request(conn, "POST", f"/foods/{food['id']}/units", {"unit_name": "colher", "grams": 10})
+    assert response.status == 201
+
+    response, detail = request(conn, "GET", f"/foods/{food['id']}")
+    assert detail["calories_100g"] == 389.0
+    assert [u["unit_name"] for u in detail["units"]] == ["colher"]
+
+    _, nutrition = request(conn, "GET", f"/foods/{food['id']}/nutrition?quantity=3&unit=colher")
+    assert nutrition["weight_grams"] == pytest.approx(30.0)
+
+    response, entry = request(conn, "POST", "/logs", {
+        "log_date": "2024-05-01", "loggable_type": "food", "loggable_id": food["id"], "quantity": 50, "unit_name": "g",
+    })
+    assert response.status == 201
+    _, report = request(conn, "GET", "/logs/2024-05-01")
+    assert report["totals"]["calories"] == pytest.approx(194.5)
+    _, summary = request(conn, "GET", "/summary?start=2024-04-30&end=2024-05-01")
+    assert [d["entry_count"] for d in summary] == [0, 1]
+
+    response, _ = request(conn, "DELETE", f"/logs/{entry['id']}")
+    assert response.status == 204
+    # Every request above was served on the same kept-alive socket
+    assert conn.sock is sock
+
+
+def test_recipes_and_meals(conn):
+    _, food = request(conn, "POST", "/foods", OATS)
+    _, recipe = request(conn, "POST", "/recipes", {"name": "Mingau", "portions_yield": 2})
+    request(conn, "POST", f"/recipes/{recipe['id']}/ingredients", {"food_id": food["id"], "quantity": 80, "unit_name": "g"})
+    _, meal = request(conn, "POST", "/meals", {"name": "Café"})
+    response, _ = request(conn, "POST", f"/meals/{meal['id']}/items", {"recipe_id": recipe["id"], "quantity": 1, "unit_name": "portion"})
+    assert response.status == 201
+
+    _, portion = request(conn, "GET", f"/recipes/{recipe['id']}/nutrition")
+    _, total = request(conn, "GET", f"/meals/{meal['id']}/nutrition")
+    assert portion["weight_grams"] == pytest.approx(40.0)
+    assert total["calories"] == pytest.approx(portion["calories"])
+    _, page = request(conn, "GET", "/recipes?name=ming")
+    assert [r["name"] for r in page["items"]] == ["Mingau"] and page["next_cursor"] is None
+
+
+def test_etag_revalidation(conn):
+    request(conn, "POST", "/foods", OATS)
+    response, _ = request(conn, "GET", "/foods")
+    etag = response.getheader("ETag")
+    assert etag
+
+    response, body = request(conn, "GET", "/foods", headers={"If-None-Match": etag})
+    assert response.status == 304 and body is None
+
+    request(conn, "POST", "/foods", dict(OATS, name="Arroz"))
+    response, page = request(conn, "GET", "/foods", headers={"If-None-Match": etag})
+    assert response.status == 200
+    assert response.getheader("ETag") != etag
+    assert [f["name"] for f in page["items"]] == ["Aveia", "Arroz"]
+
+
+def test_large_responses_are_gzipped(conn):
+    for i in range(30):
+        request(conn, "POST", "/foods", dict(OATS, name=f"Aveia {i}"))
+
+    response, page = request(conn, "GET", "/foods?limit=30", headers={"Accept-Encoding": "gzip"})
+    assert response.getheader("Content-Encoding") == "gzip"
+    assert len(page["items"]) == 30
+
+    response, _ = request(conn, "GET", "/foods?limit=30")
+    assert response.getheader("Content-Encoding") is None
+
+
+def test_weak_etag_revalidates_both_encodings(conn):
+    for i in range(30):
+        request(conn, "POST", "/foods", dict(OATS, name=f"Aveia {i}"))
+
+    zipped, _ = request(conn, "GET", "/foods?limit=30", headers={"Accept-Encoding": "gzip"})
+    plain, _ = request(conn, "GET", "/foods?limit=30")
+    assert zipped.getheader("Content-Encoding") == "gzip"
+    assert plain.getheader("Content-Encoding") is None
+    etag = zipped.getheader("ETag")
+    assert etag.startswith('W/"') and plain.getheader("ETag") == etag
+
+    for headers in ({"Accept-Encoding": "gzip"}, {}):
+        for tag in (etag, etag.removeprefix("W/"), f'"other", {etag}'):
+            response, body = request(conn, "GET", "/foods?limit=30", headers=dict(headers, **{"If-None-Match": tag}))
+            assert response.status == 304 and body is None
+            assert response.getheader("ETag") == etag
+
+    response, _ = request(conn, "GET", "/foods?limit=30", headers={"If-None-Match": 'W/"other"'})
+    assert response.status == 200
+
+
+def test_errors(conn):
+    assert request(conn, "GET", "/nope")[0].status == 404
+    assert request(conn, "GET", "/foods/999")[0].status == 404
+    assert request(conn, "DELETE", "/foods")[0].status == 405
+    response, body = request(conn, "POST", "/foods", {"name": "Incompleto"})
+    assert response.status == 400 and "error" in body
+    assert request(conn, "GET", "/foods?cursor=garbage")[0].status == 400
+    assert request(conn, "DELETE", "/logs/999")[0].status == 404
+    # The connection survives error responses
+    assert request(conn, "GET", "/foods")[0].status == 200
+
+
+def test_batch_logging_reports_invalid_entries(conn):
+    _, food = request(conn, "POST", "/foods", OATS)
+    entry = {"log_date": "2024-05-01", "loggable_type": "food", "loggable_id": food["id"], "quantity": 50, "unit_name": "g"}
+
+    response, error = request(conn, "POST", "/logs/batch", {"entries": [entry, {**entry, "loggable_id": 999}]})
+    assert response.status == 422
+    assert [e["index"] for e in error["entries"]] == [1]
+
+    response, logs = request(conn, "POST", "/logs/batch", {"entries": [entry, entry]})
+    assert response.status == 201 and [log["calories"] for log in logs] == [pytest.approx(194.5)] * 2
+    _, summary = request(conn, "GET", "/summary?start=2024-05-01&end=2024-05-01")
+    assert summary[0]["entry_count"] == 2
+
+
+def test_many_workers_share_the_connection_pools(serve, read_engine):
+    # More workers than the read pool's 5 connections, each keeping a client of its own
+    server = serve(12)
+    conns = [http.client.HTTPConnection(*server.server_address, timeout=10) for _ in range(12)]
+    barrier = threading.Barrier(len(conns))
+    statuses = []
+
+    def browse(conn):
+        barrier.wait()
+        for _ in range(5):
+            statuses.append(request(conn, "GET", "/foods?limit=5")[0].status)
+            statuses.append(request(conn, "GET", "/summary?start=2024-05-01&end=2024-05-07")[0].status)
+
+    threads = [threading.Thread(target=browse, args=(conn,)) for conn in conns]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for conn in conns:
+        conn.close()
+    assert statuses == [200] * 120
+    assert len(server._clients) == 12
+    # Every worker's read transaction ended with its request
+    assert read_engine.pool.checkedout() == 0
+
+
+def test_workers_see_each_others_writes(server):
+    # While both connections stay open each keeps its own worker, and so its own client
+    a, b = (http.client.HTTPConnection(*server.server_address, timeout=10) for _ in range(2))
+    try:
+        food = request(a, "POST", "/foods", OATS)[1]
+        path = f"/foods/{food['id']}/nutrition?quantity=1&unit=pote"
+        assert request(b, "GET", path)[1]["weight_grams"] == 100.0  # no such unit yet
+
+        assert request(a, "POST", f"/foods/{food['id']}/units", {"unit_name": "pote", "grams": 500})[0].status == 201
+        assert request(b, "GET", path)[1]["weight_grams"] == 500.0
+        assert len(server._clients) == 2
+    finally:
+        a.close()
+        b.close()
+
+
+def test_metrics_need_no_client(server, conn):
+    conn.request("GET", "/metrics")
+    response = conn.getresponse()
+    text = response.read().decode()
+    assert response.status == 200 and text.startswith("# HELP food_app_calls_total")
+    assert server._clients == []
@@ -0,0 +1,19 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+
+def test_views_load_without_the_backend():
+    # The app script defers these until a page needs the client or draws a table
+    code = (
+        "import sys\n"
+        "import food_app.frontend.views.dashboard, food_app.frontend.views.registry\n"
+        "import food_app.frontend.views.kitchen, food_app.frontend.views.diagnostics\n"
+        "print(sorted(m for m in ('pandas', 'sqlalchemy', 'numpy', 'food_app.frontend.api_client') if m in sys.modules))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    child = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    assert child.stdout.strip() == "[]"
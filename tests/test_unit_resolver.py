@@ -0,0 +1,132 @@
+import logging
+from datetime import date
+
+import pytest
+from sqlalchemy import event, literal, select
+
+from food_app.backend.domain.log import DailyLogCreate
+from food_app.backend.infrastructure.migrations import seed_unit_aliases
+from food_app.backend.infrastructure.models import UnitAlias
+from food_app.backend.infrastructure.sql_functions import unit_key
+from food_app.backend.services.log_service import _grams_expr
+from food_app.backend.services.unit_resolver import FALLBACK_UNIT_GRAMS, MASS_UNITS
+
+
+def test_unit_key_normalizes_case_accents_and_spaces():
+    assert unit_key("  Colher  de CHÁ ") == "colher de cha"
+    assert unit_key("Xícara") == unit_key("xicara")
+    assert unit_key(None) is None
+
+
+def test_aliases_and_normalized_names(db, services, make_food):
+    food_service = services[0]
+    oats = make_food("Aveia", units=[("Colher de Sopa", 15.0), ("Xícara", 80.0), ("tbsp", 14.0)])
+    sugar = make_food("Açúcar", units=[("colher", 10.0), ("colher de sopa", 12.0)])
+
+    grams = food_service.resolve_grams([
+        (oats.id, 2, "colher de sopa"),
+        (oats.id, 2, "Colher"),          # alias -> colher de sopa
+        (oats.id, 1, "colheres de sopa"),
+        (oats.id, 1, "xicaras"),         # alias + accent folding
+        (oats.id, 1, "tablespoon"),      # the food's "tbsp" unit, reached via its canonical name
+        (oats.id, 50, "gramas"),         # alias of g
+        (sugar.id, 1, "colher"),         # an exact match beats the alias
+        (sugar.id, 1, "colheres"),
+    ])
+    assert grams == [30.0, 30.0, 15.0, 80.0, 14.0, 50.0, 10.0, 12.0]
+
+
+def test_fallback_is_explicit_and_logged_once(db, services, make_food, caplog):
+    food_service = services[0]
+    food = make_food("Pão", units=[("fatia", 25.0)])
+    with caplog.at_level(logging.WARNING, logger="food_app.backend.services.unit_resolver"):
+        assert food_service.resolve_grams([(food.id, 2, "concha"), (food.id, 1, "Concha")]) == [
+            2 * FALLBACK_UNIT_GRAMS, FALLBACK_UNIT_GRAMS,
+        ]
+    assert len(caplog.records) == 1
+    assert "concha" in caplog.records[0].getMessage()
+    assert food_service.resolve_grams([(9999, 2, "fatia"), (9999, 2, "g")]) == [0.0, 2.0]
+
+
+def test_batch_is_one_query_and_index_is_cached(engine, db, services, make_food):
+    food_service = services[0]
+    food_ids = [make_food(f"Food {i}", units=[("porção", 40.0 + i)]).id for i in range(20)]
+    db.commit()
+    food_service.units.clear()
+    food_service.resolve_grams([(food_ids[0], 1, "g")])  # reads the alias table
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        grams = food_service.resolve_grams([(fid, 1, "porcao") for fid in food_ids])
+        assert len(statements) == 1
+        food_service.resolve_grams([(fid, 2, "PORÇÃO") for fid in food_ids])
+        assert len(statements) == 1
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert grams == [40.0 + i for i in range(20)]
+
+
+def test_index_follows_unit_changes(db, services, make_food):
+    food_service = services[0]
+    food = make_food("Queijo", units=[("fatia", 20.0)])
+    assert food_service.resolve_grams([(food.id, 1, "fatias")]) == [20.0]
+    food_service.add_unit(food.id, "fatia", 30.0)
+    assert food_service.resolve_grams([(food.id, 1, "fatias")]) == [30.0]
+    food_service.add_unit(food.id, "cubo", 5.0)
+    assert food_service.resolve_grams([(food.id, 3, "Cubo")]) == [15.0]
+
+
+def test_sql_report_uses_the_same_rules(db, services, make_food):
+    food_service, _, _, log_service = services
+    food = make_food("Aveia", units=[("Colher de Sopa", 15.0), ("tbsp", 14.0)])
+    day = date(2024, 6, 1)
+    units = ["colher", "COLHER DE SOPA", "tablespoon", "gramas", "concha"]
+    for unit_name in units:
+        log_service.log_consumption(DailyLogCreate(
+            log_date=day, loggable_type="food", loggable_id=food.id, quantity=2.0, unit_name=unit_name,
+        ))
+    report = log_service.get_daily_nutrition(day)
+    assert [e.nutrition.weight_grams for e in report.entries] == pytest.approx(
+        food_service.resolve_grams([(food.id, 2.0, u) for u in units])
+    )
+    assert [e.nutrition.weight_grams for e in report.entries] == pytest.approx([30.0, 30.0, 28.0, 2.0, 200.0])
+
+
+def test_sql_twin_matches_the_resolver_for_every_alias(db, services, make_food):
+    food_service = services[0]
+    aliases = dict(db.execute(select(UnitAlias.alias, UnitAlias.canonical)).all())
+    canonicals = sorted(set(aliases.values()) - set(MASS_UNITS))
+    first_alias = {}
+    for alias, canonical in sorted(aliases.items()):
+        first_alias.setdefault(canonical, alias)
+    foods = [
+        # Matched by the unit's own name, by the alias target, and by a shared alias target
+        make_food("Exata", units=[(a, 10.0 + i) for i, a in enumerate(sorted(aliases)) if aliases[a] not in MASS_UNITS]),
+        make_food("Canônica", units=[(c.upper(), 200.0 + i) for i, c in enumerate(canonicals)]),
+        make_food("Apelidada", units=[(first_alias[c], 400.0 + i) for i, c in enumerate(canonicals) if c in first_alias]),
+        # Every non-mass unit falls back
+        make_food("Sem Unidades"),
+    ]
+    names = sorted(set(aliases) | set(aliases.values())) + ["concha", "Colher de Sopa", " XÍCARA "]
+
+    food_service.units.clear()
+    for food in foods:
+        items = [(food.id, 3.0, name) for name in names]
+        expected = food_service.resolve_grams(items)
+        actual = [
+            db.scalar(select(_grams_expr(literal(food_id), literal(quantity), literal(name))))
+            for food_id, quantity, name in items
+        ]
+        assert actual == pytest.approx(expected), food.name
+    assert 3.0 * FALLBACK_UNIT_GRAMS in expected
+
+
+def test_seeding_keeps_edited_aliases(engine, db):
+    db.merge(UnitAlias(alias="colher", canonical="colher de cha"))
+    db.commit()
+    with engine.begin() as conn:
+        seed_unit_aliases(conn)
+    assert db.scalar(select(UnitAlias.canonical).where(UnitAlias.alias == "colher")) == "colher de cha"
+    assert db.scalar(select(UnitAlias.canonical).where(UnitAlias.alias == "tbsp")) == "tablespoon"